@@ -8,6 +8,7 @@ from fpdf import FPDF
 import os
 import base64
 from modules.data_loader import get_full_stock_data, hitung_div_yield_normal
+from modules.indicators import compute_indicator, sma
 
 # --- FUNGSI PEMBERSIH TEKS PDF ANTI-ERROR ---
 def clean_pdf_text(text):
@@ -186,7 +187,7 @@ def run_analisa_cepat():
     if st.button(f"Jalankan Analisa {ticker_input}", type="primary"):
         with st.spinner("Mengkalkulasi indikator teknikal & fundamental..."):
             # --- 1. STANDAR ANTI-ERROR ---
-            data = get_full_stock_data(ticker)
+            data = get_full_stock_data(ticker, components={"history", "info", "bank_ratios", "financials", "cashflow"})
             info = data['info']
             df = data['history']
             financials = data.get('financials', pd.DataFrame()) 
@@ -197,121 +198,40 @@ def run_analisa_cepat():
                 return
 
             # --- 2. DATA TEKNIKAL & KALKULASI INDIKATOR ---
-            df['MA20'] = df['Close'].rolling(20).mean()
-            df['MA50'] = df['Close'].rolling(50).mean()
-            df['MA200'] = df['Close'].rolling(200).mean()
+            # Hasil di-cache per (ticker, parameter, bar terakhir) → dipakai ulang antar modul.
+            # History dari cache tidak diubah: indikator dikumpulkan di bundle terpisah.
+            def ind(name, **params):
+                return compute_indicator(df, name, ticker, '1d', **params)
+
+            tech = {}
+            tech['MA20'] = ind('sma', window=20)
+            tech['MA50'] = ind('sma', window=50)
+            tech['MA200'] = ind('sma', window=200)
             
-            df['Value'] = df['Close'] * df['Volume']
-            avg_value_ma20 = df['Value'].rolling(20).mean().iloc[-1]
-            df['Vol_MA20'] = df['Volume'].rolling(20).mean()
+            tech['Value'] = (df['Close'] * df['Volume']).to_numpy()
+            avg_value_ma20 = sma(tech['Value'], 20)[-1]
+            tech['Vol_MA20'] = ind('sma', window=20, column='Volume')
             
-            df['Typical_Price'] = (df['High'] + df['Low'] + df['Close']) / 3
-            df['VWAP_20'] = (df['Typical_Price'] * df['Volume']).rolling(20).sum() / df['Volume'].rolling(20).sum()
+            tech['Typical_Price'] = ((df['High'] + df['Low'] + df['Close']) / 3).to_numpy()
+            tech['VWAP_20'] = ind('vwap', window=20, typical=True)
 
-            df['EMA9'] = df['Close'].ewm(span=9, adjust=False).mean()
-            df['EMA21'] = df['Close'].ewm(span=21, adjust=False).mean()
+            tech['EMA9'] = ind('ema', span=9)
+            tech['EMA21'] = ind('ema', span=21)
             
             # MACD
-            df['EMA12'] = df['Close'].ewm(span=12, adjust=False).mean()
-            df['EMA26'] = df['Close'].ewm(span=26, adjust=False).mean()
-            df['MACD'] = df['EMA12'] - df['EMA26']
-            df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-            df['MACD_Hist'] = df['MACD'] - df['Signal']
+            tech['MACD'], tech['Signal'], tech['MACD_Hist'] = ind('macd', fast=12, slow=26, signal=9)
 
             # RSI
-            delta = df['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-            df['RSI'] = 100 - (100 / (1 + (gain/loss)))
-
-            # ATR (dipakai juga untuk Supertrend & SL)
-            high_low = df['High'] - df['Low']
-            high_close = np.abs(df['High'] - df['Close'].shift())
-            low_close = np.abs(df['Low'] - df['Close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            df['ATR'] = ranges.max(axis=1).rolling(14).mean()
-
-            # --- SUPERTREND (10, 3) ---
-            st_period = 10
-            st_multiplier = 3.0
-            df['ST_ATR'] = df['ATR'].rolling(st_period).mean()
-            df['ST_UpperBand'] = ((df['High'] + df['Low']) / 2) + (st_multiplier * df['ST_ATR'])
-            df['ST_LowerBand'] = ((df['High'] + df['Low']) / 2) - (st_multiplier * df['ST_ATR'])
-
-            # Hitung Supertrend direction secara iteratif
-            supertrend_dir = [np.nan] * len(df)
-            final_upper = list(df['ST_UpperBand'])
-            final_lower = list(df['ST_LowerBand'])
-
-            for i in range(1, len(df)):
-                # Final Upper Band
-                if final_upper[i] < final_upper[i-1] or df['Close'].iloc[i-1] > final_upper[i-1]:
-                    final_upper[i] = final_upper[i]
-                else:
-                    final_upper[i] = final_upper[i-1]
-                # Final Lower Band
-                if final_lower[i] > final_lower[i-1] or df['Close'].iloc[i-1] < final_lower[i-1]:
-                    final_lower[i] = final_lower[i]
-                else:
-                    final_lower[i] = final_lower[i-1]
-                # Direction: 1 = Bullish (harga di atas lower band), -1 = Bearish
-                if np.isnan(supertrend_dir[i-1]):
-                    supertrend_dir[i] = 1 if df['Close'].iloc[i] > final_upper[i] else -1
-                else:
-                    if supertrend_dir[i-1] == -1 and df['Close'].iloc[i] > final_upper[i]:
-                        supertrend_dir[i] = 1
-                    elif supertrend_dir[i-1] == 1 and df['Close'].iloc[i] < final_lower[i]:
-                        supertrend_dir[i] = -1
-                    else:
-                        supertrend_dir[i] = supertrend_dir[i-1]
-
-            df['ST_Dir'] = supertrend_dir
-
-            # --- PARABOLIC SAR ---
-            af_start = 0.02
-            af_step  = 0.02
-            af_max   = 0.20
-            psar_vals = [np.nan] * len(df)
-            psar_bull = [True] * len(df)  # True = Bullish PSAR
-
-            if len(df) > 2:
-                psar_vals[0] = df['Low'].iloc[0]
-                psar_bull[0] = True
-                ep = df['High'].iloc[0]
-                af = af_start
-
-                for i in range(1, len(df)):
-                    prev_psar = psar_vals[i-1]
-                    prev_bull = psar_bull[i-1]
-
-                    if prev_bull:
-                        psar_vals[i] = prev_psar + af * (ep - prev_psar)
-                        psar_vals[i] = min(psar_vals[i], df['Low'].iloc[i-1], df['Low'].iloc[max(0, i-2)])
-                        if df['Low'].iloc[i] < psar_vals[i]:
-                            psar_bull[i] = False
-                            psar_vals[i] = ep
-                            ep = df['Low'].iloc[i]
-                            af = af_start
-                        else:
-                            psar_bull[i] = True
-                            if df['High'].iloc[i] > ep:
-                                ep = df['High'].iloc[i]
-                                af = min(af + af_step, af_max)
-                    else:
-                        psar_vals[i] = prev_psar - af * (prev_psar - ep)
-                        psar_vals[i] = max(psar_vals[i], df['High'].iloc[i-1], df['High'].iloc[max(0, i-2)])
-                        if df['High'].iloc[i] > psar_vals[i]:
-                            psar_bull[i] = True
-                            psar_vals[i] = ep
-                            ep = df['High'].iloc[i]
-                            af = af_start
-                        else:
-                            psar_bull[i] = False
-                            if df['Low'].iloc[i] < ep:
-                                ep = df['Low'].iloc[i]
-                                af = min(af + af_step, af_max)
-
-            df['PSAR_Bull'] = psar_bull
+            tech['RSI'] = ind('rsi', window=14)
+
+            # ATR (dipakai juga untuk SL)
+            tech['ATR'] = ind('atr', period=14)
+
+            # --- SUPERTREND (10, 3) & PARABOLIC SAR (kernel bersama modul indikator) ---
+            _, tech['ST_Dir'] = ind('supertrend', period=10, multiplier=3)
+            _, tech['PSAR_Bull'] = ind('psar', af_start=0.02, af_step=0.02, af_max=0.20)
+
+            df = pd.concat([df, pd.DataFrame(tech, index=df.index)], axis=1)
 
             # Ambil nilai akhir indikator
             curr = df['Close'].iloc[-1]
@@ -0,0 +1,435 @@
+"""
+Modul: backtest.py
+Backtest skor screening di atas panel harga historis (price_panel).
+
+Setiap bar panel diperlakukan sebagai "hari scan": indikator + RULES dari
+scoring_rules dievaluasi untuk semua ticker × semua tanggal sekaligus (array),
+lalu pilihan akhir disusun dengan aturan yang sama seperti run_scan:
+    bonus Sector Hot → SL/TP (ATR & hard cap) → Skor >= 70 & RRR >= 1.4 → top-N per tanggal.
+
+Simulasi exit (juga vectorized, satu baris per sinyal × jendela holding):
+    - Entry di Close bar sinyal (harga "Harga" pada hasil scan)
+    - SL tersentuh (Low <= SL) → keluar di SL (atau Open jika gap di bawah SL)
+    - TP tersentuh (High >= TP) → keluar di TP (atau Open jika gap di atas TP)
+    - SL & TP di bar yang sama → dianggap SL (konservatif)
+    - Tidak tersentuh sampai batas holding → keluar di Close terakhir (TIMEOUT)
+      Day Trading: batas = akhir sesi hari yang sama; Swing: `max_hold` bar.
+
+Batasan: gerbang fundamental memakai snapshot info saat ini (tidak ada histori
+fundamental), jadi backtest menilai ticker yang ada di panel apa adanya.
+Konteks tren Daily untuk Day Trading memakai bar harian sesi sebelumnya
+(tanpa melihat Close hari berjalan).
+
+Contoh:
+    python -m modules.backtest --mode swing
+    python -m modules.backtest --mode day --out trades.parquet
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+try:
+    from modules.scoring_rules import (
+        CLOSE, HIGH, LOW, OPEN, DAY,
+        FEATURE_PARAMS, DAILY_FIELDS, feature_params,
+        right_align_order, feature_series, rolling_windows, evaluate_rules,
+    )
+    from modules.indicators import sma
+    from modules.universe import SECTORS, SECTOR_CODES, ticker_ids
+    from modules.price_panel import load_panel, get_universe_panel
+    from modules.screening_engine import (
+        TRADE_PLAN_PARAMS, MIN_RRR, SCORE_PICK, SCORE_FULL_SIZING, SECTOR_HOT_MIN, SECTOR_BONUS,
+        TRADE_MODES, universe_tickers,
+    )
+except ModuleNotFoundError:
+    from scoring_rules import (
+        CLOSE, HIGH, LOW, OPEN, DAY,
+        FEATURE_PARAMS, DAILY_FIELDS, feature_params,
+        right_align_order, feature_series, rolling_windows, evaluate_rules,
+    )
+    from indicators import sma
+    from universe import SECTORS, SECTOR_CODES, ticker_ids
+    from price_panel import load_panel, get_universe_panel
+    from screening_engine import (
+        TRADE_PLAN_PARAMS, MIN_RRR, SCORE_PICK, SCORE_FULL_SIZING, SECTOR_HOT_MIN, SECTOR_BONUS,
+        TRADE_MODES, universe_tickers,
+    )
+
+# Batas holding Swing Trading (bar harian) sebelum posisi ditutup di Close
+SWING_MAX_HOLD = 10
+
+# Jumlah ticker per potongan saat menilai histori (membatasi memori jendela fitur)
+SCORE_CHUNK_SIZE = 64
+
+
+# --- PARAMETER ---
+def backtest_params(trade_mode, **overrides):
+    """Parameter backtest default = konstanta run_scan; bisa dioverride per argumen."""
+    params = {
+        **FEATURE_PARAMS[trade_mode],
+        **TRADE_PLAN_PARAMS[trade_mode],
+        "min_rrr": MIN_RRR,
+        "score_pick": SCORE_PICK,
+        "thresholds": (SCORE_PICK, SCORE_FULL_SIZING),
+        "mtf_filter": True,
+        "sector_boost": True,
+        "sector_hot_min": SECTOR_HOT_MIN,
+        "sector_bonus": SECTOR_BONUS,
+        "top_n": 10,
+        "max_hold": None if trade_mode == DAY else SWING_MAX_HOLD,
+    }
+    unknown = set(overrides) - set(params)
+    if unknown:
+        raise ValueError(f"Parameter backtest tidak dikenal: {sorted(unknown)}")
+    params.update(overrides)
+    return params
+
+def split_feature_params(trade_mode, params):
+    """Bagian params yang memengaruhi skor (indikator & RULES), untuk score_history."""
+    return {k: params[k] for k in FEATURE_PARAMS[trade_mode] if k in params}
+
+
+# --- FUNGSI PEMBANTU (Helper) ---
+def _unalign(aligned, order):
+    """Kebalikan right_align: kembalikan array ticker × waktu ke kolom panel asli."""
+    out = np.empty_like(aligned)
+    np.put_along_axis(out, order, aligned, axis=1)
+    return out
+
+def _session_keys(dates):
+    """Kunci tanggal (int) per kolom panel, untuk membatasi holding intraday."""
+    return pd.DatetimeIndex(dates).normalize().asi8
+
+def daily_context(daily_values, daily_dates, dates):
+    """
+    Close, MA20 & MA50 harian dari sesi SEBELUM tanggal tiap bar intraday.
+    Return dict close_d/ma20_d/ma50_d, masing-masing ticker × waktu (kolom `dates`).
+    """
+    daily_values = np.asarray(daily_values, dtype=np.float64)
+    order, valid = right_align_order(daily_values)
+    close = np.take_along_axis(daily_values[:, :, CLOSE], order, axis=1)
+    close[~np.take_along_axis(valid, order, axis=1)] = np.nan
+    context = {
+        'close_d': daily_values[:, :, CLOSE],
+        'ma20_d': _unalign(sma(close, 20), order),
+        'ma50_d': _unalign(sma(close, 50), order),
+    }
+
+    # Hari harian terakhir yang tanggalnya < tanggal bar intraday
+    day_keys = _session_keys(daily_dates)
+    pos = np.searchsorted(day_keys, _session_keys(dates), side='left') - 1
+    out = {}
+    for name, arr in context.items():
+        gathered = np.full((arr.shape[0], len(pos)), np.nan)
+        ok = pos >= 0
+        gathered[:, ok] = arr[:, pos[ok]]
+        out[name] = gathered
+    return out
+
+
+# --- SKOR HISTORIS ---
+def score_history(values, trade_mode, mtf_filter=True, context=None, params=None, cache=None,
+                  chunk_size=SCORE_CHUNK_SIZE):
+    """
+    Skor scan di setiap bar panel.
+
+    Parameter:
+        values  : array ticker × waktu × field OHLCV (panel, NaN = tanpa transaksi)
+        context : dict close_d/ma20_d/ma50_d (lihat daily_context), khusus Day Trading
+        params  : override FEATURE_PARAMS (st_multiplier, rsi_window, vol_spike)
+        cache   : dict cache indikator (dipakai ulang antar panggilan dengan panel sama)
+
+    Return dict array ticker × waktu (kolom panel asli):
+        score (int), keep (bool: lolos likuiditas/MTF), close, atr
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_tickers, length = values.shape[:2]
+    out = {
+        'score': np.zeros((n_tickers, length), dtype=int),
+        'keep': np.zeros((n_tickers, length), dtype=bool),
+        'close': values[:, :, CLOSE].copy(),
+        'atr': np.full((n_tickers, length), np.nan),
+    }
+
+    for start in range(0, n_tickers, chunk_size):
+        rows = slice(start, min(start + chunk_size, n_tickers))
+        block = values[rows]
+        order, valid = right_align_order(block)
+        aligned = np.take_along_axis(block, order[:, :, None], axis=1)
+        aligned[~np.take_along_axis(valid, order, axis=1)] = np.nan
+        n_bars = valid.sum(axis=1)
+
+        chunk_cache = None if cache is None else cache.setdefault(start, {})
+        series = feature_series(aligned, n_bars, trade_mode, params, chunk_cache)
+        if not series:
+            continue
+        features = {name: rolling_windows(arr) for name, arr in series.items()}
+        features['vol_spike'] = feature_params(trade_mode, params)['vol_spike']
+
+        # Jumlah bar valid s.d. posisi t (rata kanan → history dimulai di length - n_bars)
+        position = np.arange(length)[None, :]
+        features['n_bars'] = np.clip(position - (length - n_bars[:, None]) + 1, 0, None).ravel()
+
+        if trade_mode == DAY:
+            for name in DAILY_FIELDS:
+                if context is None:
+                    arr = np.full(aligned.shape[:2], np.nan)
+                else:
+                    arr = np.take_along_axis(np.asarray(context[name])[rows], order, axis=1)
+                features[name] = arr.reshape(-1, 1)
+
+        score, _, keep = evaluate_rules(features, trade_mode, mtf_filter, with_reasons=False)
+        out['score'][rows] = _unalign(score.reshape(-1, length), order)
+        out['keep'][rows] = _unalign(keep.reshape(-1, length), order) & valid
+        out['atr'][rows] = _unalign(series['atr'], order)
+    return out
+
+
+# --- PILIHAN AKHIR PER TANGGAL ---
+def sector_codes(tickers):
+    """Kode sektor integer per ticker (+ daftar nama sektor), dari indeks universe."""
+    return SECTOR_CODES[ticker_ids(tickers)].astype(np.int64), list(SECTORS)
+
+def trade_plan_arrays(close, atr, params):
+    """Versi array build_trade_plan: return (harga, sl, tp, rrr) ticker × waktu."""
+    with np.errstate(invalid='ignore'):
+        harga = np.trunc(close)
+        atr_sl = np.trunc(harga - params['sl_mult'] * atr)
+        hard_cap_sl = np.trunc(harga * (1 - params['max_loss_pct']))
+        sl = np.maximum(atr_sl, hard_cap_sl)
+        tp = np.trunc(harga + (harga - sl) * params['rr_min'])
+        risk = harga - sl
+        rrr = np.where(risk > 0, (tp - harga) / np.where(risk > 0, risk, 1), 0.0)
+    return harga, sl, tp, rrr
+
+def select_picks(history, codes, params):
+    """
+    Pilihan akhir tiap tanggal seperti finalize_picks: bonus sektor, SL/TP,
+    Skor >= score_pick & RRR >= min_rrr, lalu top_n skor tertinggi.
+    Return dict f_score, picks (bool), harga, sl, tp (ticker × waktu).
+    """
+    score, keep = history['score'], history['keep']
+    f_score = score.astype(float)
+
+    if params['sector_boost']:
+        # Rata-rata skor per sektor per tanggal dari semua saham yang lolos filter
+        onehot = (codes[None, :] == np.arange(codes.max() + 1)[:, None]).astype(float)
+        totals = onehot @ np.where(keep, score, 0)
+        counts = onehot @ keep.astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hot = (counts > 0) & (totals / counts >= params['sector_hot_min'])
+        f_score = f_score + params['sector_bonus'] * hot[codes]
+    f_score = np.minimum(np.round(f_score), 100)
+
+    harga, sl, tp, rrr = trade_plan_arrays(history['close'], history['atr'], params)
+    candidate = keep & np.isfinite(sl) & (rrr >= params['min_rrr']) & (f_score >= params['score_pick'])
+
+    # Peringkat per tanggal (skor tertinggi dulu, seri → urutan ticker)
+    ranking_key = np.where(candidate, -f_score, np.inf)
+    order = np.argsort(ranking_key, axis=0, kind='stable')
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(len(codes))[:, None], axis=0)
+    picks = candidate & (rank < params['top_n'])
+    return {"f_score": f_score, "picks": picks, "harga": harga, "sl": sl, "tp": tp}
+
+
+# --- SIMULASI EXIT ---
+def simulate_trades(values, dates, selection, params):
+    """
+    Simulasi SL/TP/TIMEOUT seluruh sinyal sekaligus.
+    Return dict array per trade (satu elemen per sinyal yang punya bar setelah entry).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_tickers, length = values.shape[:2]
+    rows, cols = np.nonzero(selection['picks'])
+
+    if params['max_hold'] is None:
+        # Intraday: paling lama sampai bar terakhir sesi yang sama
+        keys = _session_keys(dates)
+        _, bars_per_session = np.unique(keys, return_counts=True)
+        hold = int(bars_per_session.max()) if len(keys) else 1
+        session_keys = np.concatenate([keys, np.full(hold, -1)])
+    else:
+        hold = int(params['max_hold'])
+        session_keys = None
+
+    pad = np.full((n_tickers, hold, values.shape[2]), np.nan)
+    padded = np.concatenate([values, pad], axis=1)
+    window_cols = cols[:, None] + 1 + np.arange(hold)[None, :]
+    window = padded[rows[:, None], window_cols]  # sinyal × hold × field
+
+    in_window = ~np.isnan(window[:, :, CLOSE])
+    if session_keys is not None:
+        in_window &= session_keys[window_cols] == session_keys[cols][:, None]
+
+    entry = selection['harga'][rows, cols]
+    sl = selection['sl'][rows, cols]
+    tp = selection['tp'][rows, cols]
+
+    with np.errstate(invalid='ignore'):
+        hit_sl = in_window & (window[:, :, LOW] <= sl[:, None])
+        hit_tp = in_window & (window[:, :, HIGH] >= tp[:, None])
+    first_sl = np.where(hit_sl.any(axis=1), hit_sl.argmax(axis=1), hold)
+    first_tp = np.where(hit_tp.any(axis=1), hit_tp.argmax(axis=1), hold)
+    last_bar = hold - 1 - in_window[:, ::-1].argmax(axis=1)
+    has_bar = in_window.any(axis=1)
+
+    is_sl = first_sl <= first_tp
+    exit_bar = np.where(first_sl < hold, np.minimum(first_sl, first_tp), first_tp)
+    exit_bar = np.where(exit_bar < hold, exit_bar, last_bar)
+    outcome = np.where(first_sl < hold, np.where(is_sl, "SL", "TP"), np.where(first_tp < hold, "TP", "TIMEOUT"))
+
+    idx = np.arange(len(rows))
+    open_px = window[idx, exit_bar, OPEN]
+    close_px = window[idx, exit_bar, CLOSE]
+    open_px = np.where(np.isnan(open_px), close_px, open_px)
+    exit_price = np.select(
+        [outcome == "SL", outcome == "TP"],
+        [np.minimum(open_px, sl), np.maximum(open_px, tp)],
+        close_px,
+    )
+
+    keep = has_bar
+    risk = entry - sl
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ret_pct = (exit_price - entry) / entry * 100
+        r_multiple = np.where(risk > 0, (exit_price - entry) / risk, np.nan)
+    return {
+        "row": rows[keep], "entry_col": cols[keep], "exit_col": (cols + 1 + exit_bar)[keep],
+        "f_score": selection['f_score'][rows, cols][keep],
+        "entry": entry[keep], "sl": sl[keep], "tp": tp[keep], "exit": exit_price[keep],
+        "outcome": outcome[keep], "bars_held": (exit_bar + 1)[keep],
+        "ret_pct": ret_pct[keep], "r_multiple": r_multiple[keep],
+    }
+
+
+# --- RINGKASAN ---
+def max_drawdown(ret_pct):
+    """Drawdown terdalam dari kurva ekuitas kumulatif (jumlah % return per trade)."""
+    if len(ret_pct) == 0:
+        return 0.0
+    equity = np.concatenate([[0.0], np.cumsum(ret_pct)])
+    return float((np.maximum.accumulate(equity) - equity).max())
+
+def summarize(trades, thresholds):
+    """Hit rate, expectancy & drawdown per ambang skor → DataFrame (index = ambang)."""
+    rows = []
+    order = np.argsort(trades["exit_col"], kind='stable')
+    for threshold in thresholds:
+        mask = trades["f_score"][order] >= threshold
+        ret = trades["ret_pct"][order][mask]
+        outcome = trades["outcome"][order][mask]
+        wins, losses = ret[ret > 0], ret[ret <= 0]
+        n = len(ret)
+        rows.append({
+            "Ambang_Skor": threshold,
+            "Jumlah_Trade": n,
+            "Hit_Rate": float((ret > 0).mean() * 100) if n else np.nan,
+            "TP_Rate": float((outcome == "TP").mean() * 100) if n else np.nan,
+            "SL_Rate": float((outcome == "SL").mean() * 100) if n else np.nan,
+            "Avg_Win": float(wins.mean()) if len(wins) else np.nan,
+            "Avg_Loss": float(losses.mean()) if len(losses) else np.nan,
+            "Expectancy_Pct": float(ret.mean()) if n else np.nan,
+            "Expectancy_R": float(np.nanmean(trades["r_multiple"][order][mask])) if n else np.nan,
+            "Max_Drawdown_Pct": max_drawdown(ret),
+        })
+    return pd.DataFrame(rows).set_index("Ambang_Skor")
+
+def trades_frame(trades, tickers, dates, sector_labels, codes):
+    """Array trade → DataFrame yang mudah dibaca / disimpan."""
+    dates = pd.DatetimeIndex(dates)
+    return pd.DataFrame({
+        "Ticker": [tickers[i].replace(".JK", "") for i in trades["row"]],
+        "Sektor": [sector_labels[codes[i]] for i in trades["row"]],
+        "Tanggal_Entry": dates[trades["entry_col"]],
+        "Tanggal_Exit": dates[trades["exit_col"]],
+        "Skor": trades["f_score"].astype(int),
+        "Entry": trades["entry"], "SL": trades["sl"], "TP": trades["tp"], "Exit": trades["exit"],
+        "Hasil": trades["outcome"], "Bar": trades["bars_held"],
+        "Return_Pct": trades["ret_pct"], "R": trades["r_multiple"],
+    })
+
+
+# --- BACKTEST ---
+def run_backtest(values, dates, tickers, trade_mode, context=None, history=None, **params):
+    """
+    Backtest lengkap di atas array panel.
+
+    Parameter:
+        values, dates, tickers : isi panel (lihat price_panel.load_panel)
+        context                : konteks Daily untuk Day Trading (daily_context)
+        history                : hasil score_history yang sudah ada (dipakai ulang)
+        **params               : override backtest_params (sl_mult, rr_min, top_n, ...)
+
+    Return dict: summary (DataFrame per ambang), trades (DataFrame), params.
+    """
+    params = backtest_params(trade_mode, **params)
+    if history is None:
+        history = score_history(values, trade_mode, params['mtf_filter'], context,
+                                split_feature_params(trade_mode, params))
+    codes, labels = sector_codes(tickers)
+    selection = select_picks(history, codes, params)
+    trades = simulate_trades(values, dates, selection, params)
+    return {
+        "summary": summarize(trades, params['thresholds']),
+        "trades": trades_frame(trades, tickers, dates, labels, codes),
+        "params": params,
+    }
+
+def load_backtest_inputs(trade_mode, tickers=None):
+    """Panel (dan konteks Daily untuk Day Trading) dari store lokal."""
+    interval = '15m' if trade_mode == DAY else '1d'
+    if tickers:
+        panel = get_universe_panel(tickers, interval)
+    else:
+        # Panel universe mode ini yang sudah dibangun warm-up/scan dipakai apa adanya
+        tickers = universe_tickers(trade_mode)
+        panel = load_panel(interval, tickers) or get_universe_panel(tickers, interval)
+    context = None
+    if trade_mode == DAY:
+        daily = get_universe_panel(panel["tickers"], '1d')
+        daily_values = np.full((len(panel["tickers"]), len(daily["dates"]), daily["values"].shape[2]), np.nan)
+        for i, ticker in enumerate(panel["tickers"]):
+            pos = daily["ticker_index"].get(ticker)
+            if pos is not None:
+                daily_values[i] = daily["values"][pos]
+        context = daily_context(daily_values, daily["dates"], panel["dates"])
+    return panel, context
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest skor screening di atas panel historis.")
+    parser.add_argument("--mode", choices=sorted(TRADE_MODES), default="swing")
+    parser.add_argument("--no-mtf", action="store_true")
+    parser.add_argument("--no-sector-boost", action="store_true")
+    parser.add_argument("--max-hold", type=int, default=None, help="Batas holding Swing (bar)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--out", help="Simpan daftar trade (.parquet / .csv)")
+    args = parser.parse_args(argv)
+
+    trade_mode = TRADE_MODES[args.mode]
+    overrides = {"mtf_filter": not args.no_mtf, "sector_boost": not args.no_sector_boost, "top_n": args.top}
+    if args.max_hold is not None:
+        overrides["max_hold"] = args.max_hold
+
+    started = time.perf_counter()
+    panel, context = load_backtest_inputs(trade_mode)
+    result = run_backtest(panel["values"], panel["dates"], panel["tickers"], trade_mode, context, **overrides)
+    print(f"Backtest {trade_mode}: {len(panel['tickers'])} saham × {len(panel['dates'])} bar "
+          f"({time.perf_counter() - started:.1f} detik)")
+    print(result["summary"].round(2).to_string())
+
+    if args.out:
+        if args.out.endswith(".csv"):
+            result["trades"].to_csv(args.out, index=False)
+        else:
+            result["trades"].to_parquet(args.out, index=False)
+        print(f"   → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
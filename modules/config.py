@@ -0,0 +1,15 @@
+"""
+Modul: config.py
+Konfigurasi lokasi data bersama untuk modul-modul di package `modules`.
+
+Sengaja tanpa dependensi (tidak meng-import yfinance / pandas / streamlit),
+supaya modul ringan seperti universe bisa memakainya tanpa ikut memuat library berat.
+"""
+
+import os
+
+# Lokasi data lokal (bisa dioverride lewat environment variable)
+DATA_DIR = os.environ.get(
+    "EXPERT_STOCK_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
@@ -0,0 +1,141 @@
+"""
+Modul: daily_context.py
+Tabel konteks tren Daily seluruh universe untuk bonus/penalti MTF Day Trading.
+
+Sebelumnya scan intraday (15m) mengambil history harian per ticker untuk
+menghitung MA20/MA50 Daily, sehingga jumlah fetch menjadi dua kali lipat.
+Kini konteks dihitung SEKALI per hari bursa dari store harian (bar yang sudah
+close, sebelum tanggal hari ini) lalu dicari per ticker dalam O(1):
+
+    Ticker | Close_D | MA20_D | MA50_D | Trend (Bullish / Sideways / Downtrend)
+
+Penyimpanan: memori proses + <DATA_DIR>/context/daily_<YYYYmmdd>.parquet,
+sehingga worker/proses lain di hari yang sama cukup membaca file.
+
+Catatan: modul ini tidak meng-import streamlit.
+"""
+
+import os
+import glob
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytz
+
+try:
+    from modules.price_store import DATA_DIR, refresh_many
+    from modules.scoring_rules import daily_trend_values, daily_trend_label, stack_right_aligned
+except ModuleNotFoundError:
+    from price_store import DATA_DIR, refresh_many
+    from scoring_rules import daily_trend_values, daily_trend_label, stack_right_aligned
+
+CONTEXT_DIR = os.path.join(DATA_DIR, "context")
+
+# Nama kolom tabel (urutan sama dengan scoring_rules.DAILY_FIELDS)
+CONTEXT_COLUMNS = ('Close_D', 'MA20_D', 'MA50_D')
+
+# Tabel per tanggal di memori proses: 'YYYYmmdd' → DataFrame
+_TABLES = {}
+_LOCK = threading.Lock()
+
+
+# --- FUNGSI PEMBANTU (Helper) ---
+def _today():
+    return datetime.now(pytz.timezone('Asia/Jakarta')).strftime('%Y%m%d')
+
+def _table_path(session_date):
+    return os.path.join(CONTEXT_DIR, f"daily_{session_date}.parquet")
+
+def _empty_table():
+    table = pd.DataFrame(columns=list(CONTEXT_COLUMNS) + ['Trend'])
+    table.index.name = 'Ticker'
+    return table
+
+def _load_table(session_date):
+    path = _table_path(session_date)
+    if not os.path.exists(path):
+        return _empty_table()
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"Peringatan: Tabel konteks daily rusak, dibangun ulang. Detail: {e}")
+        return _empty_table()
+
+def _save_table(table, session_date):
+    os.makedirs(CONTEXT_DIR, exist_ok=True)
+    path = _table_path(session_date)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    table.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+    # Tabel hari sebelumnya tidak dipakai lagi
+    for old in glob.glob(os.path.join(CONTEXT_DIR, "daily_*.parquet")):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+# --- BANGUN TABEL ---
+def build_daily_context(tickers, session_date):
+    """
+    Konteks tren dari store harian untuk `tickers`, hanya memakai bar yang
+    tanggalnya < session_date (bar hari berjalan belum close).
+    """
+    tickers = list(tickers)
+    histories = refresh_many(tickers, interval='1d')
+    cutoff = pd.Timestamp(datetime.strptime(session_date, '%Y%m%d'))
+
+    closes = []
+    for ticker in tickers:
+        df = histories.get(ticker)
+        if df is None or df.empty:
+            closes.append(np.empty(0))
+            continue
+        index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        close = df['Close'].to_numpy(dtype=np.float64)[index < cutoff]
+        closes.append(close[~np.isnan(close)])
+
+    daily = daily_trend_values(stack_right_aligned(closes))
+    table = pd.DataFrame(daily, index=pd.Index(tickers, name='Ticker'), columns=list(CONTEXT_COLUMNS))
+    table['Trend'] = daily_trend_label(daily)
+    return table
+
+def get_daily_context(tickers, session_date=None):
+    """
+    Tabel konteks hari ini untuk `tickers` (index = ticker, urutan sesuai input).
+    Dibangun sekali per hari bursa; ticker yang belum ada di tabel ditambahkan.
+    """
+    session_date = session_date or _today()
+    tickers = list(dict.fromkeys(tickers))
+    with _LOCK:
+        table = _TABLES.get(session_date)
+        if table is None:
+            table = _load_table(session_date)
+        missing = [t for t in tickers if t not in table.index]
+        if missing:
+            fresh = build_daily_context(missing, session_date)
+            table = fresh if table.empty else pd.concat([table, fresh])
+            try:
+                _save_table(table, session_date)
+            except Exception as e:
+                print(f"Peringatan: Gagal menyimpan tabel konteks daily. Detail: {e}")
+        # Hanya tabel hari ini yang disimpan di memori
+        _TABLES.clear()
+        _TABLES[session_date] = table
+    return table.reindex(tickers)
+
+def context_lookup(table):
+    """dict ticker → array (close_d, ma20_d, ma50_d) untuk pencarian O(1) saat scan."""
+    values = table.reindex(columns=list(CONTEXT_COLUMNS)).to_numpy(dtype=np.float64)
+    return dict(zip(table.index, values))
+
+def daily_context_row(ticker, session_date=None):
+    """Konteks satu ticker (array close_d, ma20_d, ma50_d), dari tabel hari ini."""
+    table = get_daily_context([ticker], session_date)
+    return table.reindex(columns=list(CONTEXT_COLUMNS)).to_numpy(dtype=np.float64)[0]
+
+def clear_daily_context():
+    with _LOCK:
+        _TABLES.clear()
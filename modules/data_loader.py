@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 import requests
 from bs4 import BeautifulSoup
+from modules.price_store import refresh_history
 
 # --- FUNGSI PEMBANTU (Helper) ---
 def hitung_div_yield_normal(info):
@@ -54,33 +55,130 @@ def scrape_local_financial_data(ticker):
         
     return scraped_data
 
-# --- SATU PINTU DATA (Anti-Rate Limit) ---
+# Komponen yang bisa diminta dari get_full_stock_data.
+# 'bank_ratios' = scraping CAR/NPL idnfinancials (hanya berlaku untuk saham bank).
+STOCK_COMPONENTS = frozenset({
+    "history", "info", "bank_ratios", "dividends",
+    "financials", "balance_sheet", "cashflow"
+})
+
+# --- CACHE TANPA COPY (Read-Only) ---
+# DataFrame/Series besar di-cache dengan st.cache_resource (tanpa pickle/deep-copy
+# di setiap cache hit). Array datanya dibekukan (read-only) saat masuk cache, dan
+# pemanggil hanya menerima view dangkal: menambah kolom di view tidak mengubah
+# objek di cache, sedangkan menulis nilai memicu copy-on-write milik pandas.
+def _freeze(obj):
+    """Salin sekali ke array read-only saat masuk cache (hanya data numerik)."""
+    try:
+        if isinstance(obj, pd.Series) and pd.api.types.is_numeric_dtype(obj.dtype):
+            values = obj.to_numpy(copy=True)
+            values.flags.writeable = False
+            return pd.Series(values, index=obj.index, name=obj.name, copy=False)
+        if isinstance(obj, pd.DataFrame) and not obj.empty and all(
+            pd.api.types.is_numeric_dtype(dtype) for dtype in obj.dtypes
+        ):
+            values = obj.to_numpy(dtype=np.float64, copy=True)
+            values.flags.writeable = False
+            return pd.DataFrame(values, index=obj.index, columns=obj.columns, copy=False)
+    except Exception as e:
+        print(f"Peringatan: Gagal membekukan data cache. Detail: {e}")
+    return obj
+
+def _view(obj):
+    """View dangkal (zero-copy) dari objek cache."""
+    return obj.copy(deep=False)
+
+# --- KOMPONEN DATA (Masing-masing di-cache terpisah) ---
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _cached_history(ticker, interval):
+    try:
+        return _freeze(refresh_history(ticker, interval))
+    except Exception as e:
+        print(f"Peringatan: Gagal memuat history {ticker} ({interval}). Detail: {e}")
+        return pd.DataFrame()
+
+def get_stock_history(ticker, interval='1d'):
+    """
+    History OHLCV satu ticker dengan period yang sesuai interval.
+    Dibaca dari store Parquet lokal; Yahoo hanya dimintai bar yang belum tersimpan.
+    Return berupa view read-only dari cache (tanpa copy).
+    """
+    return _view(_cached_history(ticker, interval))
+
 @st.cache_data(ttl=3600, show_spinner=False)
-def get_full_stock_data(ticker, interval='1d'):  # ✅ Parameter interval ditambahkan
+def get_stock_info(ticker):
+    """Mengambil `info` mentah dari yfinance (tanpa scraping CAR/NPL)."""
+    try:
+        return yf.Ticker(ticker).info or {}
+    except Exception:
+        return {}
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_bank_ratios(ticker):
+    """CAR & NPL hasil scraping portal lokal, dengan nilai default konservatif."""
+    local_data = scrape_local_financial_data(ticker)
+    return {
+        'capitalAdequacyRatio': local_data['CAR'] if local_data['CAR'] is not None else 18.0,
+        'nonPerformingLoan': local_data['NPL'] if local_data['NPL'] is not None else 2.5,
+    }
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _cached_dividends(ticker):
+    try:
+        stock = yf.Ticker(ticker)
+        divs = stock.dividends
+        if divs.empty:
+            divs = stock.actions['Dividends'] if 'Dividends' in stock.actions else pd.Series(dtype='float64')
+        return _freeze(divs)
+    except: pass
+    return pd.Series(dtype='float64')
+
+def get_stock_dividends(ticker):
+    """Riwayat dividen; fallback ke kolom Dividends di `actions` jika kosong."""
+    return _view(_cached_dividends(ticker))
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _cached_statement(ticker, statement):
+    try:
+        return _freeze(getattr(yf.Ticker(ticker), statement))
+    except: pass
+    return pd.DataFrame()
+
+def get_stock_statement(ticker, statement):
+    """Laporan keuangan: statement = 'financials' | 'balance_sheet' | 'cashflow'."""
+    return _view(_cached_statement(ticker, statement))
+
+def _is_bank(info):
+    industry = info.get('industry', '') or ''
+    sector = info.get('sector', '') or ''
+    return 'Bank' in industry or sector == 'Financial Services'
+
+# --- SATU PINTU DATA (Anti-Rate Limit) ---
+def get_full_stock_data(ticker, interval='1d', components=None):  # ✅ Parameter interval ditambahkan
     """
-    Mengambil semua data sekaligus untuk mencegah error 'Data tidak ditemukan'.
-    Sudah terintegrasi dengan scraping khusus sektor perbankan.
+    Mengambil data saham per komponen. Setiap komponen di-cache terpisah,
+    sehingga modul yang hanya butuh history + info tidak ikut menarik
+    laporan keuangan. Sudah terintegrasi dengan scraping khusus sektor perbankan.
 
     Parameter:
-        ticker   : Kode saham (contoh: 'BBCA.JK')
-        interval : Interval candle yfinance (default: '1d').
-                   Nilai valid: '1m','2m','5m','15m','30m','60m',
-                                '90m','1h','1d','5d','1wk','1mo','3mo'
-                   Catatan: interval menit hanya tersedia untuk data < 60 hari.
-    """
+        ticker     : Kode saham (contoh: 'BBCA.JK')
+        interval   : Interval candle yfinance (default: '1d').
+                     Nilai valid: '1m','2m','5m','15m','30m','60m',
+                                  '90m','1h','1d','5d','1wk','1mo','3mo'
+                     Catatan: interval menit hanya tersedia untuk data < 60 hari.
+        components : Himpunan komponen yang dibutuhkan (lihat STOCK_COMPONENTS),
+                     contoh {"history", "info"}. Default None = semua komponen.
 
-    # Sesuaikan period otomatis berdasarkan interval
-    # (interval pendek butuh period lebih singkat agar tidak error di yfinance)
-    _period_map = {
-        '1m': '7d', '2m': '60d', '5m': '60d',
-        '15m': '60d', '30m': '60d', '60m': '730d',
-        '90m': '60d', '1h': '730d',
-        '1d': '2y', '5d': '2y', '1wk': '5y',
-        '1mo': '10y', '3mo': '10y'
-    }
-    period = _period_map.get(interval, '2y')
+    Return:
+        dict dengan semua key standar; komponen yang tidak diminta berisi nilai kosong.
+        DataFrame/Series di dalamnya adalah view read-only dari cache: tambahkan
+        kolom turunan di frame terpisah (lihat indicators.compute_indicator) bila perlu.
+    """
+    components = STOCK_COMPONENTS if components is None else set(components)
+    unknown = components - STOCK_COMPONENTS
+    if unknown:
+        raise ValueError(f"Komponen tidak dikenal: {sorted(unknown)}")
 
-    stock = yf.Ticker(ticker)
     data = {
         "info": {},
         "history": pd.DataFrame(),
@@ -90,40 +188,24 @@ def get_full_stock_data(ticker, interval='1d'):  # ✅ Parameter interval ditamb
         "dividends": pd.Series(dtype='float64')
     }
 
-    # 1. Ambil History dengan interval & period yang sesuai
-    try:
-        df = stock.history(period=period, interval=interval)  # ✅ interval diteruskan ke yfinance
-        if not df.empty:
-            df.index = df.index.tz_localize(None)
-            data["history"] = df
-    except: pass
+    # 1. History dengan interval & period yang sesuai
+    if "history" in components:
+        data["history"] = get_stock_history(ticker, interval)
 
-    # 2. Ambil Info, Scraping (jika Bank), & Dividen
-    try:
-        info = stock.info
-        
-        industry = info.get('industry', '')
-        sector = info.get('sector', '')
-        is_bank = 'Bank' in industry or sector == 'Financial Services'
-        
-        if is_bank:
-            local_data = scrape_local_financial_data(ticker)
-            info['capitalAdequacyRatio'] = local_data['CAR'] if local_data['CAR'] is not None else 18.0
-            info['nonPerformingLoan'] = local_data['NPL'] if local_data['NPL'] is not None else 2.5
-        
+    # 2. Info + Scraping (jika Bank)
+    if "info" in components:
+        info = get_stock_info(ticker)
+        if "bank_ratios" in components and info and _is_bank(info):
+            info.update(get_bank_ratios(ticker))
         data["info"] = info
-        
-        divs = stock.dividends
-        if divs.empty:
-            divs = stock.actions['Dividends'] if 'Dividends' in stock.actions else pd.Series(dtype='float64')
-        data["dividends"] = divs
-    except: pass
 
-    # 3. Ambil Laporan Keuangan, Neraca & Cashflow
-    try:
-        data["financials"] = stock.financials
-        data["balance_sheet"] = stock.balance_sheet
-        data["cashflow"] = stock.cashflow
-    except: pass
+    # 3. Dividen
+    if "dividends" in components:
+        data["dividends"] = get_stock_dividends(ticker)
+
+    # 4. Laporan Keuangan, Neraca & Cashflow
+    for statement in ("financials", "balance_sheet", "cashflow"):
+        if statement in components:
+            data[statement] = get_stock_statement(ticker, statement)
 
     return data
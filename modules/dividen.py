@@ -166,7 +166,7 @@ def run_dividen():
 
     if st.button(f"Jalankan Analisa Lengkap {ticker_input}"):
         with st.spinner("Mengevaluasi fundamental & kelayakan dividen..."):
-            data = get_full_stock_data(ticker)
+            data = get_full_stock_data(ticker, components={"history", "info", "dividends"})
             info = data.get('info', {})  # Pastikan berupa dictionary agar tidak error
             divs = data.get('dividends')
             history = data.get('history')
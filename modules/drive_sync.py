@@ -0,0 +1,227 @@
+"""
+Modul: drive_sync.py
+Sinkronisasi file universe ke Google Drive (atau folder lokal sebagai pengganti Drive).
+
+    - Client Drive (credentials + discovery) dibangun SEKALI per proses & service
+      account, bukan setiap kali fungsi dipanggil.
+    - ID file per folder disimpan di cache; folder hanya di-list saat ID belum dikenal.
+      File yang sudah dihapus/dipindah di Drive (404) dibuang dari cache lalu dicari ulang.
+    - Tabel diunggah sebagai Parquet terkompresi (kolumnar, zstd).
+    - Hash isi tabel (tanpa kolom timestamp) disimpan bersama file di tujuan
+      (appProperties di Drive / file .sha256 di folder lokal); jika sama, unggah dilewati.
+      appProperties dibaca ulang per ID sebelum memutuskan skip, karena proses lain
+      mungkin sudah menimpa file itu sejak cache diisi.
+
+Backend lokal dipakai untuk pengujian & benchmark offline, atau di server tanpa Drive:
+    LOCAL_DRIVE_DIR=/path/folder  → semua unduh/unggah diarahkan ke folder itu.
+
+Catatan: modul ini tidak meng-import streamlit; library Google di-import hanya
+saat backend Drive benar-benar dipakai.
+"""
+
+import io
+import os
+import hashlib
+import threading
+import pandas as pd
+
+# Folder pengganti Drive (opsional)
+LOCAL_DRIVE_DIR = os.environ.get("LOCAL_DRIVE_DIR")
+
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive']
+PARQUET_COMPRESSION = "zstd"
+MIMETYPES = {".parquet": "application/vnd.apache.parquet", ".csv": "text/csv"}
+HASH_PROPERTY = "content_sha256"
+
+# Backend Drive yang sudah dibangun: (service account, folder) → backend
+_BACKENDS = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+# --- BACKEND ---
+def _build_drive_service(credentials_info):
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
+    creds = service_account.Credentials.from_service_account_info(credentials_info, scopes=DRIVE_SCOPES)
+    return build('drive', 'v3', credentials=creds, cache_discovery=False)
+
+def gdrive_backend(credentials_info, folder_id):
+    """Backend Google Drive (dibangun sekali per service account & folder, lalu dipakai ulang)."""
+    credentials_info = dict(credentials_info)
+    key = (credentials_info.get("client_email"), credentials_info.get("private_key_id"), folder_id)
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(key)
+        if backend is None:
+            backend = {
+                "kind": "gdrive", "folder_id": folder_id,
+                "service": _build_drive_service(credentials_info),
+                "files": {},  # nama file → {"id", "appProperties"}
+                "lock": threading.Lock(),
+            }
+            _BACKENDS[key] = backend
+    return backend
+
+def local_backend(root):
+    """Backend folder lokal dengan perilaku sama seperti Drive (untuk uji & benchmark offline)."""
+    os.makedirs(root, exist_ok=True)
+    return {"kind": "local", "root": root}
+
+def clear_backends():
+    with _BACKENDS_LOCK:
+        _BACKENDS.clear()
+
+
+# --- OPERASI FILE ---
+def _gdrive_file(backend, name):
+    """Metadata file di folder (dari cache; folder di-list hanya saat belum dikenal)."""
+    with backend["lock"]:
+        meta = backend["files"].get(name)
+        if meta is None:
+            query = f"name='{name}' and '{backend['folder_id']}' in parents and trashed=false"
+            items = backend["service"].files().list(q=query, fields="files(id, name, appProperties)").execute()
+            items = items.get('files', [])
+            if not items:
+                return None
+            meta = {"id": items[0]['id'], "appProperties": items[0].get('appProperties') or {}}
+            backend["files"][name] = meta
+        return meta
+
+def _forget_file(backend, name):
+    with backend["lock"]:
+        backend["files"].pop(name, None)
+
+def _not_found(error):
+    """True untuk HttpError 404 dari Drive API (status HTTP ada di error.resp)."""
+    return getattr(getattr(error, "resp", None), "status", None) == 404
+
+def download_bytes(backend, name):
+    """Isi file `name` (bytes), atau None jika tidak ada."""
+    if backend["kind"] == "local":
+        path = os.path.join(backend["root"], name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    from googleapiclient.http import MediaIoBaseDownload
+
+    for _ in range(2):
+        meta = _gdrive_file(backend, name)
+        if meta is None:
+            return None
+        buffer = io.BytesIO()
+        downloader = MediaIoBaseDownload(buffer, backend["service"].files().get_media(fileId=meta["id"]))
+        try:
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
+            return buffer.getvalue()
+        except Exception as e:
+            if not _not_found(e):
+                raise
+            # ID di cache sudah tidak berlaku → cari ulang di folder
+            _forget_file(backend, name)
+    return None
+
+def remote_hash(backend, name):
+    """Hash isi yang terakhir diunggah ke `name` (None jika belum pernah)."""
+    if backend["kind"] == "local":
+        path = os.path.join(backend["root"], f"{name}.sha256")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    meta = _gdrive_file(backend, name)
+    if meta is None:
+        return None
+    try:
+        latest = backend["service"].files().get(fileId=meta["id"], fields="appProperties").execute()
+    except Exception as e:
+        if not _not_found(e):
+            raise
+        _forget_file(backend, name)
+        return None
+    meta["appProperties"] = latest.get("appProperties") or {}
+    return meta["appProperties"].get(HASH_PROPERTY)
+
+def upload_bytes(backend, name, payload, content_hash=None):
+    """Unggah (timpa) file `name`; content_hash ikut disimpan sebagai penanda versi."""
+    if backend["kind"] == "local":
+        targets = [(name, payload)]
+        if content_hash is not None:
+            targets.append((f"{name}.sha256", content_hash.encode()))
+        for target, data in targets:
+            path = os.path.join(backend["root"], target)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return
+
+    from googleapiclient.http import MediaIoBaseUpload
+
+    properties = {HASH_PROPERTY: content_hash} if content_hash is not None else {}
+    mimetype = MIMETYPES.get(os.path.splitext(name)[1], "application/octet-stream")
+    files = backend["service"].files()
+    meta = _gdrive_file(backend, name)
+    if meta is not None:
+        media = MediaIoBaseUpload(io.BytesIO(payload), mimetype=mimetype, resumable=True)
+        try:
+            files.update(fileId=meta["id"], body={"appProperties": properties}, media_body=media).execute()
+            meta["appProperties"] = {**meta["appProperties"], **properties}
+            return
+        except Exception as e:
+            if not _not_found(e):
+                raise
+            # File sudah dihapus di Drive → buang ID basi dari cache, lalu buat file baru
+            _forget_file(backend, name)
+
+    media = MediaIoBaseUpload(io.BytesIO(payload), mimetype=mimetype, resumable=True)
+    body = {"name": name, "parents": [backend["folder_id"]], "appProperties": properties}
+    created = files.create(body=body, media_body=media, fields="id").execute()
+    with backend["lock"]:
+        backend["files"][name] = {"id": created["id"], "appProperties": properties}
+
+
+# --- TABEL ---
+def table_hash(df, exclude=()):
+    """Hash isi tabel (nama kolom + nilai), kolom `exclude` (mis. timestamp) diabaikan."""
+    data = df.drop(columns=[c for c in exclude if c in df.columns])
+    digest = hashlib.sha256("\x1f".join(map(str, data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def table_payload(df, fmt="parquet"):
+    """Tabel → bytes: Parquet terkompresi (default) atau CSV."""
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, compression=PARQUET_COMPRESSION)
+    return buffer.getvalue()
+
+def read_table(backend, name):
+    """Unduh tabel .parquet / .csv sebagai DataFrame (None jika file tidak ada)."""
+    payload = download_bytes(backend, name)
+    if payload is None:
+        return None
+    if name.endswith(".parquet"):
+        return pd.read_parquet(io.BytesIO(payload))
+    return pd.read_csv(io.BytesIO(payload))
+
+def sync_table(backend, df, base_name, formats=("parquet",), exclude_from_hash=()):
+    """
+    Unggah tabel sebagai <base_name>.<fmt> untuk tiap format, kecuali isinya
+    (tanpa kolom exclude_from_hash) sama dengan yang terakhir diunggah.
+    Return dict nama file → "uploaded" / "skipped".
+    """
+    content_hash = table_hash(df, exclude_from_hash)
+    status = {}
+    for fmt in formats:
+        name = f"{base_name}.{fmt}"
+        if remote_hash(backend, name) == content_hash:
+            status[name] = "skipped"
+            continue
+        upload_bytes(backend, name, table_payload(df, fmt), content_hash)
+        status[name] = "uploaded"
+    return status
@@ -356,7 +356,7 @@ def run_fundamental():
 
     if st.button(f"Bedah Fundamental {ticker_input}"):
         with st.spinner("Menginvestigasi kualitas aset, valuasi, dan sentimen pasar..."):
-            data = get_full_stock_data(ticker)
+            data = get_full_stock_data(ticker, components={"history", "info", "bank_ratios", "financials", "cashflow"})
             info = data['info']
             financials = data.get('financials', pd.DataFrame())
             cashflow = data.get('cashflow', pd.DataFrame())
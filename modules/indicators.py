@@ -0,0 +1,371 @@
+"""
+Modul: indicators.py
+Kernel indikator teknikal berbasis array NumPy mentah.
+
+Semua kernel menerima array 1D (satu ticker) atau 2D (ticker × waktu) dan
+mengembalikan array dengan bentuk yang sama, sehingga satu panggilan bisa
+menghitung seluruh universe sekaligus (misalnya dari price_panel).
+
+compute_indicator() menambahkan cache LRU lintas sesi di atas kernel-kernel ini,
+sehingga MA/RSI/MACD untuk history yang sama cukup dihitung sekali per proses.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+# --- FUNGSI PEMBANTU (Helper) ---
+def _as_2d(*arrays):
+    """Ubah input menjadi float64 2D (ticker × waktu). Return juga flag apakah input 1D."""
+    squeeze = np.ndim(arrays[0]) == 1
+    out = [np.atleast_2d(np.asarray(a, dtype=np.float64)) for a in arrays]
+    return out, squeeze
+
+def _restore(arr, squeeze):
+    return arr[0] if squeeze else arr
+
+def shift(x, n=1):
+    """Geser ke kanan sepanjang sumbu waktu (setara Series.shift(n)), diisi NaN."""
+    out = np.full_like(x, np.nan)
+    if n < x.shape[-1]:
+        out[..., n:] = x[..., :-n]
+    return out
+
+def rolling_mean(x, window):
+    """
+    Rata-rata bergulir sepanjang sumbu waktu, setara Series.rolling(window).mean():
+    NaN untuk `window - 1` bar pertama dan untuk jendela yang mengandung NaN.
+    """
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=-1)
+        out[..., window - 1:] = windows.mean(axis=-1)
+    return out
+
+def rolling_sum(x, window):
+    """Jumlah bergulir sepanjang sumbu waktu, setara Series.rolling(window).sum()."""
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=-1)
+        out[..., window - 1:] = windows.sum(axis=-1)
+    return out
+
+def rolling_std(x, window):
+    """Simpangan baku bergulir (ddof=1), setara Series.rolling(window).std()."""
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=-1)
+        out[..., window - 1:] = windows.std(axis=-1, ddof=1)
+    return out
+
+def true_range(high, low, close):
+    """True Range; bar pertama memakai High - Low (seperti pd.concat(...).max(axis=1))."""
+    prev_close = shift(close)
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    with np.errstate(invalid='ignore'):
+        tr = np.fmax.reduce(ranges, axis=0)
+    return tr
+
+
+# --- MOVING AVERAGE & MOMENTUM ---
+def sma(x, window):
+    """Simple Moving Average (1D/2D)."""
+    (x,), squeeze = _as_2d(x)
+    return _restore(rolling_mean(x, window), squeeze)
+
+def ema(x, span):
+    """
+    Exponential Moving Average setara Series.ewm(span, adjust=False).mean().
+    Memakai kernel ewm pandas (Cython) per kolom agar hasil identik bit-per-bit.
+    """
+    (x,), squeeze = _as_2d(x)
+    out = pd.DataFrame(x.T).ewm(span=span, adjust=False).mean().to_numpy().T
+    return _restore(np.ascontiguousarray(out), squeeze)
+
+def rsi(close, window=14):
+    """RSI versi rata-rata sederhana (rolling mean gain/loss), seperti di semua modul lama."""
+    (close,), squeeze = _as_2d(close)
+    delta = close - shift(close)
+    # Series.where(delta > 0, 0) mengganti NaN pertama dengan 0, jadi ikut ditiru
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100 - (100 / (1 + (rolling_mean(gain, window) / rolling_mean(loss, window))))
+    return _restore(out, squeeze)
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD klasik. Return (macd, signal_line, histogram)."""
+    (close,), squeeze = _as_2d(close)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return _restore(line, squeeze), _restore(signal_line, squeeze), _restore(line - signal_line, squeeze)
+
+def atr(high, low, close, period=14):
+    """Average True Range (rata-rata sederhana True Range)."""
+    (high, low, close), squeeze = _as_2d(high, low, close)
+    return _restore(rolling_mean(true_range(high, low, close), period), squeeze)
+
+def rolling_vwap(price, volume, window):
+    """VWAP bergulir: Σ(price × volume) / Σ(volume) selama `window` bar."""
+    (price, volume), squeeze = _as_2d(price, volume)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = rolling_sum(price * volume, window) / rolling_sum(volume, window)
+    return _restore(out, squeeze)
+
+def bollinger(close, window=20, n_std=2):
+    """Bollinger Band. Return (mid, upper, lower)."""
+    (close,), squeeze = _as_2d(close)
+    mid = rolling_mean(close, window)
+    std = rolling_std(close, window)
+    return _restore(mid, squeeze), _restore(mid + n_std * std, squeeze), _restore(mid - n_std * std, squeeze)
+
+
+# --- SUPERTREND ---
+def _supertrend_single(close, upper, lower):
+    """Rekursi Supertrend untuk satu ticker (list float, tanpa overhead NumPy per bar)."""
+    close, upper, lower = close.tolist(), upper.tolist(), lower.tolist()
+    nan = float('nan')
+    n_bars = len(close)
+    direction = [nan] * n_bars
+    line = [nan] * n_bars
+
+    for i in range(1, n_bars):
+        if close[i] > upper[i - 1]:
+            d = 1.0
+        elif close[i] < lower[i - 1]:
+            d = -1.0
+        else:
+            d = direction[i - 1]
+            if d == 1 and lower[i] < lower[i - 1]:
+                lower[i] = lower[i - 1]
+            if d == -1 and upper[i] > upper[i - 1]:
+                upper[i] = upper[i - 1]
+        direction[i] = d
+        line[i] = lower[i] if d == 1 else upper[i]
+
+    return np.array(line), np.array(direction)
+
+def supertrend(high, low, close, period=10, multiplier=2):
+    """
+    Supertrend dengan semantik "band ratchet" yang sama dengan versi .iloc lama:
+
+    - Arah berbalik naik jika Close > upper band bar sebelumnya, turun jika
+      Close < lower band bar sebelumnya.
+    - Jika tidak berbalik, arah diteruskan dan band dikunci (lower band tidak
+      boleh turun saat bullish, upper band tidak boleh naik saat bearish).
+
+    Rekursinya bergantung pada bar sebelumnya, jadi loop tetap berjalan
+    sepanjang waktu, tetapi setiap langkah memproses semua ticker sekaligus.
+
+    Return:
+        (supertrend, direction) dengan direction 1 = bullish, -1 = bearish,
+        NaN = belum terdefinisi (ATR belum lengkap).
+    """
+    (high, low, close), squeeze = _as_2d(high, low, close)
+    atr = rolling_mean(true_range(high, low, close), period)
+    hl2 = (high + low) / 2
+    upper = hl2 + multiplier * atr
+    lower = hl2 - multiplier * atr
+
+    if close.shape[0] == 1:
+        # Satu ticker: loop skalar atas list Python jauh lebih cepat daripada
+        # operasi NumPy berukuran 1 di setiap langkah
+        line, direction = _supertrend_single(close[0], upper[0], lower[0])
+        return _restore(line[None, :], squeeze), _restore(direction[None, :], squeeze)
+
+    n_bars = close.shape[1]
+    direction = np.full_like(close, np.nan)
+    line = np.full_like(close, np.nan)
+
+    with np.errstate(invalid='ignore'):
+        for i in range(1, n_bars):
+            c = close[:, i]
+            up_prev, lo_prev = upper[:, i - 1], lower[:, i - 1]
+            flip_up = c > up_prev
+            flip_down = ~flip_up & (c < lo_prev)
+            hold = ~(flip_up | flip_down)
+
+            d = np.where(flip_up, 1.0, np.where(flip_down, -1.0, direction[:, i - 1]))
+
+            lock_lower = hold & (d == 1) & (lower[:, i] < lo_prev)
+            lower[lock_lower, i] = lo_prev[lock_lower]
+            lock_upper = hold & (d == -1) & (upper[:, i] > up_prev)
+            upper[lock_upper, i] = up_prev[lock_upper]
+
+            direction[:, i] = d
+            line[:, i] = np.where(d == 1, lower[:, i], upper[:, i])
+
+    return _restore(line, squeeze), _restore(direction, squeeze)
+
+
+# --- PARABOLIC SAR ---
+def _psar_single(high, low, close, af_start, af_step, af_max):
+    """Rekursi PSAR untuk satu ticker (list float)."""
+    high, low = high.tolist(), low.tolist()
+    psar = close.tolist()
+    n_bars = len(psar)
+    bull_state = [True] * n_bars
+    bull = True
+    af = af_start
+    hp = high[0] if n_bars else 0.0
+    lp = low[0] if n_bars else 0.0
+
+    for i in range(2, n_bars):
+        if bull:
+            psar[i] = psar[i - 1] + af * (hp - psar[i - 1])
+            psar[i] = min(psar[i], low[i - 1], low[i - 2])
+            if low[i] < psar[i]:
+                bull = False
+                psar[i] = hp
+                lp = low[i]
+                af = af_start
+            elif high[i] > hp:
+                hp = high[i]
+                af = min(af + af_step, af_max)
+        else:
+            psar[i] = psar[i - 1] + af * (lp - psar[i - 1])
+            psar[i] = max(psar[i], high[i - 1], high[i - 2])
+            if high[i] > psar[i]:
+                bull = True
+                psar[i] = lp
+                hp = high[i]
+                af = af_start
+            elif low[i] < lp:
+                lp = low[i]
+                af = min(af + af_step, af_max)
+        bull_state[i] = bull
+
+    return np.array(psar, dtype=np.float64), np.array(bull_state)
+
+def psar(high, low, close, af_start=0.02, af_step=0.02, af_max=0.2):
+    """
+    Parabolic SAR (Wilder). Dua bar pertama memakai harga Close sebagai titik awal.
+
+    Return:
+        (psar, bull) dengan bull = status tren SAR (True = titik di bawah harga).
+    """
+    (high, low, close), squeeze = _as_2d(high, low, close)
+
+    if close.shape[0] == 1:
+        line, bull = _psar_single(high[0], low[0], close[0], af_start, af_step, af_max)
+        return _restore(line[None, :], squeeze), _restore(bull[None, :], squeeze)
+
+    n_tickers, n_bars = close.shape
+    line = close.copy()
+    bull_state = np.ones((n_tickers, n_bars), dtype=bool)
+    if n_bars == 0:
+        return _restore(line, squeeze), _restore(bull_state, squeeze)
+
+    bull = np.ones(n_tickers, dtype=bool)
+    af = np.full(n_tickers, af_start)
+    hp = high[:, 0].copy()
+    lp = low[:, 0].copy()
+
+    for i in range(2, n_bars):
+        prev = line[:, i - 1]
+        up = np.minimum(np.minimum(prev + af * (hp - prev), low[:, i - 1]), low[:, i - 2])
+        down = np.maximum(np.maximum(prev + af * (lp - prev), high[:, i - 1]), high[:, i - 2])
+        p = np.where(bull, up, down)
+
+        flip_down = bull & (low[:, i] < p)
+        flip_up = ~bull & (high[:, i] > p)
+        new_hp = bull & ~flip_down & (high[:, i] > hp)
+        new_lp = ~bull & ~flip_up & (low[:, i] < lp)
+        flipped = flip_down | flip_up
+
+        line[:, i] = np.where(flip_down, hp, np.where(flip_up, lp, p))
+        af = np.where(flipped, af_start, np.where(new_hp | new_lp, np.minimum(af + af_step, af_max), af))
+        lp = np.where(flip_down | new_lp, low[:, i], lp)
+        hp = np.where(flip_up | new_hp, high[:, i], hp)
+        bull = (bull & ~flip_down) | flip_up
+        bull_state[:, i] = bull
+
+    return _restore(line, squeeze), _restore(bull_state, squeeze)
+
+
+# --- CACHE HASIL INDIKATOR (LRU, lintas sesi dalam satu proses) ---
+# Batas memori total hasil yang disimpan (default 256 MB)
+INDICATOR_CACHE_MAX_BYTES = int(os.environ.get("INDICATOR_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+_INDICATOR_CACHE = OrderedDict()
+_INDICATOR_CACHE_LOCK = threading.Lock()
+_indicator_cache_bytes = 0
+
+# Nama indikator → fungsi yang menerima DataFrame OHLCV + parameter
+_DF_INDICATORS = {
+    'sma': lambda df, window, column='Close': sma(df[column].to_numpy(), window),
+    'ema': lambda df, span, column='Close': ema(df[column].to_numpy(), span),
+    'rsi': lambda df, window=14: rsi(df['Close'].to_numpy(), window),
+    'macd': lambda df, fast=12, slow=26, signal=9: macd(df['Close'].to_numpy(), fast, slow, signal),
+    'atr': lambda df, period=14: atr(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), period),
+    'bollinger': lambda df, window=20, n_std=2: bollinger(df['Close'].to_numpy(), window, n_std),
+    'vwap': lambda df, window, typical=False: rolling_vwap(
+        ((df['High'] + df['Low'] + df['Close']) / 3).to_numpy() if typical else df['Close'].to_numpy(),
+        df['Volume'].to_numpy(), window
+    ),
+    'supertrend': lambda df, period=10, multiplier=2: supertrend(
+        df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), period, multiplier
+    ),
+    'psar': lambda df, af_start=0.02, af_step=0.02, af_max=0.2: psar(
+        df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), af_start, af_step, af_max
+    ),
+}
+
+def _freeze(result):
+    """Jadikan hasil read-only agar salinan bersama di cache tidak bisa diubah pemanggil."""
+    arrays = result if isinstance(result, tuple) else (result,)
+    for arr in arrays:
+        arr.flags.writeable = False
+    return result, sum(arr.nbytes for arr in arrays)
+
+def _history_fingerprint(df):
+    """Penanda versi history: jumlah bar + timestamp, Close & Volume bar terakhir."""
+    last = df.iloc[-1]
+    return (len(df), df.index[-1], float(last['Close']), float(last.get('Volume', np.nan)))
+
+def compute_indicator(df, name, ticker=None, interval='1d', **params):
+    """
+    Menghitung indikator `name` (lihat _DF_INDICATORS) atas DataFrame OHLCV.
+
+    Jika `ticker` diberikan, hasil di-cache dengan kunci
+    (ticker, interval, name, parameter, bar terakhir). Analisa berikutnya atas
+    history yang sama (modul lain / user lain) langsung memakai hasil tersimpan.
+    Hasil berupa array read-only (atau tuple array untuk macd/bollinger/supertrend/psar).
+    """
+    global _indicator_cache_bytes
+    func = _DF_INDICATORS[name]
+    if ticker is None or df.empty:
+        return func(df, **params)
+
+    key = (ticker, interval, name, tuple(sorted(params.items())), _history_fingerprint(df))
+    with _INDICATOR_CACHE_LOCK:
+        hit = _INDICATOR_CACHE.get(key)
+        if hit is not None:
+            _INDICATOR_CACHE.move_to_end(key)
+            return hit[0]
+
+    result, nbytes = _freeze(func(df, **params))
+
+    with _INDICATOR_CACHE_LOCK:
+        if key not in _INDICATOR_CACHE:
+            _INDICATOR_CACHE[key] = (result, nbytes)
+            _indicator_cache_bytes += nbytes
+        while _indicator_cache_bytes > INDICATOR_CACHE_MAX_BYTES and len(_INDICATOR_CACHE) > 1:
+            _, (_, evicted_bytes) = _INDICATOR_CACHE.popitem(last=False)
+            _indicator_cache_bytes -= evicted_bytes
+    return result
+
+def indicator_cache_info():
+    """Ringkasan isi cache (jumlah entri & pemakaian memori) untuk monitoring."""
+    with _INDICATOR_CACHE_LOCK:
+        return {"entries": len(_INDICATOR_CACHE), "bytes": _indicator_cache_bytes,
+                "max_bytes": INDICATOR_CACHE_MAX_BYTES}
+
+def clear_indicator_cache():
+    global _indicator_cache_bytes
+    with _INDICATOR_CACHE_LOCK:
+        _INDICATOR_CACHE.clear()
+        _indicator_cache_bytes = 0
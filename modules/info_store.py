@@ -0,0 +1,125 @@
+"""
+Modul: info_store.py
+Snapshot `info` fundamental seluruh universe dalam satu tabel (1 baris per ticker),
+disimpan sebagai Parquet agar pre-filter fundamental bisa dievaluasi sekaligus
+(vectorized) tanpa memanggil yf.Ticker(...).info satu per satu setiap scan.
+
+Struktur file : <DATA_DIR>/info/snapshot.parquet
+Refresh       : hanya ticker yang belum ada / sudah lebih tua dari INFO_MAX_AGE.
+
+Catatan: seperti price_store, modul ini tidak meng-import streamlit.
+"""
+
+import os
+import time
+import threading
+import concurrent.futures
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+try:
+    from modules.config import DATA_DIR
+except ModuleNotFoundError:
+    from config import DATA_DIR
+
+INFO_DIR = os.path.join(DATA_DIR, "info")
+SNAPSHOT_PATH = os.path.join(INFO_DIR, "snapshot.parquet")
+
+# Kolom info yang disimpan di snapshot (angka fundamental + klasifikasi)
+SNAPSHOT_FIELDS = (
+    'marketCap', 'returnOnEquity', 'returnOnAssets',
+    'trailingPE', 'forwardPE', 'priceToBook', 'debtToEquity', 'dividendYield',
+    'sector', 'industry',
+)
+TEXT_FIELDS = ('sector', 'industry')
+
+# Data fundamental jarang berubah: cukup disegarkan 1x sehari
+INFO_MAX_AGE = 24 * 3600
+
+
+# --- BACA / TULIS SNAPSHOT ---
+def _empty_snapshot():
+    snapshot = pd.DataFrame(columns=list(SNAPSHOT_FIELDS) + ['fetched_at'])
+    snapshot.index.name = 'Ticker'
+    return snapshot
+
+def load_info_snapshot():
+    """Membaca snapshot dari disk (tabel kosong jika belum ada / rusak)."""
+    if not os.path.exists(SNAPSHOT_PATH):
+        return _empty_snapshot()
+    try:
+        return pd.read_parquet(SNAPSHOT_PATH)
+    except Exception as e:
+        print(f"Peringatan: Snapshot info rusak, akan dibangun ulang. Detail: {e}")
+        return _empty_snapshot()
+
+def save_info_snapshot(snapshot):
+    """Menulis snapshot secara atomik (tulis file sementara lalu rename)."""
+    os.makedirs(INFO_DIR, exist_ok=True)
+    tmp_path = f"{SNAPSHOT_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    snapshot.to_parquet(tmp_path)
+    os.replace(tmp_path, SNAPSHOT_PATH)
+
+def _info_row(info):
+    """dict info yfinance → baris snapshot (angka jadi float, None jadi NaN)."""
+    row = {}
+    for field in SNAPSHOT_FIELDS:
+        value = info.get(field)
+        if field in TEXT_FIELDS:
+            row[field] = value if isinstance(value, str) else None
+        else:
+            try:
+                row[field] = float(value) if value is not None else np.nan
+            except (TypeError, ValueError):
+                row[field] = np.nan
+    return row
+
+def _fetch_info(ticker):
+    try:
+        return ticker, yf.Ticker(ticker).info or {}
+    except Exception as e:
+        print(f"Peringatan: Gagal mengambil info {ticker}. Detail: {e}")
+        return ticker, None
+
+
+# --- REFRESH ---
+def refresh_info_snapshot(tickers, max_age=INFO_MAX_AGE, workers=10):
+    """
+    Menyegarkan snapshot untuk `tickers` lalu mengembalikan potongan tabelnya
+    (index = ticker, urutan sesuai input).
+
+    - Ticker yang barisnya masih segar (< max_age detik) tidak diminta ulang.
+    - Ticker yang gagal diambil tetap punya baris (NaN) tapi `fetched_at` kosong,
+      sehingga akan dicoba lagi pada refresh berikutnya.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    snapshot = load_info_snapshot()
+    now = time.time()
+
+    fetched_at = snapshot['fetched_at'].reindex(tickers)
+    stale = [t for t, ts in fetched_at.items() if pd.isna(ts) or now - ts >= max_age]
+
+    if stale:
+        rows = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for ticker, info in executor.map(_fetch_info, stale):
+                if info is None:
+                    if ticker not in snapshot.index:
+                        rows[ticker] = {**_info_row({}), 'fetched_at': np.nan}
+                    continue
+                rows[ticker] = {**_info_row(info), 'fetched_at': now}
+
+        if rows:
+            fresh = pd.DataFrame.from_dict(rows, orient='index')
+            fresh.index.name = 'Ticker'
+            if snapshot.empty:
+                snapshot = fresh
+            else:
+                snapshot = pd.concat([snapshot.drop(index=fresh.index, errors='ignore'), fresh])
+            try:
+                save_info_snapshot(snapshot)
+            except Exception as e:
+                print(f"Peringatan: Gagal menyimpan snapshot info. Detail: {e}")
+
+    return snapshot.reindex(tickers)
@@ -0,0 +1,295 @@
+"""
+Modul: live_watch.py
+Mode pantau (watch) saat LIVE MARKET: universe dinilai ulang dengan irama tetap
+tanpa user menekan tombol scan berulang kali.
+
+Setiap siklus:
+    1. Bar terbaru disegarkan (satu request multi-ticker per potongan, lewat panel).
+    2. Tanda tangan bar terakhir tiap ticker (waktu + OHLCV) dibandingkan dengan
+       siklus sebelumnya → hanya ticker yang bar terakhirnya berubah yang dinilai ulang.
+    3. Leaderboard disusun dari hasil tersimpan (ticker lain memakai skor lamanya),
+       lalu pilihan akhir (bonus sektor, SL/TP) dihitung seperti run_scan.
+
+Biaya scoring per siklus sebanding dengan jumlah bar yang berubah, bukan ukuran
+universe. Universe & refresh bar ("feed") dipakai bersama per trade_mode; watcher
+(scoring + leaderboard) dipakai bersama semua sesi per (trade_mode, mtf_filter).
+Bonus sektor hanya memengaruhi pilihan akhir, jadi diterapkan per panggilan.
+Tiap sesi membandingkan pilihan terbaru dengan yang terakhir ia lihat (diff_picks)
+untuk menampilkan perubahan & memicu alert.
+
+Jalankan headless (mencetak diff tiap siklus selama LIVE MARKET):
+    python -m modules.live_watch --mode day
+    python -m modules.live_watch --mode day --interval 120 --once
+
+Catatan: modul ini tidak meng-import streamlit.
+"""
+
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+import pytz
+import numpy as np
+
+try:
+    from modules.screening_engine import (
+        BACKENDS, MIN_RRR, SCORE_FULL_SIZING, TRADE_MODES, get_market_session, universe_tickers,
+        fundamental_prefilter, make_loader, iter_scan, scan_batch_size, build_trade_plan,
+        new_leaderboard, leaderboard_add, finalize_picks, liquid_label_map, apply_liquid_labels,
+        shutdown_process_pool,
+    )
+    from modules.price_panel import CLOSE, get_universe_panel, panel_history
+    from modules.info_store import refresh_info_snapshot
+    from modules.daily_context import get_daily_context, context_lookup
+except ModuleNotFoundError:
+    from screening_engine import (
+        BACKENDS, MIN_RRR, SCORE_FULL_SIZING, TRADE_MODES, get_market_session, universe_tickers,
+        fundamental_prefilter, make_loader, iter_scan, scan_batch_size, build_trade_plan,
+        new_leaderboard, leaderboard_add, finalize_picks, liquid_label_map, apply_liquid_labels,
+        shutdown_process_pool,
+    )
+    from price_panel import CLOSE, get_universe_panel, panel_history
+    from info_store import refresh_info_snapshot
+    from daily_context import get_daily_context, context_lookup
+
+# Irama scan ulang (detik)
+WATCH_INTERVAL = 60
+
+# Feed & watcher bersama di memori proses: trade_mode → feed, (trade_mode, mtf_filter) → state
+_FEEDS = {}
+_WATCHERS = {}
+_WATCHERS_LOCK = threading.Lock()
+_KEY_LOCKS = {}
+
+
+# --- STATE & SIKLUS ---
+def new_feed(trade_mode):
+    """Universe & panel bar terbaru satu mode trading (dipakai bersama para watcher)."""
+    return {
+        "trade_mode": trade_mode,
+        "date": None, "lolos": None, "snapshot": None, "context": None, "labels": None,
+        "panel": None, "signatures": {}, "refreshed_at": None,
+        "lock": threading.Lock(),
+    }
+
+def new_watch(trade_mode, mtf_filter=True, sector_boost=True, top_n=10, backend=None, feed=None):
+    """
+    State watcher kosong (universe & hasil diisi pada siklus pertama).
+    sector_boost = default bonus sektor untuk watch_cycle (bisa ditimpa per panggilan).
+    """
+    return {
+        "trade_mode": trade_mode, "mtf_filter": mtf_filter, "sector_boost": sector_boost,
+        "top_n": top_n, "backend": backend, "feed": feed or new_feed(trade_mode),
+        "date": None,
+        "signatures": {},   # ticker → tanda tangan bar terakhir yang sudah dinilai
+        "results": {},      # kode → (hasil scoring, lolos RRR)
+        "board": None, "cycle": 0, "updated_at": None, "last": None, "picks": {},
+    }
+
+def last_bar_signatures(panel):
+    """dict ticker → (timestamp ns, O, H, L, C, V) bar terakhir yang ada transaksinya."""
+    values = panel["values"]
+    valid = ~np.isnan(values[:, :, CLOSE])
+    has_bar = valid.any(axis=1)
+    last = values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    bars = np.nan_to_num(np.asarray(values[np.arange(len(last)), last]), nan=-1.0)
+    stamps = panel["dates"].asi8[last]
+    return {
+        ticker: (int(stamps[i]), *bars[i].tolist())
+        for i, ticker in enumerate(panel["tickers"]) if has_bar[i]
+    }
+
+def changed_tickers(signatures, previous):
+    """Ticker yang bar terakhirnya baru/berubah dibanding siklus sebelumnya."""
+    return [t for t, sig in signatures.items() if previous.get(t) != sig]
+
+def _prepare_universe(feed):
+    """Universe lolos fundamental + konteks Daily, cukup sekali per hari bursa."""
+    today = datetime.now(pytz.timezone('Asia/Jakarta')).strftime('%Y%m%d')
+    if feed["date"] == today and feed["lolos"] is not None:
+        return
+    snapshot = refresh_info_snapshot(universe_tickers(feed["trade_mode"]))
+    gate = fundamental_prefilter(snapshot)
+    lolos = gate.index[gate['Lolos']].tolist()
+    context = None
+    if feed["trade_mode"] == "Day Trading" and lolos:
+        context = context_lookup(get_daily_context(lolos))
+    feed.update(date=today, lolos=lolos, snapshot=snapshot, context=context,
+                labels=liquid_label_map(), panel=None, signatures={}, refreshed_at=None)
+
+def refresh_feed(feed, max_age=0):
+    """
+    Segarkan bar terbaru feed, kecuali refresh terakhir (oleh watcher mana pun)
+    berumur < max_age detik. Bar selalu diminta dengan min_age=0: irama siklus
+    sudah membatasi frekuensinya.
+    """
+    with feed["lock"]:
+        _prepare_universe(feed)
+        if feed["refreshed_at"] is not None and time.time() - feed["refreshed_at"] < max_age:
+            return feed
+        lolos = feed["lolos"]
+        interval = '15m' if feed["trade_mode"] == "Day Trading" else '1d'
+        panel = get_universe_panel(lolos, interval=interval, min_age=0) if lolos else None
+        feed.update(panel=panel, signatures=last_bar_signatures(panel) if panel is not None else {},
+                    refreshed_at=time.time())
+    return feed
+
+def _final_picks(state, sector_boost):
+    """Pilihan akhir siklus terakhir untuk bonus sektor ini (dihitung sekali per siklus)."""
+    sector_boost = bool(sector_boost)
+    if sector_boost not in state["picks"]:
+        state["picks"][sector_boost] = finalize_picks(state["board"], state["trade_mode"], sector_boost,
+                                                      top_n=state["top_n"])
+    final_picks, sector_report = state["picks"][sector_boost]
+    return {**state["last"], "final_picks": final_picks, "sector_report": sector_report}
+
+def watch_cycle(state, on_status=None, sector_boost=None, max_age=0):
+    """
+    Satu siklus pantau. Return dict final_picks, sector_report, cycle,
+    dinilai_ulang (jumlah ticker yang berubah), total, generated_at.
+    sector_boost None → default state; max_age diteruskan ke refresh_feed.
+    """
+    def status(text):
+        if on_status is not None:
+            on_status(text)
+
+    trade_mode = state["trade_mode"]
+    feed = refresh_feed(state["feed"], max_age=max_age)
+    if state["date"] != feed["date"]:
+        # Universe baru (hari bursa berganti) → hasil lama tidak berlaku
+        state.update(date=feed["date"], signatures={}, results={})
+    lolos, panel, signatures = feed["lolos"], feed["panel"], feed["signatures"]
+    changed = changed_tickers(signatures, state["signatures"])
+    status(f"{len(changed)} dari {len(lolos)} saham punya bar baru.")
+
+    if changed:
+        snapshot, context = feed["snapshot"], feed["context"]
+        load_item = make_loader(
+            lambda ticker: panel_history(panel, ticker),
+            lambda ticker: snapshot.loc[ticker].to_dict(),
+            context.get if context is not None else None,
+        )
+        results = state["results"]
+        for ticker in changed:
+            results.pop(ticker.replace(".JK", ""), None)
+        for _, batch_results in iter_scan(changed, load_item, trade_mode, state["mtf_filter"],
+                                          backend=state["backend"], batch_size=scan_batch_size(len(changed))):
+            if feed["labels"] is not None:
+                batch_results = apply_liquid_labels(batch_results, feed["labels"])
+            for stock in batch_results:
+                plan = build_trade_plan(stock, trade_mode)
+                results[stock['Ticker']] = (stock, plan['rrr'] >= MIN_RRR)
+        for ticker in changed:
+            state["signatures"][ticker] = signatures[ticker]
+
+    # Leaderboard dari hasil tersimpan (urut ticker agar seri skor deterministik)
+    board = new_leaderboard(k=state["top_n"])
+    for kode in sorted(state["results"]):
+        stock, eligible = state["results"][kode]
+        leaderboard_add(board, stock, eligible=eligible)
+
+    state["cycle"] += 1
+    state["updated_at"] = time.time()
+    state["board"] = board
+    state["picks"] = {}
+    state["last"] = {
+        "cycle": state["cycle"],
+        "dinilai_ulang": len(changed),
+        "total": len(lolos),
+        "generated_at": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(timespec='seconds'),
+    }
+    return _final_picks(state, state["sector_boost"] if sector_boost is None else sector_boost)
+
+
+# --- DIFF & ALERT ---
+def diff_picks(previous, current):
+    """
+    Perubahan pilihan akhir antar siklus:
+        baru    : masuk daftar
+        keluar  : keluar dari daftar
+        berubah : tetap di daftar tapi skornya berubah (Skor_Lama → Skor)
+    previous None → semua pilihan dianggap baru.
+    """
+    prev = {p['Ticker']: p for p in (previous or [])}
+    curr = {p['Ticker']: p for p in current}
+    return {
+        "baru": [p for t, p in curr.items() if t not in prev],
+        "keluar": [p for t, p in prev.items() if t not in curr],
+        "berubah": [
+            {**p, "Skor_Lama": prev[t]['Skor']}
+            for t, p in curr.items() if t in prev and prev[t]['Skor'] != p['Skor']
+        ],
+    }
+
+def alert_picks(diff):
+    """Pilihan BARU dengan skor FULL SIZING (≥ SCORE_FULL_SIZING) → pemicu alert suara."""
+    return [p for p in diff["baru"] if p['Skor'] >= SCORE_FULL_SIZING]
+
+
+# --- WATCHER BERSAMA ---
+def get_live_picks(trade_mode, mtf_filter=True, sector_boost=True, interval=WATCH_INTERVAL, on_status=None):
+    """
+    Hasil siklus terbaru watcher bersama. Siklus baru dijalankan hanya jika hasil
+    terakhir berumur >= interval detik; sesi lain yang bertanya bersamaan menunggu
+    siklus yang sama selesai (tidak menjalankan scan ganda). Watcher dibagi per
+    (trade_mode, mtf_filter) dan refresh bar per trade_mode; bonus sektor diterapkan
+    pada leaderboard bersama saat dipanggil.
+    """
+    key = (trade_mode, bool(mtf_filter))
+    with _WATCHERS_LOCK:
+        feed = _FEEDS.setdefault(trade_mode, new_feed(trade_mode))
+        state = _WATCHERS.setdefault(key, new_watch(trade_mode, mtf_filter, feed=feed))
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        if state["last"] is None or time.time() - state["updated_at"] >= interval:
+            watch_cycle(state, on_status=on_status, max_age=interval)
+        return _final_picks(state, sector_boost)
+
+def stop_watchers():
+    with _WATCHERS_LOCK:
+        _WATCHERS.clear()
+        _FEEDS.clear()
+
+
+def _print_diff(result, diff):
+    print(f"[{result['generated_at']}] siklus {result['cycle']}: "
+          f"{result['dinilai_ulang']}/{result['total']} dinilai ulang, {len(result['final_picks'])} pilihan")
+    for p in diff["baru"]:
+        alert = " 🔔" if p['Skor'] >= SCORE_FULL_SIZING else ""
+        print(f"  + {p['Ticker']} {p['Skor']}{alert}")
+    for p in diff["keluar"]:
+        print(f"  - {p['Ticker']} {p['Skor']}")
+    for p in diff["berubah"]:
+        print(f"  ~ {p['Ticker']} {p['Skor_Lama']} → {p['Skor']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mode pantau screening selama LIVE MARKET.")
+    parser.add_argument("--mode", choices=sorted(TRADE_MODES), default="day")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="Irama siklus (detik)")
+    parser.add_argument("--no-mtf", action="store_true")
+    parser.add_argument("--no-sector-boost", action="store_true")
+    parser.add_argument("--backend", choices=BACKENDS, default=None)
+    parser.add_argument("--once", action="store_true", help="Satu siklus saja (tanpa cek sesi)")
+    args = parser.parse_args(argv)
+
+    state = new_watch(TRADE_MODES[args.mode], not args.no_mtf, not args.no_sector_boost, backend=args.backend)
+    previous = None
+    try:
+        while True:
+            started = time.time()
+            result = watch_cycle(state)
+            _print_diff(result, diff_picks(previous, result["final_picks"]))
+            previous = result["final_picks"]
+            if args.once or get_market_session()[0] != "LIVE MARKET":
+                break
+            time.sleep(max(0.0, args.interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_process_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
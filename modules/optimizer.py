@@ -0,0 +1,234 @@
+"""
+Modul: optimizer.py
+Parameter sweep paralel untuk konstanta scoring & rencana trading, dinilai
+dengan backtest (modules.backtest) di atas panel harga historis.
+
+Pembagian kerja:
+    - Grid dipecah per kombinasi parameter FITUR (st_multiplier, rsi_window,
+      vol_spike): satu task = satu skor historis + semua kombinasi parameter
+      seleksi (sector_hot_min, sl_mult, rr_min, ...) yang hanya memakai ulang skor itu.
+    - Worker proses membuka panel .npy yang sama lewat memory-map (read-only),
+      jadi data harga tidak disalin ke tiap proses.
+    - Indikator yang tidak bergantung pada parameter yang di-sweep (ATR, MACD,
+      MA, PSAR, ...) disimpan di cache indikator per worker dan dipakai ulang
+      antar task; hanya Supertrend / RSI dengan parameter baru yang dihitung.
+
+Contoh:
+    python -m modules.optimizer --mode swing
+    python -m modules.optimizer --mode swing --objective Expectancy_R@85 --out sweep.csv
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import tempfile
+import concurrent.futures
+import concurrent.futures.process
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+try:
+    from modules.backtest import (
+        backtest_params, split_feature_params, score_history, sector_codes,
+        select_picks, simulate_trades, summarize, load_backtest_inputs,
+    )
+    from modules.screening_engine import TRADE_MODES
+except ModuleNotFoundError:
+    from backtest import (
+        backtest_params, split_feature_params, score_history, sector_codes,
+        select_picks, simulate_trades, summarize, load_backtest_inputs,
+    )
+    from screening_engine import TRADE_MODES
+
+# Grid bawaan: konstanta yang selama ini di-hardcode di screening
+DEFAULT_GRID = {
+    "st_multiplier": [2, 3],
+    "rsi_window": [9, 14],
+    "vol_spike": [1.2, 1.5],
+    "sector_hot_min": [65, 70, 75],
+    "sl_mult": [1.5, 2.0],
+    "rr_min": [1.5, 2.0],
+}
+
+DEFAULT_OBJECTIVE = "Expectancy_R@70"
+
+# Kombinasi dengan trade terlalu sedikit tidak bisa dipercaya → diranking paling bawah
+MIN_TRADES = 30
+
+# State worker: panel (mmap read-only) + cache indikator, dibuat sekali per proses
+_WORKER = {}
+
+
+# --- GRID ---
+def expand_grid(grid):
+    """dict nama → list nilai  →  list dict kombinasi (produk kartesius)."""
+    names = sorted(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(grid[n] for n in names))]
+
+def group_by_features(trade_mode, combos):
+    """Kelompokkan kombinasi per parameter fitur: {tuple fitur: [kombinasi, ...]}."""
+    groups = {}
+    for combo in combos:
+        key = tuple(sorted(split_feature_params(trade_mode, combo).items()))
+        groups.setdefault(key, []).append(combo)
+    return groups
+
+
+# --- WORKER ---
+def _init_worker(values_path, dates_ns, tickers, trade_mode, context):
+    values = np.load(values_path, mmap_mode='r')
+    codes, _ = sector_codes(tickers)
+    _WORKER.clear()
+    _WORKER.update({
+        "values": values, "dates": pd.DatetimeIndex(np.asarray(dates_ns, dtype='datetime64[ns]')),
+        "codes": codes, "trade_mode": trade_mode, "context": context, "cache": {},
+    })
+
+def _flatten_summary(summary):
+    row = {}
+    for threshold, metrics in summary.iterrows():
+        for name, value in metrics.items():
+            row[f"{name}@{threshold}"] = value
+    return row
+
+def evaluate_feature_group(feature_key, combos):
+    """Task worker: satu skor historis untuk `feature_key`, lalu semua kombinasi seleksinya."""
+    w = _WORKER
+    trade_mode = w["trade_mode"]
+    rows = []
+    histories = {}
+    for combo in combos:
+        params = backtest_params(trade_mode, **combo)
+        if params['mtf_filter'] not in histories:
+            histories[params['mtf_filter']] = score_history(
+                w["values"], trade_mode, params['mtf_filter'], w["context"],
+                params=dict(feature_key), cache=w["cache"],
+            )
+        selection = select_picks(histories[params['mtf_filter']], w["codes"], params)
+        trades = simulate_trades(w["values"], w["dates"], selection, params)
+        rows.append({**combo, **_flatten_summary(summarize(trades, params['thresholds']))})
+    return rows
+
+
+# --- SWEEP ---
+def _values_file(values):
+    """Path .npy panel untuk di-mmap worker (array di memori ditulis ke file sementara)."""
+    path = getattr(values, "filename", None)
+    if path and str(path).endswith(".npy"):
+        return str(path), None
+    fd, path = tempfile.mkstemp(suffix=".npy")
+    os.close(fd)
+    np.save(path, np.ascontiguousarray(values, dtype=np.float64))
+    return path, path
+
+def rank_results(rows, objective=DEFAULT_OBJECTIVE, min_trades=MIN_TRADES):
+    """Tabel hasil diurutkan dari objective tertinggi (kombinasi minim trade di bawah)."""
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    if objective not in table.columns:
+        raise ValueError(f"Objective tidak dikenal: {objective}")
+    threshold = objective.split("@", 1)[1] if "@" in objective else None
+    trades_col = f"Jumlah_Trade@{threshold}" if threshold else None
+    enough = table[trades_col] >= min_trades if trades_col in table.columns else True
+    table = table.assign(_cukup=enough).sort_values(
+        ["_cukup", objective], ascending=[False, False], na_position="last", kind="stable"
+    ).drop(columns="_cukup")
+    table.insert(0, "Rank", np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+def run_sweep(values, dates, tickers, trade_mode, grid=None, context=None, max_workers=None,
+              objective=DEFAULT_OBJECTIVE, min_trades=MIN_TRADES, on_progress=None):
+    """
+    Mengevaluasi seluruh grid parameter di pool proses.
+
+    max_workers=1 → dijalankan langsung di proses ini (tanpa pool).
+    on_progress(selesai, total) dipanggil setiap task (kelompok fitur) selesai.
+    Return DataFrame hasil yang sudah diranking (lihat rank_results).
+    """
+    grid = DEFAULT_GRID if grid is None else grid
+    combos = expand_grid(grid)
+    for combo in combos:
+        backtest_params(trade_mode, **combo)  # validasi nama parameter lebih awal
+    groups = group_by_features(trade_mode, combos)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    values_path, temp_path = _values_file(values)
+    init_args = (values_path, pd.DatetimeIndex(dates).asi8, list(tickers), trade_mode, context)
+    rows = []
+    try:
+        if max_workers == 1:
+            _init_worker(*init_args)
+            for done, (key, group) in enumerate(groups.items(), start=1):
+                rows.extend(evaluate_feature_group(key, group))
+                if on_progress is not None:
+                    on_progress(done, len(groups))
+        else:
+            try:
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=min(max_workers, len(groups)),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=init_args,
+                ) as executor:
+                    futures = {executor.submit(evaluate_feature_group, key, group): i
+                               for i, (key, group) in enumerate(groups.items())}
+                    by_task = {}
+                    for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                        by_task[futures[future]] = future.result()
+                        if on_progress is not None:
+                            on_progress(done, len(groups))
+                    # Urutan baris mengikuti grid (bukan urutan selesai) agar ranking deterministik
+                    for i in sorted(by_task):
+                        rows.extend(by_task[i])
+            except concurrent.futures.process.BrokenProcessPool as e:
+                print(f"Peringatan: Pool proses optimizer rusak, dijalankan di proses utama. Detail: {e}")
+                return run_sweep(values, dates, tickers, trade_mode, grid, context, 1, objective, min_trades, on_progress)
+    finally:
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    return rank_results(rows, objective, min_trades)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parameter sweep scoring screening (paralel).")
+    parser.add_argument("--mode", choices=sorted(TRADE_MODES), default="swing")
+    parser.add_argument("--grid", help='Grid JSON, mis. \'{"st_multiplier": [2, 3], "rr_min": [1.5, 2]}\'')
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--objective", default=DEFAULT_OBJECTIVE,
+                        help="Kolom ranking, mis. Expectancy_R@70, Hit_Rate@85")
+    parser.add_argument("--min-trades", type=int, default=MIN_TRADES)
+    parser.add_argument("--top", type=int, default=15, help="Jumlah baris yang dicetak")
+    parser.add_argument("--out", help="Simpan tabel lengkap (.csv / .parquet)")
+    args = parser.parse_args(argv)
+
+    trade_mode = TRADE_MODES[args.mode]
+    grid = json.loads(args.grid) if args.grid else DEFAULT_GRID
+
+    started = time.perf_counter()
+    panel, context = load_backtest_inputs(trade_mode)
+    table = run_sweep(
+        panel["values"], panel["dates"], panel["tickers"], trade_mode, grid, context,
+        max_workers=args.workers, objective=args.objective, min_trades=args.min_trades,
+        on_progress=lambda done, total: print(f"  {done}/{total} kelompok parameter fitur selesai"),
+    )
+    print(f"Sweep {trade_mode}: {len(table)} kombinasi ({time.perf_counter() - started:.1f} detik)")
+    print(table.head(args.top).round(3).to_string(index=False))
+
+    if args.out:
+        if args.out.endswith(".csv"):
+            table.to_csv(args.out, index=False)
+        else:
+            table.to_parquet(args.out, index=False)
+        print(f"   → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
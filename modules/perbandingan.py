@@ -5,6 +5,7 @@ import base64
 from fpdf import FPDF
 from datetime import datetime
 from modules.data_loader import get_full_stock_data, hitung_div_yield_normal
+from modules.indicators import compute_indicator
 
 # --- FUNGSI PDF MENGGUNAKAN FPDF ---
 def generate_pdf_fpdf(data, logo_path="logo_expert_stock_pro.png"):
@@ -150,8 +151,8 @@ def run_perbandingan():
             t1 = tk1 if tk1.endswith(".JK") else f"{tk1}.JK"
             t2 = tk2 if tk2.endswith(".JK") else f"{tk2}.JK"
             
-            data1 = get_full_stock_data(t1)
-            data2 = get_full_stock_data(t2)
+            data1 = get_full_stock_data(t1, components={"history", "info"})
+            data2 = get_full_stock_data(t2, components={"history", "info"})
             
             if not data1['info'] or not data2['info']:
                 st.error("Gagal mengambil data salah satu saham. Cek koneksi atau kode ticker.")
@@ -161,15 +162,15 @@ def run_perbandingan():
             h1, h2 = data1['history'], data2['history']
 
             # --- KALKULASI TEKNIKAL & SL 8% ---
-            def get_tech_status(df):
+            def get_tech_status(df, ticker):
                 curr = df['Close'].iloc[-1]
-                ma200 = df['Close'].rolling(200).mean().iloc[-1]
+                ma200 = compute_indicator(df, 'sma', ticker, '1d', window=200)[-1]
                 return "Bullish 🐂" if curr > ma200 else "Bearish 🐻"
 
-            def get_sl_cap(df):
+            def get_sl_cap(df, ticker):
                 curr = df['Close'].iloc[-1]
-                atr = (df['High'] - df['Low']).tail(14).mean()
-                sl_atr = curr - (1.5 * atr)
+                atr_val = compute_indicator(df, 'atr', ticker, '1d', period=14)[-1]
+                sl_atr = curr - (1.5 * atr_val)
                 return max(sl_atr, curr * 0.92) # LOCK 8%
 
             # --- KONSTRUKSI TABEL PERBANDINGAN ---
@@ -187,8 +188,8 @@ def run_perbandingan():
                     f"{i1.get('revenueGrowth', 0)*100:.1f}%",
                     f"{i1.get('profitMargins', 0)*100:.1f}%",
                     f"{hitung_div_yield_normal(i1):.2f}%",
-                    get_tech_status(h1),
-                    f"Rp {get_sl_cap(h1):,.0f}"
+                    get_tech_status(h1, t1),
+                    f"Rp {get_sl_cap(h1, t1):,.0f}"
                 ],
                 tk2: [
                     f"Rp {i2.get('marketCap', 0)/1e12:,.1f} T",
@@ -199,8 +200,8 @@ def run_perbandingan():
                     f"{i2.get('revenueGrowth', 0)*100:.1f}%",
                     f"{i2.get('profitMargins', 0)*100:.1f}%",
                     f"{hitung_div_yield_normal(i2):.2f}%",
-                    get_tech_status(h2),
-                    f"Rp {get_sl_cap(h2):,.0f}"
+                    get_tech_status(h2, t2),
+                    f"Rp {get_sl_cap(h2, t2):,.0f}"
                 ]
             }
 
@@ -227,10 +228,10 @@ def run_perbandingan():
             st.subheader(f"Saham mana yang paling worth it untuk dibeli SEKARANG?")
             
             # Logika "Worth It" (Valuasi + Trend)
-            if get_tech_status(h1) == "Bullish 🐂" and i1.get('trailingPE', 99) < 20:
+            if get_tech_status(h1, t1) == "Bullish 🐂" and i1.get('trailingPE', 99) < 20:
                 best = tk1
                 reason = f"{tk1} sedang dalam fase Bullish dengan valuasi PER yang masih masuk akal."
-            elif get_tech_status(h2) == "Bullish 🐂" and i2.get('trailingPE', 99) < 20:
+            elif get_tech_status(h2, t2) == "Bullish 🐂" and i2.get('trailingPE', 99) < 20:
                 best = tk2
                 reason = f"{tk2} memiliki momentum teknikal kuat didukung fundamental solid."
             else:
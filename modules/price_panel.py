@@ -0,0 +1,221 @@
+"""
+Modul: price_panel.py
+Panel harga padat seluruh universe: array NumPy berdimensi (ticker × waktu × field)
+yang disimpan sebagai file .npy dan dibuka via memory-map.
+
+Karena dibuka read-only lewat mmap, beberapa proses worker Streamlit berbagi satu
+salinan fisik (page cache OS) alih-alih masing-masing membangun ~200 DataFrame.
+
+Contoh:
+    panel = get_universe_panel(tickers, '1d')   # file: <DATA_DIR>/panel/1d-<hash ticker>.json
+    close_60 = panel['values'][:, -60:, CLOSE]
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    from modules.price_store import DATA_DIR, OHLCV_COLUMNS, MIN_REFRESH_AGE, refresh_many, store_mtime, load_history
+    from modules.universe import ticker_ids
+except ModuleNotFoundError:
+    from price_store import DATA_DIR, OHLCV_COLUMNS, MIN_REFRESH_AGE, refresh_many, store_mtime, load_history
+    from universe import ticker_ids
+
+PANEL_DIR = os.path.join(DATA_DIR, "panel")
+
+# Indeks field pada sumbu ketiga panel
+FIELDS = tuple(OHLCV_COLUMNS)
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(FIELDS))
+
+# Cache panel yang sudah dibuka di proses ini: key panel → (mtime meta, panel)
+_OPEN_PANELS = {}
+
+
+# --- FUNGSI PEMBANTU (Helper) ---
+def panel_key(interval, tickers):
+    """
+    Nama panel = interval + hash susunan ticker, sehingga set ticker berbeda
+    (Swing vs Day, --tickers CLI, backtest) punya panel sendiri dan tidak saling timpa.
+    """
+    digest = hashlib.sha1("\n".join(sorted(set(tickers))).encode()).hexdigest()[:12]
+    return f"{interval}-{digest}"
+
+def _meta_path(key):
+    return os.path.join(PANEL_DIR, f"{key}.json")
+
+def _trading_index(histories):
+    """Indeks hari bursa bersama = gabungan semua timestamp yang pernah ada transaksi."""
+    index = pd.DatetimeIndex([])
+    for df in histories.values():
+        index = index.union(df.index)
+    return index.sort_values()
+
+
+# --- BANGUN & BUKA PANEL ---
+def build_panel(histories, interval='1d', key=None, base=None, reuse=()):
+    """
+    Menyusun panel dari dict {ticker: DataFrame OHLCV} lalu menulisnya ke disk.
+    Sel tanpa transaksi (belum listing / suspensi) diisi NaN.
+
+    base + reuse: baris ticker `reuse` disalin langsung dari panel lama `base`
+    (file store-nya tidak berubah sejak panel itu dibangun), jadi parquet-nya tidak perlu dibaca.
+    """
+    reuse = [t for t in reuse if base is not None and t in base["ticker_index"] and t not in histories]
+    tickers = sorted(set(histories) | set(reuse))
+    key = key or panel_key(interval, tickers)
+    dates = _trading_index(histories)
+    if reuse:
+        rows = [base["ticker_index"][t] for t in reuse]
+        has_data = ~np.isnan(base["values"][rows][:, :, CLOSE]).all(axis=0)
+        dates = dates.union(base["dates"][has_data]).sort_values()
+    os.makedirs(PANEL_DIR, exist_ok=True)
+
+    # Nama file unik per build: pembaca lama tetap memegang mmap file sebelumnya
+    version = f"{key}-{time.time_ns()}"
+    values_file = f"{version}.npy"
+    values = np.lib.format.open_memmap(
+        os.path.join(PANEL_DIR, values_file), mode='w+',
+        dtype=np.float64, shape=(len(tickers), len(dates), len(FIELDS))
+    )
+    values[:] = np.nan
+    base_pos = dates.get_indexer(base["dates"]) if reuse else None
+    for i, ticker in enumerate(tickers):
+        if ticker in histories:
+            df = histories[ticker].reindex(columns=list(FIELDS))
+            pos = dates.get_indexer(df.index)
+            values[i, pos, :] = df.to_numpy(dtype=np.float64)
+        else:
+            row = base["values"][base["ticker_index"][ticker]]
+            keep = base_pos >= 0
+            values[i, base_pos[keep], :] = row[keep]
+    values.flush()
+    del values
+
+    meta = {
+        "version": version,
+        "interval": interval,
+        "values_file": values_file,
+        "tickers": tickers,
+        "dates": [int(d) for d in dates.as_unit('ns').asi8],
+    }
+    tmp_meta = f"{_meta_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_meta, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_meta, _meta_path(key))
+
+    _cleanup_old_files(key, keep={values_file})
+    return _open_panel(key)
+
+def _cleanup_old_files(key, keep):
+    """
+    Hapus file panel lama milik key ini (mmap yang masih terbuka tetap aman di Linux).
+    Hanya file yang lebih tua dari meta terkini: .npy yang baru ditulis proses lain
+    tetapi meta-nya belum dipublikasikan tidak ikut terhapus.
+    """
+    try:
+        published = os.path.getmtime(_meta_path(key))
+    except OSError:
+        return
+    for name in os.listdir(PANEL_DIR):
+        if not (name.startswith(f"{key}-") and name.endswith(".npy")) or name in keep:
+            continue
+        path = os.path.join(PANEL_DIR, name)
+        try:
+            if os.path.getmtime(path) < published:
+                os.remove(path)
+        except OSError:
+            pass
+
+def load_panel(interval, tickers):
+    """
+    Membuka panel untuk susunan `tickers` (read-only, memory-mapped).
+    Return None jika belum pernah dibangun.
+
+    Isi dict:
+        values       : np.memmap (ticker × waktu × field)
+        tickers      : list ticker sesuai urutan sumbu pertama
+        ticker_index : dict ticker → posisi
+        universe_ids : array ID indeks universe per baris (SECTOR_CODES[ids], dst.)
+        dates        : pd.DatetimeIndex sumbu kedua
+        version      : penanda build (berubah setiap panel dibangun ulang)
+    """
+    return _open_panel(panel_key(interval, tickers))
+
+def _open_panel(key):
+    meta_path = _meta_path(key)
+    if not os.path.exists(meta_path):
+        return None
+
+    mtime = os.path.getmtime(meta_path)
+    cached = _OPEN_PANELS.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        values = np.load(os.path.join(PANEL_DIR, meta["values_file"]), mmap_mode='r')
+    except Exception as e:
+        print(f"Peringatan: Panel {key} tidak bisa dibuka. Detail: {e}")
+        return None
+
+    panel = {
+        "values": values,
+        "tickers": meta["tickers"],
+        "ticker_index": {t: i for i, t in enumerate(meta["tickers"])},
+        "universe_ids": ticker_ids(meta["tickers"]),
+        "dates": pd.DatetimeIndex(np.array(meta["dates"], dtype='datetime64[ns]')),
+        "version": meta["version"],
+        "built_at": mtime,
+    }
+    _OPEN_PANELS[key] = (mtime, panel)
+    return panel
+
+def get_universe_panel(tickers, interval='1d', min_age=MIN_REFRESH_AGE):
+    """
+    Menyegarkan store untuk `tickers`, lalu membangun ulang panel hanya jika
+    ada data baru atau susunan ticker berubah. Selain itu cukup membuka mmap lama.
+    `min_age` diteruskan ke refresh_many (0 = paksa cek bar baru).
+
+    Kesegaran dicek dari mtime file store (tanpa membaca parquet); hanya ticker
+    yang perlu diunduh, atau yang berubah sejak panel terakhir, yang dibaca dari disk.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    panel = load_panel(interval, tickers)
+
+    now = time.time()
+    stale = [t for t in tickers if (mtime := store_mtime(t, interval)) is None or now - mtime >= min_age]
+    histories = refresh_many(stale, interval=interval, min_age=min_age) if stale else {}
+
+    mtimes = {t: mtime for t in tickers if (mtime := store_mtime(t, interval)) is not None}
+    if not mtimes:
+        return panel
+    if panel is not None and set(panel["tickers"]) == set(mtimes) and max(mtimes.values()) <= panel["built_at"]:
+        return panel
+
+    # Ticker yang file-nya tidak berubah sejak panel lama dibangun → baris disalin dari panel lama
+    unchanged = set()
+    if panel is not None:
+        unchanged = {t for t, m in mtimes.items() if m <= panel["built_at"] and t in panel["ticker_index"]}
+    for ticker in mtimes:
+        if ticker not in histories and ticker not in unchanged:
+            df = load_history(ticker, interval)
+            if not df.empty:
+                histories[ticker] = df
+    histories = {t: df for t, df in histories.items() if t in mtimes and not df.empty}
+    return build_panel(histories, interval, key=panel_key(interval, tickers), base=panel,
+                       reuse=sorted(unchanged - set(histories)))
+
+def panel_history(panel, ticker):
+    """DataFrame OHLCV satu ticker dari panel (baris tanpa transaksi dibuang)."""
+    pos = panel["ticker_index"].get(ticker)
+    if pos is None:
+        return pd.DataFrame(columns=list(FIELDS))
+    block = panel["values"][pos]
+    valid = ~np.isnan(block[:, CLOSE])
+    return pd.DataFrame(block[valid], index=panel["dates"][valid], columns=list(FIELDS))
@@ -0,0 +1,223 @@
+"""
+Modul: price_store.py
+Penyimpanan OHLCV lokal (Parquet) per ticker & interval dengan refresh inkremental.
+
+Struktur file : <DATA_DIR>/ohlcv/<interval>/<TICKER>.parquet
+Refresh       : hanya meminta bar yang lebih baru dari timestamp terakhir yang
+                tersimpan, lalu di-append (bar terakhir ikut ditimpa karena bisa
+                saja masih berjalan/belum final). Bar final sebelumnya ikut diminta
+                sebagai pembanding: jika Close-nya berbeda (dividen/split membuat
+                Yahoo menyesuaikan ulang harga lama), seluruh window diunduh ulang.
+
+Catatan: modul ini sengaja tidak meng-import streamlit maupun modul lain di
+package `modules`, supaya bisa dipakai juga oleh skrip universe_generator.
+"""
+
+import os
+import time
+import threading
+import pandas as pd
+import yfinance as yf
+
+try:
+    from modules.config import DATA_DIR
+except ModuleNotFoundError:
+    from config import DATA_DIR
+
+OHLCV_DIR = os.path.join(DATA_DIR, "ohlcv")
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Sesuaikan period otomatis berdasarkan interval
+# (interval pendek butuh period lebih singkat agar tidak error di yfinance)
+PERIOD_MAP = {
+    '1m': '7d', '2m': '60d', '5m': '60d',
+    '15m': '60d', '30m': '60d', '60m': '730d',
+    '90m': '60d', '1h': '730d',
+    '1d': '2y', '5d': '2y', '1wk': '5y',
+    '1mo': '10y', '3mo': '10y'
+}
+
+# Jumlah ticker per request multi-ticker ke Yahoo (terlalu besar → rawan timeout)
+BATCH_CHUNK_SIZE = 50
+
+# File yang baru di-refresh (detik) tidak perlu menghubungi Yahoo lagi
+MIN_REFRESH_AGE = 15 * 60
+
+# Toleransi relatif perbandingan Close bar pembanding (penyesuaian dividen/split)
+ADJUST_TOLERANCE = 1e-4
+
+
+# --- FUNGSI PEMBANTU (Helper) ---
+def period_to_timedelta(period):
+    """'60d' → 60 hari, '2y' → 730 hari, '5y', '1wk', '10y', dst."""
+    units = {'d': 1, 'wk': 7, 'mo': 31, 'y': 365}
+    for suffix, days in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return pd.Timedelta(days=int(period[:-len(suffix)]) * days)
+    return pd.Timedelta(days=730)
+
+def _store_path(ticker, interval):
+    return os.path.join(OHLCV_DIR, interval, f"{ticker.upper()}.parquet")
+
+def _normalize_frame(df):
+    """Samakan format: index tanpa timezone, kolom OHLCV saja, urut & unik."""
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].dropna(how='all')
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = 'Date'
+    df.columns.name = None
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+def _split_batch_frame(raw, chunk):
+    """Memecah hasil yf.download multi-ticker menjadi DataFrame per ticker."""
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+
+    for ticker in chunk:
+        try:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
+                    continue
+                df = raw[ticker]
+            else:
+                # yfinance lama mengembalikan kolom datar jika hanya 1 ticker
+                df = raw
+            df = _normalize_frame(df)
+            if not df.empty:
+                frames[ticker] = df
+        except Exception as e:
+            print(f"Peringatan: Gagal memecah data batch untuk {ticker}. Detail: {e}")
+    return frames
+
+def _download_chunks(tickers, interval, chunk_size, **kwargs):
+    """yf.download per potongan `chunk_size` ticker, hasilnya dict per ticker."""
+    frames = {}
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        try:
+            raw = yf.download(
+                chunk, interval=interval, group_by='ticker',
+                auto_adjust=True, actions=False, threads=True, progress=False,
+                **kwargs
+            )
+            frames.update(_split_batch_frame(raw, chunk))
+        except Exception as e:
+            print(f"Peringatan: Gagal download batch {chunk[0]}..{chunk[-1]}. Detail: {e}")
+    return frames
+
+
+# --- BACA / TULIS STORE ---
+def load_history(ticker, interval='1d'):
+    """Membaca history yang tersimpan di disk (DataFrame kosong jika belum ada)."""
+    path = _store_path(ticker, interval)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"Peringatan: File store {path} rusak, akan diunduh ulang. Detail: {e}")
+        return pd.DataFrame()
+
+def save_history(ticker, interval, df):
+    """Menulis history secara atomik (tulis file sementara lalu rename)."""
+    path = _store_path(ticker, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+def _adjustment_changed(stored, new_bars):
+    """
+    True jika bar final yang ada di stored & new_bars (selain bar terakhir stored
+    yang mungkin masih berjalan) punya Close berbeda → harga lama perlu disesuaikan ulang.
+    """
+    overlap = stored.index[:-1].intersection(new_bars.index)
+    if overlap.empty or 'Close' not in stored or 'Close' not in new_bars:
+        return False
+    ref = overlap[-1]
+    old, new = stored.at[ref, 'Close'], new_bars.at[ref, 'Close']
+    if pd.isna(old) or pd.isna(new):
+        return False
+    return abs(new - old) > ADJUST_TOLERANCE * max(abs(old), 1e-9)
+
+def store_mtime(ticker, interval='1d'):
+    """Waktu terakhir file store ditulis (None jika belum pernah disimpan)."""
+    try:
+        return os.path.getmtime(_store_path(ticker, interval))
+    except OSError:
+        return None
+
+def last_refresh_age(ticker, interval='1d'):
+    """Umur file store dalam detik (None jika belum pernah disimpan)."""
+    mtime = store_mtime(ticker, interval)
+    return None if mtime is None else time.time() - mtime
+
+
+# --- REFRESH INKREMENTAL ---
+def refresh_many(tickers, interval='1d', chunk_size=BATCH_CHUNK_SIZE, min_age=MIN_REFRESH_AGE):
+    """
+    Menyegarkan store untuk banyak ticker sekaligus lalu mengembalikan
+    dict {ticker: DataFrame OHLCV} sepanjang period standar interval tsb.
+
+    - Ticker yang file-nya masih segar (< min_age detik) tidak diunduh ulang.
+    - Ticker yang sudah punya data hanya meminta bar sejak tanggal bar final
+      terakhir; jika Close bar itu sudah berbeda (dividen/split), window diunduh penuh.
+    - Ticker baru (atau data terlalu tua untuk interval intraday) diunduh penuh.
+    Ticker dikelompokkan per tanggal mulai agar tetap memakai request multi-ticker.
+    """
+    period = PERIOD_MAP.get(interval, '2y')
+    window = period_to_timedelta(period)
+    now = pd.Timestamp.now()
+
+    stored = {}
+    full_fetch = []
+    incremental = {}  # tanggal mulai → list ticker
+
+    for ticker in dict.fromkeys(tickers):
+        df = load_history(ticker, interval)
+        stored[ticker] = df
+        age = last_refresh_age(ticker, interval)
+        if not df.empty and age is not None and age < min_age:
+            continue
+        if df.empty or df.index[-1] < now - window:
+            full_fetch.append(ticker)
+        else:
+            # Mulai dari bar final sebelum bar terakhir → jadi pembanding penyesuaian harga
+            ref = df.index[-2] if len(df) > 1 else df.index[-1]
+            incremental.setdefault(ref.strftime('%Y-%m-%d'), []).append(ticker)
+
+    fresh = _download_chunks(full_fetch, interval, chunk_size, period=period)
+    readjust = []
+    for start, group in incremental.items():
+        for ticker, new_bars in _download_chunks(group, interval, chunk_size, start=start).items():
+            if _adjustment_changed(stored[ticker], new_bars):
+                readjust.append(ticker)
+            else:
+                fresh[ticker] = new_bars
+    if readjust:
+        replaced = _download_chunks(readjust, interval, chunk_size, period=period)
+        fresh.update(replaced)
+        for ticker in replaced:
+            stored[ticker] = pd.DataFrame()
+
+    results = {}
+    for ticker, df in stored.items():
+        new_bars = fresh.get(ticker)
+        if new_bars is not None:
+            df = _normalize_frame(pd.concat([df, new_bars])) if not df.empty else new_bars
+            df = df[df.index >= df.index[-1] - window]
+            try:
+                save_history(ticker, interval, df)
+            except Exception as e:
+                print(f"Peringatan: Gagal menyimpan store {ticker} ({interval}). Detail: {e}")
+        if not df.empty:
+            results[ticker] = df
+
+    return results
+
+def refresh_history(ticker, interval='1d', min_age=MIN_REFRESH_AGE):
+    """Versi satu ticker dari refresh_many (DataFrame kosong jika gagal)."""
+    return refresh_many([ticker], interval=interval, chunk_size=1, min_age=min_age).get(ticker, pd.DataFrame())
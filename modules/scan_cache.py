@@ -0,0 +1,226 @@
+"""
+Modul: scan_cache.py
+Cache hasil screening yang dipakai bersama oleh semua sesi (server-side).
+
+Hasil run_scan hanya bergantung pada (trade_mode, mtf_filter, sector_boost) dan
+versi data pasar — bukan pada modal user. Maka scan universe cukup dijalankan
+sekali per versi data; setiap sesi hanya menerapkan position sizing miliknya
+sendiri (apply_position_sizing) di atas hasil bersama.
+
+Lapisan cache:
+    1. Memori proses   : dict key → hasil (langsung dipakai sesi lain di worker yang sama)
+    2. Disk (JSON)     : <DATA_DIR>/screening/cache/*.json, dibaca worker/proses lain
+    3. Single-flight   : lock per key di dalam proses + flock pada lock file antar proses,
+                         sehingga klik bersamaan tidak memicu scan identik berkali-kali.
+                         Kernel melepas flock saat proses pemegangnya mati, jadi lock
+                         tidak pernah "basi" & tidak perlu diambil alih berdasarkan umur.
+
+Versi data:
+    - LIVE MARKET : jendela refresh harga (MIN_REFRESH_AGE, 15 menit) sejak 09:00 WIB
+    - di luar jam bursa: tanggal + sesi (data tidak berubah sampai sesi berikutnya)
+
+Catatan: seperti screening_engine, modul ini tidak meng-import streamlit.
+"""
+
+import os
+import glob
+import time
+import threading
+from datetime import datetime
+import pytz
+
+try:
+    import fcntl
+except ImportError:
+    # Tanpa flock (Windows): single-flight hanya berlaku di dalam satu proses
+    fcntl = None
+
+try:
+    from modules.price_store import MIN_REFRESH_AGE
+    from modules.screening_engine import (
+        SNAPSHOT_DIR, get_market_session, run_scan, write_snapshot, read_snapshot
+    )
+except ModuleNotFoundError:
+    from price_store import MIN_REFRESH_AGE
+    from screening_engine import (
+        SNAPSHOT_DIR, get_market_session, run_scan, write_snapshot, read_snapshot
+    )
+
+RESULT_CACHE_DIR = os.path.join(SNAPSHOT_DIR, "cache")
+
+LOCK_POLL_INTERVAL = 1.0
+
+# Hasil di memori proses: key → dict hasil run_scan
+_RESULTS = {}
+_RESULTS_LOCK = threading.Lock()
+_KEY_LOCKS = {}
+
+# Lock file yang sedang dipegang proses ini: path → file descriptor
+_HELD_LOCKS = {}
+
+
+# --- VERSI DATA & KEY ---
+def data_version():
+    """
+    Versi data pasar saat ini. Dua scan dengan versi sama akan membaca data harga
+    yang sama (store tidak menyegarkan ticker yang umurnya < MIN_REFRESH_AGE).
+    """
+    tz = pytz.timezone('Asia/Jakarta')
+    now = datetime.now(tz)
+    session, _ = get_market_session()
+    if session == "LIVE MARKET":
+        market_open = now.replace(hour=9, minute=0, second=0, microsecond=0)
+        bucket = int((now - market_open).total_seconds() // MIN_REFRESH_AGE)
+        return f"{now:%Y%m%d}-live{bucket:02d}"
+    return f"{now:%Y%m%d}-{session.lower().replace(' ', '-')}"
+
+def cache_key(trade_mode, mtf_filter, sector_boost, version=None):
+    return (trade_mode, bool(mtf_filter), bool(sector_boost), version or data_version())
+
+def _cache_prefix(key):
+    trade_mode, mtf_filter, sector_boost, _ = key
+    mode_key = "day" if trade_mode == "Day Trading" else "swing"
+    return os.path.join(RESULT_CACHE_DIR, f"{mode_key}_mtf{int(mtf_filter)}_boost{int(sector_boost)}")
+
+def _cache_path(key):
+    return f"{_cache_prefix(key)}_{key[3]}.json"
+
+
+# --- LOCK ANTAR PROSES ---
+def try_file_lock(lock_path):
+    """
+    True jika lock berhasil diambil proses ini (flock non-blocking pada lock_path).
+    Lock dilepas lewat release_file_lock, atau otomatis oleh kernel jika proses mati.
+    """
+    if fcntl is None:
+        return True
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # Pemegang sebelumnya bisa saja menghapus file tepat sebelum flock di atas
+        # berhasil → lock pada inode lama tidak berarti apa-apa
+        if os.fstat(fd).st_ino != os.stat(lock_path).st_ino:
+            raise BlockingIOError
+    except OSError:
+        os.close(fd)
+        return False
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode())
+    with _RESULTS_LOCK:
+        _HELD_LOCKS[lock_path] = fd
+    return True
+
+def release_file_lock(lock_path):
+    """Lepas lock milik proses ini (file dihapus selagi lock masih dipegang)."""
+    with _RESULTS_LOCK:
+        fd = _HELD_LOCKS.pop(lock_path, None)
+    if fd is None:
+        return
+    try:
+        os.remove(lock_path)
+    except OSError:
+        pass
+    os.close(fd)
+
+
+# --- CACHE HASIL ---
+def _load_cached(key):
+    with _RESULTS_LOCK:
+        result = _RESULTS.get(key)
+    if result is not None:
+        return result
+
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        result = read_snapshot(path)
+    except Exception as e:
+        print(f"Peringatan: Cache hasil screening rusak, scan ulang. Detail: {e}")
+        return None
+    _store(key, result)
+    return result
+
+def _store(key, result):
+    with _RESULTS_LOCK:
+        # Versi lama untuk kombinasi parameter yang sama tidak akan dipakai lagi
+        for old_key in [k for k in _RESULTS if k[:3] == key[:3] and k != key]:
+            del _RESULTS[old_key]
+        _RESULTS[key] = result
+
+def _prune_disk(key):
+    current = _cache_path(key)
+    for path in glob.glob(f"{_cache_prefix(key)}_*.json"):
+        if path != current:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def get_scan_result(trade_mode, mtf_filter=True, sector_boost=True, on_status=None, on_batch=None,
+                    version=None, **scan_kwargs):
+    """
+    Hasil run_scan untuk kombinasi parameter & versi data saat ini.
+
+    - Cache hit (memori / disk)   : langsung dikembalikan, tanpa scan.
+    - Sesi lain sedang scan key sama: menunggu hasilnya (on_status diberi kabar).
+    - Selain itu                   : menjalankan run_scan, lalu menyimpan hasilnya.
+
+    Hasil dipakai bersama antar sesi → perlakukan sebagai read-only
+    (position sizing dilakukan lewat apply_position_sizing yang membuat salinan).
+    """
+    key = cache_key(trade_mode, mtf_filter, sector_boost, version)
+    result = _load_cached(key)
+    if result is not None:
+        return result
+
+    with _RESULTS_LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Sesi lain di proses ini mungkin baru saja menyelesaikan scan yang sama
+        result = _load_cached(key)
+        if result is not None:
+            return result
+
+        lock_path = _cache_path(key) + ".lock"
+        waiting_reported = False
+        while not try_file_lock(lock_path):
+            if on_status is not None and not waiting_reported:
+                on_status("Menunggu hasil screening yang sedang berjalan di proses lain...")
+                waiting_reported = True
+            time.sleep(LOCK_POLL_INTERVAL)
+            result = _load_cached(key)
+            if result is not None:
+                return result
+
+        try:
+            result = _load_cached(key)
+            if result is not None:
+                return result
+            result = run_scan(trade_mode, mtf_filter, sector_boost,
+                              on_status=on_status, on_batch=on_batch, **scan_kwargs)
+            result = {**result, "data_version": key[3]}
+            _store(key, result)
+            try:
+                write_snapshot(result, out=_cache_path(key))
+                _prune_disk(key)
+            except Exception as e:
+                print(f"Peringatan: Gagal menyimpan cache hasil screening. Detail: {e}")
+            return result
+        finally:
+            release_file_lock(lock_path)
+            with _RESULTS_LOCK:
+                _KEY_LOCKS.pop(key, None)
+
+def clear_scan_cache(disk=False):
+    """Mengosongkan cache memori (dan opsional file cache di disk)."""
+    with _RESULTS_LOCK:
+        _RESULTS.clear()
+    if disk:
+        for path in glob.glob(os.path.join(RESULT_CACHE_DIR, "*.json")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,372 @@
+"""
+Modul: scoring_rules.py
+Aturan scoring screening Day/Swing Trading dalam bentuk deklaratif.
+
+Setiap aturan = dict:
+    mode   : "Day Trading" / "Swing Trading"
+    group  : aturan dalam grup yang sama bersifat if/elif (hanya yang pertama cocok dihitung)
+    points : poin (negatif = penalti)
+    reason : teks Alasan; boleh memuat {fitur} (nilai bar terakhir) atau {fitur_prev}
+    when   : fungsi fitur → array bool (satu nilai per ticker)
+
+Fitur dihitung sekali untuk seluruh ticker (array ticker × LOOKBACK bar terakhir),
+lalu semua aturan dievaluasi sebagai operasi array. Menambah aturan cukup dengan
+menambah entri di RULES, tanpa mengubah loop scoring.
+"""
+
+import string
+from functools import lru_cache
+import numpy as np
+
+try:
+    from modules.indicators import sma, macd, rsi, atr, rolling_vwap, supertrend, psar
+except ModuleNotFoundError:
+    from indicators import sma, macd, rsi, atr, rolling_vwap, supertrend, psar
+
+DAY = "Day Trading"
+SWING = "Swing Trading"
+
+# Indeks field pada sumbu terakhir array OHLCV
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+# Jumlah bar terakhir yang disimpan per fitur (Supertrend butuh 5 candle terakhir)
+LOOKBACK = 5
+
+# Fitur konteks tren Daily untuk Day Trading (satu nilai per ticker)
+DAILY_FIELDS = ('close_d', 'ma20_d', 'ma50_d')
+
+# Parameter indikator & aturan per mode (default = nilai screening live).
+# Bisa dioverride untuk backtest / optimizer parameter.
+FEATURE_PARAMS = {
+    DAY: {"st_multiplier": 2, "rsi_window": 9, "vol_spike": 1.2},
+    SWING: {"st_multiplier": 3, "rsi_window": 14, "vol_spike": 1.2},
+}
+
+
+# --- FUNGSI PEMBANTU (Helper) ---
+def last(x):
+    return x[:, -1]
+
+def prev(x):
+    return x[:, -2]
+
+def right_align_order(values):
+    """
+    Urutan kolom yang menggeser bar valid (Close tidak NaN) ke kanan.
+    Return (order ticker × waktu, valid ticker × waktu): posisi rata-kanan p
+    milik ticker i berasal dari kolom asli order[i, p].
+    """
+    valid = ~np.isnan(values[:, :, CLOSE])
+    # argsort stabil: bar kosong ke kiri, urutan bar valid tetap
+    return np.argsort(valid, axis=1, kind='stable'), valid
+
+def right_align(values):
+    """
+    Geser bar valid (Close tidak NaN) tiap ticker ke ujung kanan sumbu waktu.
+    Return (array ticker × waktu × field, jumlah bar valid per ticker).
+    Hasilnya setara dengan history per ticker yang baris kosongnya dibuang.
+    """
+    order, valid = right_align_order(values)
+    aligned = np.take_along_axis(values, order[:, :, None], axis=1)
+    aligned[~np.take_along_axis(valid, order, axis=1)] = np.nan
+    return aligned, valid.sum(axis=1)
+
+def stack_right_aligned(arrays, n_fields=None):
+    """List array (bar × field) atau (bar,) dengan panjang berbeda → satu array, rata kanan, NaN di kiri."""
+    length = max((len(a) for a in arrays), default=0)
+    shape = (len(arrays), length) if n_fields is None else (len(arrays), length, n_fields)
+    out = np.full(shape, np.nan)
+    for i, a in enumerate(arrays):
+        if len(a):
+            out[i, length - len(a):] = a
+    return out
+
+
+def feature_params(trade_mode, params=None):
+    """FEATURE_PARAMS mode ini digabung dengan override `params` (kunci harus dikenal)."""
+    merged = dict(FEATURE_PARAMS[trade_mode])
+    if params:
+        unknown = set(params) - set(merged)
+        if unknown:
+            raise ValueError(f"Parameter fitur tidak dikenal: {sorted(unknown)}")
+        merged.update(params)
+    return merged
+
+
+# --- FITUR (Indikator Seluruh Universe) ---
+def _tail(x, n=LOOKBACK):
+    """Ambil n bar terakhir; jika history lebih pendek, sisi kiri diisi NaN."""
+    out = np.full((x.shape[0], n), np.nan)
+    k = min(n, x.shape[1])
+    if k:
+        out[:, n - k:] = x[:, -k:]
+    return out
+
+def _group_series(block, trade_mode, params=None, cache=None):
+    """
+    Deret fitur lengkap (semua bar) untuk sekelompok ticker dengan panjang history sama (tanpa NaN).
+
+    `cache` (dict, opsional) menyimpan indikator per kombinasi parameter yang
+    memengaruhinya, sehingga pemanggilan ulang dengan parameter lain (optimizer)
+    hanya menghitung indikator yang benar-benar berubah.
+    """
+    params = feature_params(trade_mode, params)
+    high, low = block[:, :, HIGH], block[:, :, LOW]
+    close, volume = block[:, :, CLOSE], block[:, :, VOLUME]
+
+    def cached(key, compute):
+        if cache is None:
+            return compute()
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
+    f = {
+        'close': close,
+        'volume': volume,
+        'vol_sma20': cached(('vol_sma20',), lambda: sma(volume, 20)),
+        'value_ma20': cached(('value_ma20',), lambda: sma(close * volume, 20)),
+        'atr': cached(('atr',), lambda: atr(high, low, close, 14)),
+    }
+    st_mult, rsi_window = params['st_multiplier'], params['rsi_window']
+    f['st_dir'] = cached(('st_dir', st_mult), lambda: supertrend(high, low, close, 10, st_mult)[1])
+    f['rsi'] = cached(('rsi', rsi_window), lambda: rsi(close, rsi_window))
+    f['macd'], f['macd_signal'], macd_hist = cached(('macd',), lambda: macd(close, 12, 26, 9))
+    if trade_mode == DAY:
+        f['vwap'] = cached(('vwap',), lambda: rolling_vwap(close, volume, 5))
+    else:
+        f['ma20'] = cached(('ma20',), lambda: sma(close, 20))
+        f['ma50'] = cached(('ma50',), lambda: sma(close, 50))
+        f['macd_hist'] = macd_hist
+    f['psar_bull'] = cached(('psar_bull',), lambda: (close > psar(high, low, close)[0]).astype(np.float64))
+    return f
+
+def _group_features(block, trade_mode, params=None):
+    """Fitur (LOOKBACK bar terakhir) untuk sekelompok ticker dengan panjang history sama."""
+    return {name: _tail(arr) for name, arr in _group_series(block, trade_mode, params).items()}
+
+def feature_series(aligned, n_bars, trade_mode, params=None, cache=None):
+    """
+    Deret fitur untuk SEMUA bar (bukan hanya LOOKBACK terakhir), dipakai backtest.
+    `aligned`/`n_bars` hasil right_align; return dict nama → array ticker × waktu
+    (rata kanan, NaN di sebelah kiri history tiap ticker).
+    `cache` diteruskan ke _group_series (satu sub-cache per kelompok panjang history).
+    """
+    n_tickers, length = aligned.shape[:2]
+    series = {}
+    for n in np.unique(n_bars):
+        idx = np.flatnonzero(n_bars == n)
+        if n == 0:
+            continue
+        group_cache = None if cache is None else cache.setdefault(int(n), {})
+        group = _group_series(aligned[idx, length - n:, :], trade_mode, params, group_cache)
+        for name, arr in group.items():
+            if name not in series:
+                series[name] = np.full((n_tickers, length), np.nan)
+            series[name][idx, length - n:] = arr
+    return series
+
+def rolling_windows(series, lookback=LOOKBACK):
+    """
+    Ubah deret ticker × waktu menjadi baris (ticker·waktu) × lookback: baris ke-(i, t)
+    berisi `lookback` bar yang berakhir di bar t — bentuk yang sama dengan fitur
+    scan, sehingga RULES bisa dievaluasi untuk setiap tanggal sekaligus.
+    """
+    n_tickers, length = series.shape
+    padded = np.concatenate([np.full((n_tickers, lookback - 1), np.nan), series], axis=1)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, lookback, axis=1)
+    return windows.reshape(n_tickers * length, lookback)
+
+# --- KONTEKS TREN DAILY (MTF Day Trading) ---
+def daily_trend_values(daily_close):
+    """
+    Close, MA20 & MA50 bar harian terakhir dari array ticker × hari (rata kanan).
+    Return array ticker × len(DAILY_FIELDS); NaN jika history kurang.
+    """
+    daily_close = np.atleast_2d(np.asarray(daily_close, dtype=np.float64))
+    return np.column_stack([
+        _tail(daily_close, 1)[:, 0],
+        _tail(sma(daily_close, 20), 1)[:, 0],
+        _tail(sma(daily_close, 50), 1)[:, 0],
+    ])
+
+def daily_trend_label(daily):
+    """Label tren per baris konteks daily (urutan cek sama dengan grup aturan daily_trend)."""
+    close_d, ma20_d, ma50_d = np.asarray(daily, dtype=np.float64).T
+    with np.errstate(invalid='ignore'):
+        valid = ~np.isnan(ma50_d) & ~np.isnan(ma20_d)
+        above = close_d > ma50_d
+        return np.select(
+            [valid & above & (ma20_d > ma50_d), valid & above, valid],
+            ["Bullish", "Sideways", "Downtrend"], default=None,
+        )
+
+def compute_features(values, trade_mode, daily=None, params=None):
+    """
+    Hitung semua fitur scoring sekaligus.
+
+    Parameter:
+        values      : array ticker × waktu × field (OHLCV), boleh berisi bar NaN
+        trade_mode  : DAY / SWING
+        daily       : array ticker × DAILY_FIELDS (close_d, ma20_d, ma50_d) untuk konteks
+                      MTF Day Trading, mis. dari tabel daily_context
+        params      : override FEATURE_PARAMS (None = parameter screening live)
+
+    Return:
+        dict nama fitur → array (ticker × LOOKBACK), plus 'n_bars' (jumlah bar valid)
+        dan 'vol_spike' (faktor volume spike yang dipakai RULES).
+    """
+    aligned, n_bars = right_align(np.asarray(values, dtype=np.float64))
+    n_tickers = aligned.shape[0]
+    features = {}
+
+    # Ticker dengan panjang history sama dihitung dalam satu panggilan kernel 2D
+    for n in np.unique(n_bars):
+        idx = np.flatnonzero(n_bars == n)
+        if n == 0:
+            continue
+        group = _group_features(aligned[idx, aligned.shape[1] - n:, :], trade_mode, params)
+        for name, arr in group.items():
+            if name not in features:
+                features[name] = np.full((n_tickers, LOOKBACK), np.nan)
+            features[name][idx] = arr
+
+    if trade_mode == DAY:
+        # Tanpa data harian → NaN, bonus/penalti MTF dilewati
+        if daily is None:
+            daily = np.full((n_tickers, len(DAILY_FIELDS)), np.nan)
+        daily = np.asarray(daily, dtype=np.float64).reshape(n_tickers, len(DAILY_FIELDS))
+        for k, name in enumerate(DAILY_FIELDS):
+            features[name] = daily[:, k:k + 1]
+
+    features['n_bars'] = n_bars
+    features['vol_spike'] = feature_params(trade_mode, params)['vol_spike']
+    return features
+
+
+# --- ATURAN SCORING ---
+def _daily_valid(f):
+    return ~np.isnan(last(f['ma50_d'])) & ~np.isnan(last(f['ma20_d']))
+
+RULES = [
+    # --- DAY TRADE (Total max: 100, TF: M15) ---
+    {"mode": DAY, "group": "volume", "points": 20, "reason": "Volume Spike Kuat (>1.2x SMA20)",
+     "when": lambda f: last(f['volume']) > last(f['vol_sma20']) * f['vol_spike']},
+    {"mode": DAY, "group": "volume", "points": 10, "reason": "Volume Spike (>SMA20)",
+     "when": lambda f: last(f['volume']) > last(f['vol_sma20'])},
+    {"mode": DAY, "group": "vwap", "points": 20, "reason": "Price > VWAP",
+     "when": lambda f: last(f['close']) > last(f['vwap'])},
+    {"mode": DAY, "group": "supertrend", "points": 20, "reason": "Supertrend Baru Bullish (10,2)",
+     "when": lambda f: (last(f['st_dir']) == 1) & (prev(f['st_dir']) != 1)},
+    {"mode": DAY, "group": "supertrend", "points": 15, "reason": "Supertrend Bullish >3 Candle (10,2)",
+     "when": lambda f: (last(f['st_dir']) == 1) & ((f['st_dir'] == 1).sum(axis=1) > 3)},
+    {"mode": DAY, "group": "macd_cross", "points": 15, "reason": "MACD Golden Cross",
+     "when": lambda f: (last(f['macd']) > last(f['macd_signal'])) & (prev(f['macd']) <= prev(f['macd_signal']))},
+    {"mode": DAY, "group": "rsi_level", "points": 7.5, "reason": "RSI Momentum ({rsi:.1f})",
+     "when": lambda f: (last(f['rsi']) >= 45) & (last(f['rsi']) <= 70)},
+    {"mode": DAY, "group": "rsi_slope", "points": 7.5, "reason": "RSI Rising ({rsi_prev:.1f}->{rsi:.1f})",
+     "when": lambda f: last(f['rsi']) > prev(f['rsi'])},
+    {"mode": DAY, "group": "psar", "points": 10, "reason": "PSAR Bullish",
+     "when": lambda f: last(f['psar_bull']) == 1},
+    # Bonus / penalti tren Daily (MTF)
+    {"mode": DAY, "group": "daily_trend", "points": 10, "reason": "Daily Bullish (>MA50) +10",
+     "when": lambda f: _daily_valid(f) & (last(f['close_d']) > last(f['ma50_d'])) & (last(f['ma20_d']) > last(f['ma50_d']))},
+    {"mode": DAY, "group": "daily_trend", "points": 5, "reason": "Daily Sideways (>MA50) +5",
+     "when": lambda f: _daily_valid(f) & (last(f['close_d']) > last(f['ma50_d']))},
+    {"mode": DAY, "group": "daily_trend", "points": -15, "reason": "Daily Downtrend (<MA50) -15",
+     "when": _daily_valid},
+
+    # --- SWING TRADE (Total max: 100, TF: Daily) ---
+    {"mode": SWING, "group": "supertrend", "points": 25, "reason": "Supertrend Baru Bullish (10,3)",
+     "when": lambda f: (last(f['st_dir']) == 1) & (prev(f['st_dir']) != 1)},
+    {"mode": SWING, "group": "supertrend", "points": 20, "reason": "Supertrend Bullish >3 Hari (10,3)",
+     "when": lambda f: (last(f['st_dir']) == 1) & ((f['st_dir'] == 1).sum(axis=1) > 3)},
+    {"mode": SWING, "group": "ma_structure", "points": 20, "reason": "MA Structure (Price>MA50, MA20>MA50)",
+     "when": lambda f: (last(f['close']) > last(f['ma50'])) & (last(f['ma20']) > last(f['ma50']))},
+    {"mode": SWING, "group": "macd_cross", "points": 7.5, "reason": "MACD Golden Cross",
+     "when": lambda f: (last(f['macd']) > last(f['macd_signal'])) & (prev(f['macd']) <= prev(f['macd_signal']))},
+    {"mode": SWING, "group": "macd_hist", "points": 7.5, "reason": "MACD Histogram Growing",
+     "when": lambda f: last(f['macd_hist']) > prev(f['macd_hist'])},
+    {"mode": SWING, "group": "volume", "points": 15, "reason": "Volume Spike (>1.2x MA20)",
+     "when": lambda f: last(f['volume']) > last(f['vol_sma20']) * f['vol_spike']},
+    {"mode": SWING, "group": "rsi_level", "points": 10, "reason": "RSI Momentum ({rsi:.1f})",
+     "when": lambda f: (last(f['rsi']) >= 50) & (last(f['rsi']) <= 70)},
+    {"mode": SWING, "group": "rsi_slope", "points": 10, "reason": "RSI Rising ({rsi_prev:.1f}->{rsi:.1f})",
+     "when": lambda f: last(f['rsi']) > prev(f['rsi'])},
+    {"mode": SWING, "group": "psar", "points": 5, "reason": "PSAR Baru Pindah ke Bawah Harga",
+     "when": lambda f: (last(f['psar_bull']) == 1) & (prev(f['psar_bull']) != 1)},
+    {"mode": SWING, "group": "psar", "points": 5, "reason": "PSAR Konfirmasi Tren Naik",
+     "when": lambda f: last(f['psar_bull']) == 1},
+    # Bonus / penalti swing
+    {"mode": SWING, "group": "macd_divergence", "points": 10, "reason": "MACD Negatif tapi Histogram Naik (+10)",
+     "when": lambda f: (last(f['macd']) < 0) & (last(f['macd_hist']) > prev(f['macd_hist']))},
+    {"mode": SWING, "group": "rsi_overbought", "points": -15, "reason": "RSI Overbought ({rsi:.1f}) -15",
+     "when": lambda f: last(f['rsi']) > 75},
+]
+
+# Filter searah tren besar (mtf_filter): ticker yang tidak memenuhi dibuang
+MTF_FILTERS = {
+    DAY: lambda f: last(f['st_dir']) == 1,
+    SWING: lambda f: (last(f['st_dir']) == 1) & (last(f['close']) > last(f['ma50'])),
+}
+
+# Pre-filter teknikal wajib: likuiditas Value_MA20 (Close × Volume) harus > 0
+def liquidity_filter(f):
+    return (f['n_bars'] >= 2) & (last(f['value_ma20']) > 0)
+
+
+# --- ENGINE ---
+@lru_cache(maxsize=None)
+def compile_rules(trade_mode):
+    """Aturan untuk satu mode + daftar field yang dipakai template Alasan-nya."""
+    compiled = []
+    for rule in RULES:
+        if rule["mode"] != trade_mode:
+            continue
+        fields = tuple(name for _, name, _, _ in string.Formatter().parse(rule["reason"]) if name)
+        compiled.append((rule, fields))
+    return tuple(compiled)
+
+def _reason_values(features, fields, i):
+    values = {}
+    for name in fields:
+        if name.endswith('_prev'):
+            values[name] = features[name[:-len('_prev')]][i, -2]
+        else:
+            values[name] = features[name][i, -1]
+    return values
+
+def evaluate_rules(features, trade_mode, mtf_filter, with_reasons=True):
+    """
+    Evaluasi semua aturan mode `trade_mode` untuk seluruh ticker sekaligus.
+
+    Return:
+        score  : array int (sudah dibulatkan & dibatasi maks 100)
+        alasan : list of list teks Alasan per ticker (None jika with_reasons=False,
+                 mis. backtest yang menilai ribuan baris ticker × tanggal)
+        keep   : array bool ticker yang lolos likuiditas (dan mtf_filter jika aktif)
+    """
+    n = len(features['n_bars'])
+    score = np.zeros(n)
+    alasan = [[] for _ in range(n)] if with_reasons else None
+    taken = {}
+
+    with np.errstate(invalid='ignore'):
+        for rule, fields in compile_rules(trade_mode):
+            hit = np.asarray(rule["when"](features), dtype=bool)
+            group_taken = taken.setdefault(rule["group"], np.zeros(n, dtype=bool))
+            hit &= ~group_taken
+            group_taken |= hit
+            score += rule["points"] * hit
+            if not with_reasons:
+                continue
+            for i in np.flatnonzero(hit):
+                alasan[i].append(rule["reason"].format(**_reason_values(features, fields, i)))
+
+        keep = liquidity_filter(features)
+        if mtf_filter:
+            keep &= MTF_FILTERS[trade_mode](features)
+
+    # Hard cap score — semua bonus/penalti sudah dihitung
+    score = np.minimum(np.round(score), 100).astype(int)
+    return score, alasan, keep
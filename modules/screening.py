@@ -1,24 +1,15 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import pytz
 import os
-import base64
-import holidays
-import io
 import plotly.express as px
-import concurrent.futures
 from datetime import datetime
 from fpdf import FPDF 
-from modules.data_loader import get_full_stock_data 
-from modules.universe import UNIVERSE_SAHAM, is_syariah, get_sector_data 
-
-# --- FUNGSI FORMAT RUPIAH ---
-def format_rp(angka):
-    """Fungsi untuk memformat angka menjadi format ribuan dengan titik"""
-    if isinstance(angka, str):
-        return angka
-    return f"{int(angka):,}".replace(',', '.')
+from modules.screening_engine import (
+    format_rp, get_market_session, leaderboard_top, apply_position_sizing
+)
+from modules.scan_cache import get_scan_result
+from modules.live_watch import WATCH_INTERVAL, get_live_picks, diff_picks, alert_picks
 
 # --- 1. FUNGSI AUDIO ALERT ---
 def play_alert_sound():
@@ -27,20 +18,56 @@ def play_alert_sound():
     """
     st.components.v1.html(audio_html, height=0)
 
-# --- 2. ANALISA ROTASI SEKTOR ---
-def analyze_sector_momentum(full_results_df):
-    if full_results_df.empty:
-        return pd.DataFrame(), []
-    sector_summary = full_results_df.groupby('Sektor').agg({
-        'Skor': 'mean',
-        'Ticker': 'count'
-    }).rename(columns={'Ticker': 'Jumlah_Saham', 'Skor': 'Avg_Score'}).sort_values('Avg_Score', ascending=False)
-    
-    # UPDATE: Standar kekuatan sektor dinaikkan menjadi 70 menyesuaikan kondisi pasar
-    leading_sectors = sector_summary[sector_summary['Avg_Score'] >= 70].index.tolist()
-    return sector_summary, leading_sectors
+# --- 1b. MODE PANTAU (LIVE MARKET) ---
+@st.fragment(run_every=WATCH_INTERVAL)
+def render_watch_panel(trade_mode, mtf_filter, sector_boost, modal_risiko, batas_alokasi_rp):
+    """
+    Bagian halaman yang dijalankan ulang otomatis tiap WATCH_INTERVAL detik.
+    Hanya saham yang bar terakhirnya berubah yang dinilai ulang (lihat live_watch);
+    alert suara hanya untuk saham BARU dengan skor FULL SIZING.
+    """
+    hasil = get_live_picks(trade_mode, mtf_filter, sector_boost)
+    state_key = f"watch_{trade_mode}_{mtf_filter}_{sector_boost}"
+    terakhir = st.session_state.get(state_key)
+
+    if terakhir is None or terakhir['cycle'] != hasil['cycle']:
+        # Render pertama dibandingkan dengan hasil scan yang sudah dilihat user
+        # (jika ada), agar menyalakan Mode Pantau tidak mengulang alert yang sama
+        sebelumnya = terakhir['final_picks'] if terakhir else st.session_state.get('final_picks')
+        diff = diff_picks(sebelumnya, hasil['final_picks'])
+        st.session_state[state_key] = {"cycle": hasil['cycle'], "final_picks": hasil['final_picks'], "diff": diff}
+        if alert_picks(diff): play_alert_sound()
+    diff = st.session_state[state_key]['diff']
+
+    waktu = datetime.fromisoformat(hasil['generated_at']).strftime('%H:%M:%S')
+    st.caption(f"🔁 Siklus #{hasil['cycle']} pukul {waktu} WIB · {hasil['dinilai_ulang']} dari "
+               f"{hasil['total']} saham dinilai ulang (bar baru) · diperbarui tiap {WATCH_INTERVAL} detik")
+
+    col_baru, col_keluar, col_ubah = st.columns(3)
+    with col_baru:
+        st.write(f"**🆕 Masuk ({len(diff['baru'])})**")
+        for p in diff['baru']:
+            st.success(f"{p['Ticker']} · Skor {p['Skor']}" + (" 🔥" if p['Skor'] >= 85 else ""))
+    with col_keluar:
+        st.write(f"**📤 Keluar ({len(diff['keluar'])})**")
+        for p in diff['keluar']:
+            st.error(f"{p['Ticker']} · Skor {p['Skor']}")
+    with col_ubah:
+        st.write(f"**🔄 Skor Berubah ({len(diff['berubah'])})**")
+        for p in diff['berubah']:
+            arah = "⬆️" if p['Skor'] > p['Skor_Lama'] else "⬇️"
+            st.info(f"{p['Ticker']} · {p['Skor_Lama']} → {p['Skor']} {arah}")
+
+    picks = apply_position_sizing(hasil['final_picks'], modal_risiko, batas_alokasi_rp)
+    if picks:
+        st.dataframe(
+            pd.DataFrame(picks)[['Ticker', 'Sektor', 'Skor', 'Harga_Saat_Ini', 'Entry', 'SL', 'TP', 'RRR', 'Lot_Maks']],
+            hide_index=True, use_container_width=True
+        )
+    else:
+        st.info("Belum ada saham yang memenuhi kriteria pada siklus ini.")
 
-# --- 3. FUNGSI GENERATOR PDF (INSTITUTIONAL FORMAT) ---
+# --- 2. FUNGSI GENERATOR PDF (INSTITUTIONAL FORMAT) ---
 def export_to_pdf(hasil_lolos, trade_mode, session, sector_report, logo_path="logo_expert_stock_pro.png"):
     pdf = FPDF()
     pdf.add_page()
@@ -157,371 +184,7 @@ def export_to_pdf(hasil_lolos, trade_mode, session, sector_report, logo_path="lo
 
     return pdf.output(dest='S').encode('latin-1', 'ignore')
 
-# --- 4. INDIKATOR TEKNIKAL ---
-
-def calculate_supertrend(df, period=10, multiplier=2):
-    """Menghitung Supertrend. Mengembalikan kolom 'Supertrend' dan 'Supertrend_Dir' (1=bullish, -1=bearish)."""
-    hl2 = (df['High'] + df['Low']) / 2
-    high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift())
-    low_close = np.abs(df['Low'] - df['Close'].shift())
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr = tr.rolling(period).mean()
-
-    upper_band = hl2 + (multiplier * atr)
-    lower_band = hl2 - (multiplier * atr)
-
-    supertrend = pd.Series(index=df.index, dtype=float)
-    direction = pd.Series(index=df.index, dtype=int)
-
-    for i in range(1, len(df)):
-        if df['Close'].iloc[i] > upper_band.iloc[i - 1]:
-            direction.iloc[i] = 1
-        elif df['Close'].iloc[i] < lower_band.iloc[i - 1]:
-            direction.iloc[i] = -1
-        else:
-            direction.iloc[i] = direction.iloc[i - 1]
-            if direction.iloc[i] == 1 and lower_band.iloc[i] < lower_band.iloc[i - 1]:
-                lower_band.iloc[i] = lower_band.iloc[i - 1]
-            if direction.iloc[i] == -1 and upper_band.iloc[i] > upper_band.iloc[i - 1]:
-                upper_band.iloc[i] = upper_band.iloc[i - 1]
-
-        supertrend.iloc[i] = lower_band.iloc[i] if direction.iloc[i] == 1 else upper_band.iloc[i]
-
-    df['Supertrend'] = supertrend
-    df['Supertrend_Dir'] = direction
-    return df
-
-def calculate_psar(df, af_start=0.02, af_step=0.02, af_max=0.2):
-    """Menghitung Parabolic SAR. Mengembalikan kolom 'PSAR'."""
-    high = df['High'].values
-    low = df['Low'].values
-    close = df['Close'].values
-    n = len(df)
-
-    psar = close.copy()
-    bull = True
-    af = af_start
-    ep = low[0]
-    hp = high[0]
-    lp = low[0]
-
-    for i in range(2, n):
-        if bull:
-            psar[i] = psar[i - 1] + af * (hp - psar[i - 1])
-            psar[i] = min(psar[i], low[i - 1], low[i - 2])
-            if low[i] < psar[i]:
-                bull = False
-                psar[i] = hp
-                lp = low[i]
-                af = af_start
-                ep = lp
-            else:
-                if high[i] > hp:
-                    hp = high[i]
-                    af = min(af + af_step, af_max)
-                ep = hp
-        else:
-            psar[i] = psar[i - 1] + af * (lp - psar[i - 1])
-            psar[i] = max(psar[i], high[i - 1], high[i - 2])
-            if high[i] > psar[i]:
-                bull = True
-                psar[i] = lp
-                hp = high[i]
-                af = af_start
-                ep = hp
-            else:
-                if low[i] < lp:
-                    lp = low[i]
-                    af = min(af + af_step, af_max)
-                ep = lp
-
-    df['PSAR'] = psar
-    df['PSAR_Bull'] = df['Close'] > df['PSAR']
-    return df
-
-def calculate_indicators(df, trade_mode):
-    """Menghitung semua indikator teknikal sesuai mode."""
-    # --- ATR (dipakai semua mode untuk SL) ---
-    high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift())
-    low_close = np.abs(df['Low'] - df['Close'].shift())
-    df['ATR'] = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1).rolling(14).mean()
-
-    if trade_mode == "Day Trading":
-        # Supertrend (10, 2)
-        df = calculate_supertrend(df, period=10, multiplier=2)
-
-        # VWAP (rolling 5-bar sebagai proxy intraday)
-        df['VWAP'] = (df['Close'] * df['Volume']).rolling(window=5).sum() / df['Volume'].rolling(window=5).sum()
-
-        # MACD (12, 26, 9)
-        ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = ema12 - ema26
-        df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-
-        # RSI (9)
-        delta = df['Close'].diff()
-        gain = delta.where(delta > 0, 0).rolling(9).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(9).mean()
-        df['RSI'] = 100 - (100 / (1 + (gain / loss)))
-
-        # PSAR
-        df = calculate_psar(df)
-
-    else:  # Swing Trading
-        # Supertrend (10, 3)
-        df = calculate_supertrend(df, period=10, multiplier=3)
-
-        # MA Structure
-        df['MA20'] = df['Close'].rolling(window=20).mean()
-        df['MA50'] = df['Close'].rolling(window=50).mean()
-
-        # MACD (12, 26, 9)
-        ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = ema12 - ema26
-        df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
-
-        # RSI (14)
-        delta = df['Close'].diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        df['RSI'] = 100 - (100 / (1 + (gain / loss)))
-
-        # PSAR
-        df = calculate_psar(df)
-
-    return df
-
-# --- 5. MARKET SESSION ---
-def get_market_session():
-    tz = pytz.timezone('Asia/Jakarta')
-    now = datetime.now(tz)
-    if now.weekday() >= 5: return "AKHIR PEKAN", "Tutup."
-    if now.date() in holidays.ID(years=now.year): return "LIBUR NASIONAL", "Tutup."
-    curr_time = now.hour + now.minute/60
-    if curr_time < 9.0: return "PRA-PASAR", "Wait."
-    elif 9.0 <= curr_time <= 16.0: return "LIVE MARKET", "Trading."
-    else: return "PASCA-PASAR", "Analysis."
-
-# --- FUNGSI PEKERJA UNTUK MULTITHREADING ---
-def process_single_stock(ticker, trade_mode, mtf_filter):
-    ticker_bersih = ticker.replace(".JK", "")
-    try:
-        interval = '15m' if trade_mode == "Day Trading" else '1d'
-        data = get_full_stock_data(ticker, interval=interval)
-        df = calculate_indicators(data['history'], trade_mode)
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        curr_price = last['Close']
-        sektor_nama, _ = get_sector_data(ticker_bersih)
-
-        # === PRE-FILTER WAJIB ===
-
-        # 1. Likuiditas: Value_MA20 = rata-rata 20 hari (Close * Volume)
-        value_ma20 = (df['Close'] * df['Volume']).rolling(20).mean().iloc[-1]
-        if pd.isna(value_ma20) or value_ma20 <= 0:
-            return None
-
-        # 2. Market Cap: wajib > Rp 500 Miliar
-        #    yfinance mengembalikan marketCap saham .JK dalam satuan USD.
-        #    Konversi ke Rupiah: 1 USD ≈ Rp 16.000 (pakai konstanta konservatif)
-        USD_TO_IDR = 16_000
-        MC_MIN_IDR  = 500_000_000_000  # Rp 500 Miliar
-        MC_MIN_USD  = MC_MIN_IDR / USD_TO_IDR  # ≈ USD 31.25 Juta
-
-        market_cap_usd = data.get('info', {}).get('marketCap', None)
-        if market_cap_usd is None or pd.isna(market_cap_usd) or market_cap_usd <= MC_MIN_USD:
-            return None
-
-        # 3. Kesehatan (Quality): ROE dan ROA wajib > 0
-        #    Jika NaN/None → label "Unrated" (tidak gugur, tapi diberi label)
-        roe = data.get('info', {}).get('returnOnEquity', None)
-        roa = data.get('info', {}).get('returnOnAssets', None)
-
-        roe_valid = roe is not None and not pd.isna(roe)
-        roa_valid = roa is not None and not pd.isna(roa)
-
-        if roe_valid or roa_valid:
-            # Minimal salah satu ada datanya → keduanya harus positif jika tersedia
-            roe_ok = (not roe_valid) or (roe > 0)
-            roa_ok = (not roa_valid) or (roa > 0)
-            if not roe_ok or not roa_ok:
-                return None
-            quality_label = "Rated"
-        else:
-            # Tidak ada data sama sekali → lolos dengan label Unrated
-            quality_label = "Unrated"
-
-        score = 0
-        alasan = []
-
-        # Hitung Vol_SMA20 untuk kedua mode
-        vol_sma20 = df['Volume'].rolling(20).mean().iloc[-1]
-
-        if trade_mode == "Day Trading":
-            # --- SCORING DAY TRADE (Total max: 100, TF: M15) ---
-
-            # 1. Volume Spike: 20 poin jika Vol > 1.2x SMA20, 10 poin jika Vol > SMA20
-            if last['Volume'] > vol_sma20 * 1.2:
-                score += 20
-                alasan.append("Volume Spike Kuat (>1.2x SMA20)")
-            elif last['Volume'] > vol_sma20:
-                score += 10
-                alasan.append("Volume Spike (>SMA20)")
-
-            # 2. VWAP Alignment: 20 Poin
-            if curr_price > last['VWAP']:
-                score += 20
-                alasan.append("Price > VWAP")
-
-            # 3. Supertrend (10,2):
-            #    20 poin: baru naik ke atas (candle sebelumnya di bawah)
-            #    15 poin: sudah >3 candle di atas garis hijau
-            st_dir_series = df['Supertrend_Dir'].iloc[-5:]
-            candles_above = (st_dir_series == 1).sum()
-            if last['Supertrend_Dir'] == 1 and prev['Supertrend_Dir'] != 1:
-                score += 20
-                alasan.append("Supertrend Baru Bullish (10,2)")
-            elif last['Supertrend_Dir'] == 1 and candles_above > 3:
-                score += 15
-                alasan.append(f"Supertrend Bullish >3 Candle (10,2)")
-
-            # 4. MACD Golden Cross (12,26,9): 15 Poin
-            if last['MACD'] > last['MACD_Signal'] and prev['MACD'] <= prev['MACD_Signal']:
-                score += 15
-                alasan.append("MACD Golden Cross")
-
-            # 5. RSI Momentum (9), rentang ideal 45-70: 7.5 Poin
-            if 45 <= last['RSI'] <= 70:
-                score += 7.5
-                alasan.append(f"RSI Momentum ({last['RSI']:.1f})")
-
-            # 6. RSI Trend (9), arah naik: 7.5 Poin
-            if last['RSI'] > prev['RSI']:
-                score += 7.5
-                alasan.append(f"RSI Rising ({prev['RSI']:.1f}->{last['RSI']:.1f})")
-
-            # 7. PSAR Acceleration (titik di bawah harga): 10 Poin
-            if last['PSAR_Bull']:
-                score += 10
-                alasan.append("PSAR Bullish")
-
-            # --- BONUS / PENALTI DAILY TREND (MTF) ---
-            try:
-                # Untuk Day Trade (M15), kita perlu data Daily terpisah untuk konteks tren besar
-                data_daily = get_full_stock_data(ticker, interval='1d')
-                df_daily = data_daily['history']
-                if not df_daily.empty:
-                    df_daily['MA50_D'] = df_daily['Close'].rolling(50).mean()
-                    df_daily['MA20_D'] = df_daily['Close'].rolling(20).mean()
-                    last_d = df_daily.iloc[-1]
-                    close_d = last_d['Close']
-                    ma50_d  = last_d['MA50_D']
-                    ma20_d  = last_d['MA20_D']
-
-                    if not pd.isna(ma50_d) and not pd.isna(ma20_d):
-                        if close_d > ma50_d and ma20_d > ma50_d:
-                            score += 10
-                            alasan.append("Daily Bullish (>MA50) +10")
-                        elif close_d > ma50_d:
-                            score += 5
-                            alasan.append("Daily Sideways (>MA50) +5")
-                        else:
-                            score -= 15
-                            alasan.append("Daily Downtrend (<MA50) -15")
-            except Exception:
-                pass  # Jika data daily tidak tersedia, skip bonus MTF
-
-            # MTF Filter: pastikan supertrend M15 bullish
-            if mtf_filter and last['Supertrend_Dir'] != 1:
-                return None
-
-        else:  # Swing Trading
-            # --- SCORING SWING TRADE (Total max: 100, TF: Daily) ---
-
-            # 1. Supertrend (10,3):
-            #    25 poin: baru naik ke atas garis hijau
-            #    20 poin: sudah >3 hari di atas garis hijau
-            st_dir_series = df['Supertrend_Dir'].iloc[-5:]
-            candles_above = (st_dir_series == 1).sum()
-            if last['Supertrend_Dir'] == 1 and prev['Supertrend_Dir'] != 1:
-                score += 25
-                alasan.append("Supertrend Baru Bullish (10,3)")
-            elif last['Supertrend_Dir'] == 1 and candles_above > 3:
-                score += 20
-                alasan.append("Supertrend Bullish >3 Hari (10,3)")
-
-            # 2. MA Structure (Price > MA50 AND MA20 > MA50): 20 Poin
-            if curr_price > last['MA50'] and last['MA20'] > last['MA50']:
-                score += 20
-                alasan.append("MA Structure (Price>MA50, MA20>MA50)")
-
-            # 3. MACD: split 7.5 + 7.5
-            #    7.5 poin: MACD Golden Cross (memotong ke atas Signal)
-            #    7.5 poin: Histogram hari ini > kemarin (momentum naik)
-            if last['MACD'] > last['MACD_Signal'] and prev['MACD'] <= prev['MACD_Signal']:
-                score += 7.5
-                alasan.append("MACD Golden Cross")
-            if last['MACD_Hist'] > prev['MACD_Hist']:
-                score += 7.5
-                alasan.append("MACD Histogram Growing")
-
-            # 4. Volume Spike: 15 poin jika Vol > 1.2x Vol_MA20
-            if last['Volume'] > vol_sma20 * 1.2:
-                score += 15
-                alasan.append("Volume Spike (>1.2x MA20)")
-
-            # 5. RSI Momentum (14), rentang ideal 50-70: 10 Poin
-            if 50 <= last['RSI'] <= 70:
-                score += 10
-                alasan.append(f"RSI Momentum ({last['RSI']:.1f})")
-
-            # 6. RSI Trend (14), slope naik: 10 Poin
-            if last['RSI'] > prev['RSI']:
-                score += 10
-                alasan.append(f"RSI Rising ({prev['RSI']:.1f}->{last['RSI']:.1f})")
-
-            # 7. PSAR: 5 poin jika titik PSAR pindah ke bawah harga
-            if last['PSAR_Bull'] and not df['PSAR_Bull'].iloc[-2]:
-                score += 5
-                alasan.append("PSAR Baru Pindah ke Bawah Harga")
-            elif last['PSAR_Bull']:
-                # tetap beri 5 poin jika sudah di bawah (agar tidak kehilangan sinyal konfirmasi)
-                score += 5
-                alasan.append("PSAR Konfirmasi Tren Naik")
-
-            # --- BONUS / PENALTI SWING ---
-            # +10: MACD di area negatif tapi histogram sudah mulai naik (divergensi positif awal)
-            if last['MACD'] < 0 and last['MACD_Hist'] > prev['MACD_Hist']:
-                score += 10
-                alasan.append("MACD Negatif tapi Histogram Naik (+10)")
-
-            # -15: RSI overbought > 75
-            if last['RSI'] > 75:
-                score -= 15
-                alasan.append(f"RSI Overbought ({last['RSI']:.1f}) -15")
-
-            # MTF Filter: pastikan supertrend bullish dan MA structure terpenuhi
-            if mtf_filter and not (last['Supertrend_Dir'] == 1 and curr_price > last['MA50']):
-                return None
-
-        # Hard cap score sebelum dikembalikan — semua bonus/penalti sudah dihitung
-        score = min(round(score), 100)
-
-        syariah_status = "Ya" if is_syariah(ticker_bersih) else "Tidak"
-        return {
-            "Ticker": ticker_bersih, "Sektor": sektor_nama, "Syariah": syariah_status,
-            "Quality": quality_label, "Skor": score,
-            "Harga": int(curr_price), "ATR": last['ATR'], "Alasan": alasan, "RSI": last['RSI']
-        }
-    except:
-        return None
-
-# --- 6. MODUL UTAMA ---
+# --- 3. MODUL UTAMA ---
 def run_screening():
     st.set_page_config(page_title="🔍 Screening Saham Harian", layout="wide")
     
@@ -639,99 +302,40 @@ def run_screening():
     tombol_cari = "🚀 CARIKAN SAHAM UNTUK SAYA" if "Praktis" in ui_mode else f"🚀 JALANKAN ANALISA {trade_mode.upper()}"
     
     if st.button(tombol_cari):
-        saham_list = [f"{t}.JK" for tickers in UNIVERSE_SAHAM.values() for t in tickers]
-        saham_list = list(set(saham_list))
-        
-        raw_results = []
-        
         loading_header = st.empty()
         loading_header.write("### 🔄 Mesin sedang memilah ratusan saham. Mohon tunggu...")
         
         status_text = st.empty()
         progress_bar = st.progress(0)
-        
-        total_saham = len(saham_list)
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(process_single_stock, ticker, trade_mode, mtf_filter): ticker for ticker in saham_list}
-            
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                completed += 1
-                
-                status_text.text(f"Memeriksa {completed} saham...")
-                progress_bar.progress(completed / total_saham)
-                
-                result = future.result()
-                if result is not None:
-                    raw_results.append(result)
+        leaderboard_view = st.empty()
+
+        def on_batch(completed, total, board):
+            status_text.text(f"Memeriksa {completed} saham...")
+            progress_bar.progress(min(completed / max(total, 1), 1.0))
+
+            top_sementara = leaderboard_top(board)
+            if top_sementara:
+                with leaderboard_view.container():
+                    st.caption(f"⚡ Peringkat sementara ({board['count']} saham sudah dinilai)")
+                    st.dataframe(
+                        pd.DataFrame(top_sementara)[['Ticker', 'Sektor', 'Skor', 'Harga']],
+                        hide_index=True, use_container_width=True
+                    )
+
+        # Hasil scan dipakai bersama semua sesi (lihat scan_cache): scan universe hanya
+        # berjalan sekali per versi data, sesi lain langsung memakai hasilnya.
+        # Jika user pindah halaman saat scan berjalan, Streamlit menghentikan script
+        # di callback dan sisa fetch/scoring dibatalkan.
+        hasil = get_scan_result(trade_mode, mtf_filter, sector_boost, on_status=status_text.text, on_batch=on_batch)
+        sector_report = hasil['sector_report']
 
         loading_header.empty()
         status_text.empty()
         progress_bar.empty()
+        leaderboard_view.empty()
 
-        df_all = pd.DataFrame(raw_results)
-        sector_report, leading_sectors = analyze_sector_momentum(df_all)
-        
-        final_picks = []
-        for stock in raw_results:
-            f_score = stock['Skor']
-
-            if sector_boost and stock['Sektor'] in leading_sectors:
-                f_score += 10
-                stock['Alasan'].append(f"Sector Hot: {stock['Sektor']}")
-            
-            # Hard cap final setelah bonus Sector Hot
-            f_score = min(round(f_score), 100)
-
-            # --- PROTEKSI BERLAPIS: SL/TP ---
-            # ATR SL
-            sl_mult = 1.5 if trade_mode == "Day Trading" else 2.0
-            atr_sl = int(stock['Harga'] - (sl_mult * stock['ATR']))
-
-            # Hard Cap SL: maks -3% (Day Trade) atau -8% (Swing)
-            max_loss_pct = 0.03 if trade_mode == "Day Trading" else 0.08
-            hard_cap_sl = int(stock['Harga'] * (1 - max_loss_pct))
-
-            # Pilih SL yang paling ketat (nilai terbesar/terdekat dengan harga)
-            sl = max(atr_sl, hard_cap_sl)
-
-            # TP dengan RR minimal 1.5x (Day) atau 2.0x (Swing)
-            rr_min = 1.5 if trade_mode == "Day Trading" else 2.0
-            tp = int(stock['Harga'] + (stock['Harga'] - sl) * rr_min)
-
-            rrr = (tp - stock['Harga']) / (stock['Harga'] - sl) if stock['Harga'] > sl else 0
-
-            risiko_per_lembar = stock['Harga'] - sl
-            if risiko_per_lembar > 0:
-                lembar_maks_risiko = modal_risiko / risiko_per_lembar
-                lembar_maks_alokasi = batas_alokasi_rp / stock['Harga']
-                
-                lembar_final = min(lembar_maks_risiko, lembar_maks_alokasi)
-                lot_maksimal = int(lembar_final / 100)
-            else:
-                lot_maksimal = 0
-
-            pct_risk = ((stock['Harga'] - sl) / stock['Harga']) * 100 if stock['Harga'] > 0 else 0
-            pct_reward = ((tp - stock['Harga']) / stock['Harga']) * 100 if stock['Harga'] > 0 else 0
-
-            if f_score >= 70 and rrr >= 1.4:
-                final_picks.append({
-                    "Ticker": stock['Ticker'], "Sektor": stock['Sektor'], "Skor": f_score,
-                    "Harga_Saat_Ini": int(stock['Harga']),
-                    "Syariah": stock['Syariah'],
-                    "Quality": stock['Quality'],
-                    "Entry": f"Rp {format_rp(stock['Harga']*0.99)} - {format_rp(stock['Harga'])}",
-                    "SL": sl, "TP": tp, "RRR": f"{rrr:.1f}x",
-                    "Status": "🔥 FULL SIZING" if f_score >= 85 else "🎯 CICIL SEBAGIAN",
-                    "Logic": " | ".join(stock['Alasan']),
-                    "Lot_Maks": f"{format_rp(lot_maksimal)} Lot",
-                    "Pct_Risk": f"-{pct_risk:.1f}%",
-                    "Pct_Reward": f"+{pct_reward:.1f}%"
-                })
-
-        final_picks.sort(key=lambda x: x['Skor'], reverse=True)
-        st.session_state.final_picks = final_picks[:10] 
+        # Position sizing per sesi (modal tiap user berbeda) di atas hasil bersama
+        st.session_state.final_picks = apply_position_sizing(hasil['final_picks'], modal_risiko, batas_alokasi_rp)
         st.session_state.sector_report = sector_report
         st.session_state.pdf_session = session 
         
@@ -739,6 +343,11 @@ def run_screening():
         
         if any(p['Skor'] >= 85 for p in st.session_state.final_picks): play_alert_sound()
 
+    # --- MODE PANTAU: scan ulang otomatis selama LIVE MARKET ---
+    if session == "LIVE MARKET":
+        if st.toggle("🔁 Mode Pantau (nilai ulang otomatis, tanpa klik ulang)", key="watch_mode"):
+            render_watch_panel(trade_mode, mtf_filter, sector_boost, modal_risiko, batas_alokasi_rp)
+
     # --- DISPLAY UI ---
     if st.session_state.get('analysis_done', False):
         res = st.session_state.get('final_picks', [])
@@ -0,0 +1,762 @@
+"""
+Modul: screening_engine.py
+Mesin scoring screening yang terpisah dari UI Streamlit.
+
+Alur scan dibagi dua fase:
+    1. I/O      : info fundamental & history diambil lewat thread (menunggu jaringan/disk).
+    2. Komputasi: indikator + scoring dijalankan di backend pilihan:
+                  - "process" : ProcessPoolExecutor, skala ke semua core server
+                  - "thread"  : ThreadPoolExecutor (perilaku lama, tanpa overhead proses)
+
+Aturan scoring didefinisikan deklaratif di scoring_rules.RULES dan dievaluasi
+untuk satu batch ticker sekaligus (operasi array), bukan if-chain per ticker.
+
+Worker hanya menerima array NumPy OHLCV (bar × field) dan beberapa angka info,
+bukan DataFrame/dict info lengkap, sehingga biaya kirim antar proses kecil.
+Modul ini sengaja tidak meng-import streamlit agar aman di-load oleh proses worker
+dan bisa dijalankan headless (cron) untuk menulis snapshot hasil screening:
+
+    python -m modules.screening_engine --mode swing
+    python -m modules.screening_engine --mode day --out picks.parquet
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import argparse
+import concurrent.futures
+import concurrent.futures.process
+import multiprocessing
+import threading
+from datetime import datetime
+import pytz
+import holidays
+import numpy as np
+import pandas as pd
+
+try:
+    from modules.scoring_rules import DAILY_FIELDS, compute_features, evaluate_rules, stack_right_aligned
+    from modules.universe import YF_TICKERS, SECTORS, SECTOR_CODES, SYARIAH_MASK, ticker_ids, load_liquid_universe, liquid_tickers
+    from modules.price_store import DATA_DIR, refresh_history
+    from modules.price_panel import get_universe_panel, panel_history
+    from modules.info_store import refresh_info_snapshot
+    from modules.daily_context import get_daily_context, context_lookup
+except ModuleNotFoundError:
+    from scoring_rules import DAILY_FIELDS, compute_features, evaluate_rules, stack_right_aligned
+    from universe import YF_TICKERS, SECTORS, SECTOR_CODES, SYARIAH_MASK, ticker_ids, load_liquid_universe, liquid_tickers
+    from price_store import DATA_DIR, refresh_history
+    from price_panel import get_universe_panel, panel_history
+    from info_store import refresh_info_snapshot
+    from daily_context import get_daily_context, context_lookup
+
+# Backend default (bisa dioverride lewat environment variable)
+SCREENING_BACKEND = os.environ.get("SCREENING_BACKEND", "process")
+BACKENDS = ("process", "thread")
+
+# Urutan kolom array OHLCV yang dikirim ke worker
+OHLCV_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(OHLCV_FIELDS))
+
+# Field info yang dibutuhkan pre-filter (sisanya tidak ikut dikirim)
+INFO_FIELDS = ('marketCap', 'returnOnEquity', 'returnOnAssets')
+
+# Konversi marketCap .JK (USD) → Rupiah, batas minimal Rp 500 Miliar
+USD_TO_IDR = 16_000
+MC_MIN_IDR = 500_000_000_000
+MC_MIN_USD = MC_MIN_IDR / USD_TO_IDR  # ≈ USD 31.25 Juta
+
+# Rencana trading (SL/TP) per mode: SL ATR × sl_mult dibatasi hard cap max_loss_pct,
+# TP = risiko × rr_min
+TRADE_PLAN_PARAMS = {
+    "Day Trading": {"sl_mult": 1.5, "max_loss_pct": 0.03, "rr_min": 1.5},
+    "Swing Trading": {"sl_mult": 2.0, "max_loss_pct": 0.08, "rr_min": 2.0},
+}
+MIN_RRR = 1.4            # RRR minimal agar masuk pilihan akhir
+SCORE_PICK = 70          # Skor minimal pilihan akhir
+SCORE_FULL_SIZING = 85   # Skor "FULL SIZING"
+SECTOR_HOT_MIN = 70      # Rata-rata skor minimal sektor unggulan
+SECTOR_BONUS = 10        # Bonus skor saham di sektor unggulan
+
+# Jumlah ticker per task yang dikirim ke satu worker proses. Universe besar
+# (liquid_stocks.csv, 900+ emiten) memakai batch lebih besar agar jumlah task
+# ±TASKS_PER_WORKER per worker: overhead kirim antar proses tetap kecil tapi
+# beban masih terbagi rata.
+TASK_BATCH_SIZE = 32
+MAX_TASK_BATCH_SIZE = 128
+TASKS_PER_WORKER = 4
+
+# Thread I/O (baca panel mmap / store lokal / info) per scan
+SCAN_IO_WORKERS = int(os.environ.get("SCAN_IO_WORKERS", 10))
+
+# Batas waktu scan (detik) untuk universe penuh dengan store lokal yang sudah
+# hangat (warmup.py). Lebih dari ini → peringatan di log; lihat benchmark di
+# test_screening_engine.py.
+SCAN_LATENCY_BUDGET = {"Day Trading": 30.0, "Swing Trading": 30.0}
+
+# Snapshot hasil screening headless (dibaca UI / job lain)
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "screening")
+
+# Alias mode untuk CLI
+TRADE_MODES = {"day": "Day Trading", "swing": "Swing Trading"}
+
+_PROCESS_POOL = None
+_PROCESS_POOL_WORKERS = None
+
+
+# --- FUNGSI PEMBANTU (Helper) ---
+def format_rp(angka):
+    """Fungsi untuk memformat angka menjadi format ribuan dengan titik"""
+    if isinstance(angka, str):
+        return angka
+    return f"{int(angka):,}".replace(',', '.')
+
+def compact_info(info):
+    """Ambil hanya field info yang dipakai scoring (dict kecil, mudah di-pickle)."""
+    info = info or {}
+    return {k: info.get(k) for k in INFO_FIELDS}
+
+def history_to_array(df):
+    """DataFrame OHLCV → array float64 (bar × 5) berurutan sesuai OHLCV_FIELDS."""
+    if df is None or df.empty:
+        return np.empty((0, len(OHLCV_FIELDS)))
+    return df.reindex(columns=list(OHLCV_FIELDS)).to_numpy(dtype=np.float64)
+
+
+# --- MARKET SESSION ---
+def get_market_session():
+    tz = pytz.timezone('Asia/Jakarta')
+    now = datetime.now(tz)
+    if now.weekday() >= 5: return "AKHIR PEKAN", "Tutup."
+    if now.date() in holidays.ID(years=now.year): return "LIBUR NASIONAL", "Tutup."
+    curr_time = now.hour + now.minute/60
+    if curr_time < 9.0: return "PRA-PASAR", "Wait."
+    elif 9.0 <= curr_time <= 16.0: return "LIVE MARKET", "Trading."
+    else: return "PASCA-PASAR", "Analysis."
+
+
+# --- TAHAP 1: PRE-FILTER FUNDAMENTAL (Vectorized) ---
+def fundamental_prefilter(snapshot):
+    """
+    Evaluasi gerbang fundamental seluruh universe sekaligus dari tabel snapshot
+    info (index = ticker, kolom INFO_FIELDS). Aturannya sama dengan pre-filter
+    di score_stock:
+        - marketCap (USD) wajib > MC_MIN_USD
+        - ROE & ROA wajib > 0 jika tersedia; jika keduanya kosong → "Unrated"
+
+    Return DataFrame (index = ticker) kolom 'Lolos' (bool) dan 'Quality'.
+    """
+    snapshot = snapshot.reindex(columns=list(INFO_FIELDS))
+    market_cap = snapshot['marketCap'].astype(float)
+    roe = snapshot['returnOnEquity'].astype(float)
+    roa = snapshot['returnOnAssets'].astype(float)
+
+    roe_valid, roa_valid = roe.notna(), roa.notna()
+    lolos = (
+        (market_cap > MC_MIN_USD)
+        & (~roe_valid | (roe > 0))
+        & (~roa_valid | (roa > 0))
+    )
+    quality = np.where(roe_valid | roa_valid, "Rated", "Unrated")
+    return snapshot.assign(Lolos=lolos.to_numpy(), Quality=quality)[['Lolos', 'Quality']]
+
+
+# --- TAHAP 2: SCORING TEKNIKAL (Aturan Deklaratif, Vectorized) ---
+def score_universe(tickers, values, trade_mode, mtf_filter, infos=None, daily=None):
+    """
+    Menilai banyak saham sekaligus dengan aturan di scoring_rules.RULES.
+
+    Parameter:
+        tickers     : list kode saham (.JK), urut sesuai sumbu pertama `values`
+        values      : array ticker × waktu × field OHLCV (bar tanpa transaksi = NaN)
+        trade_mode  : "Day Trading" (M15) atau "Swing Trading" (Daily)
+        mtf_filter  : Buang saham yang tidak searah tren besar
+        infos       : list dict info ringkas per ticker (None = gerbang fundamental
+                      dianggap sudah lolos di tahap 1, Quality "Rated")
+        daily       : array ticker × 3 (close_d, ma20_d, ma50_d) dari tabel
+                      daily_context, khusus Day Trading (NaN = tanpa bonus MTF)
+
+    Return:
+        list dict hasil (Ticker, Sektor, Syariah, Quality, Skor, Harga, ATR, Alasan, RSI).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    enough = (~np.isnan(values[:, :, CLOSE])).sum(axis=1) >= 2
+    if infos is not None:
+        gate = fundamental_prefilter(pd.DataFrame(list(infos), index=list(tickers)))
+        enough &= gate['Lolos'].to_numpy()
+        quality = gate['Quality'].to_numpy()
+    else:
+        quality = np.full(len(tickers), "Rated")
+
+    idx = np.flatnonzero(enough)
+    if len(idx) == 0:
+        return []
+    if daily is not None:
+        daily = np.asarray(daily, dtype=np.float64)[idx]
+
+    features = compute_features(values[idx], trade_mode, daily)
+    score, alasan, keep = evaluate_rules(features, trade_mode, mtf_filter)
+
+    results = []
+    kept = np.flatnonzero(keep)
+    ids = ticker_ids([tickers[idx[j]] for j in kept])
+    for j, sector_code, syariah in zip(kept, SECTOR_CODES[ids], SYARIAH_MASK[ids]):
+        i = idx[j]
+        results.append({
+            "Ticker": tickers[i].replace(".JK", ""), "Sektor": SECTORS[sector_code],
+            "Syariah": "Ya" if syariah else "Tidak",
+            "Quality": quality[i], "Skor": int(score[j]),
+            "Harga": int(features['close'][j, -1]), "ATR": features['atr'][j, -1],
+            "Alasan": alasan[j], "RSI": features['rsi'][j, -1]
+        })
+    return results
+
+def score_stock(ticker, trade_mode, mtf_filter, ohlcv, info, daily=None):
+    """
+    Menilai satu saham dari array OHLCV (bar × 5, lihat OHLCV_FIELDS), info
+    ringkas (compact_info) dan baris konteks daily (opsional, Day Trading).
+    Return dict hasil atau None jika gugur filter.
+    """
+    try:
+        daily = None if daily is None else np.asarray(daily, dtype=np.float64)[None]
+        results = score_universe([ticker], np.asarray(ohlcv)[None], trade_mode, mtf_filter, [info], daily)
+        return results[0] if results else None
+    except Exception:
+        return None
+
+def score_batch(trade_mode, mtf_filter, items):
+    """Entry point worker: items = list (ticker, ohlcv, info, baris konteks daily) → list hasil."""
+    if not items:
+        return []
+    tickers = [t for t, _, _, _ in items]
+    try:
+        values = stack_right_aligned([o for _, o, _, _ in items], n_fields=len(OHLCV_FIELDS))
+        daily = None
+        if trade_mode == "Day Trading":
+            missing = np.full(len(DAILY_FIELDS), np.nan)
+            daily = np.vstack([d if d is not None else missing for _, _, _, d in items])
+        return score_universe(tickers, values, trade_mode, mtf_filter, [i for _, _, i, _ in items], daily)
+    except Exception as e:
+        # Satu ticker bermasalah tidak boleh menggagalkan satu batch → ulang per ticker
+        print(f"Peringatan: Scoring batch gagal, diulang per saham. Detail: {e}")
+        results = (score_stock(t, trade_mode, mtf_filter, o, i, d) for t, o, i, d in items)
+        return [r for r in results if r is not None]
+
+
+# --- BACKEND EKSEKUSI ---
+def _get_process_pool(max_workers=None):
+    """Pool proses dipakai ulang antar scan (start-up worker ±1 detik per proses)."""
+    global _PROCESS_POOL, _PROCESS_POOL_WORKERS
+    max_workers = max_workers or os.cpu_count() or 1
+    if _PROCESS_POOL is None or _PROCESS_POOL_WORKERS != max_workers:
+        if _PROCESS_POOL is not None:
+            _PROCESS_POOL.shutdown(wait=False, cancel_futures=True)
+        # "spawn": aman dipakai dari server Streamlit yang multi-thread
+        _PROCESS_POOL = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        _PROCESS_POOL_WORKERS = max_workers
+    return _PROCESS_POOL
+
+def shutdown_process_pool():
+    global _PROCESS_POOL, _PROCESS_POOL_WORKERS
+    if _PROCESS_POOL is not None:
+        _PROCESS_POOL.shutdown(wait=True, cancel_futures=True)
+    _PROCESS_POOL, _PROCESS_POOL_WORKERS = None, None
+
+def make_loader(get_history, get_info, get_context=None):
+    """
+    Buat fungsi load(ticker) → (ticker, ohlcv, info ringkas, konteks daily) atau None.
+
+    get_history(ticker) → DataFrame OHLCV, get_info(ticker) → dict info,
+    get_context(ticker) → array (close_d, ma20_d, ma50_d) dari tabel daily_context
+    (opsional, untuk MTF Day Trading; lookup O(1), tanpa fetch history harian).
+    """
+    def load(ticker):
+        try:
+            ohlcv = history_to_array(get_history(ticker))
+            if len(ohlcv) == 0:
+                return None
+            context = get_context(ticker) if get_context is not None else None
+            return (ticker, ohlcv, compact_info(get_info(ticker)), context)
+        except Exception as e:
+            print(f"Peringatan: Gagal memuat data {ticker}. Detail: {e}")
+            return None
+    return load
+
+def fetch_inputs(tickers, get_history, get_info, get_context=None, io_workers=10):
+    """Fase I/O (thread) sekaligus: list input scoring untuk ticker yang punya data."""
+    load = make_loader(get_history, get_info, get_context)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=io_workers) as executor:
+        return [item for item in executor.map(load, tickers) if item is not None]
+
+def iter_scan(tickers, load_item, trade_mode, mtf_filter, backend=None, max_workers=None,
+              io_workers=10, batch_size=TASK_BATCH_SIZE):
+    """
+    Scan streaming: I/O dan scoring berjalan tumpang-tindih.
+
+    Ticker di-load oleh thread I/O; setiap `batch_size` item yang siap langsung
+    dikirim ke backend komputasi. Generator ini menghasilkan (jumlah ticker
+    selesai, list hasil batch) begitu satu batch selesai dinilai.
+
+    Jika pemanggil berhenti di tengah jalan (break, exception, atau Streamlit
+    menghentikan script karena user pindah halaman), semua future I/O dan
+    scoring yang belum berjalan dibatalkan di blok finally.
+    """
+    backend = backend or SCREENING_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend tidak dikenal: {backend} (pilihan: {BACKENDS})")
+
+    io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=io_workers)
+    thread_pool = None
+    if backend == "process":
+        executor = _get_process_pool(max_workers)
+    else:
+        executor = thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or 10)
+
+    io_futures = [io_pool.submit(load_item, t) for t in tickers]
+    pending = {}  # future scoring → batch
+    buffer = []
+    skipped = 0
+    done = 0
+
+    def submit(batch):
+        nonlocal executor, thread_pool
+        try:
+            pending[executor.submit(score_batch, trade_mode, mtf_filter, batch)] = batch
+        except concurrent.futures.process.BrokenProcessPool as e:
+            print(f"Peringatan: Pool proses screening gagal, beralih ke thread. Detail: {e}")
+            shutdown_process_pool()
+            executor = thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or 10)
+            pending[executor.submit(score_batch, trade_mode, mtf_filter, batch)] = batch
+
+    def collect(future):
+        batch = pending.pop(future)
+        try:
+            return future.result()
+        except concurrent.futures.process.BrokenProcessPool as e:
+            # Worker mati (OOM / gagal spawn) → batch ini dinilai ulang di thread ini
+            print(f"Peringatan: Pool proses screening gagal, batch dinilai ulang. Detail: {e}")
+            return score_batch(trade_mode, mtf_filter, batch)
+
+    try:
+        for io_future in concurrent.futures.as_completed(io_futures):
+            item = io_future.result()
+            if item is None:
+                skipped += 1
+            else:
+                buffer.append(item)
+            if len(buffer) >= batch_size:
+                submit(buffer)
+                buffer = []
+            for future in [f for f in pending if f.done()]:
+                batch_len = len(pending[future])
+                results = collect(future)
+                done += batch_len
+                yield done + skipped, results
+
+        if buffer:
+            submit(buffer)
+        while pending:
+            future = next(concurrent.futures.as_completed(list(pending)))
+            batch_len = len(pending[future])
+            results = collect(future)
+            done += batch_len
+            yield done + skipped, results
+        if not done:
+            # Semua ticker gagal di-load: tetap laporkan progres akhir
+            yield skipped, []
+    finally:
+        for future in io_futures:
+            future.cancel()
+        for future in pending:
+            future.cancel()
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        if thread_pool is not None:
+            thread_pool.shutdown(wait=False, cancel_futures=True)
+
+def score_items(items, trade_mode, mtf_filter, backend=None, max_workers=None,
+                batch_size=TASK_BATCH_SIZE, on_progress=None):
+    """
+    Fase komputasi untuk input yang sudah di-load (lihat fetch_inputs).
+
+    on_progress(selesai, total) dipanggil setiap satu batch selesai.
+    Return list hasil (ticker yang gugur pre-filter tidak dimasukkan).
+    """
+    results = []
+    for completed, batch_results in iter_scan(items, lambda item: item, trade_mode, mtf_filter,
+                                              backend=backend, max_workers=max_workers,
+                                              io_workers=1, batch_size=batch_size):
+        results.extend(batch_results)
+        if on_progress is not None:
+            on_progress(completed, len(items))
+    return results
+
+
+# --- LEADERBOARD TOP-K (Streaming) ---
+def new_leaderboard(k=10):
+    """
+    Papan peringkat streaming: heap top-K keseluruhan & per sektor, plus
+    statistik skor per sektor (untuk rotasi sektor) tanpa menyimpan semua hasil.
+    """
+    return {"k": k, "overall": [], "sectors": {}, "sector_stats": {}, "seq": 0, "count": 0}
+
+def _push_top_k(heap, k, entry):
+    if len(heap) < k:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+def leaderboard_add(board, result, eligible=True):
+    """
+    Catat satu hasil. Semua hasil masuk statistik sektor; hanya yang `eligible`
+    (mis. RRR memenuhi syarat) yang masuk heap top-K. Saat skor sama, hasil
+    yang datang lebih dulu dipertahankan.
+    """
+    sektor = result['Sektor']
+    stats = board["sector_stats"].setdefault(sektor, [0.0, 0])
+    stats[0] += result['Skor']
+    stats[1] += 1
+    board["count"] += 1
+    if not eligible:
+        return
+    board["seq"] += 1
+    entry = (result['Skor'], -board["seq"], result)
+    _push_top_k(board["overall"], board["k"], entry)
+    _push_top_k(board["sectors"].setdefault(sektor, []), board["k"], entry)
+
+def _ranked(heap):
+    return [entry[2] for entry in sorted(heap, reverse=True)]
+
+def leaderboard_top(board, sektor=None):
+    """Top-K saat ini (urut skor tertinggi), keseluruhan atau untuk satu sektor."""
+    if sektor is None:
+        return _ranked(board["overall"])
+    return _ranked(board["sectors"].get(sektor, []))
+
+def leaderboard_candidates(board):
+    """
+    Gabungan top-K semua sektor. Bonus sektor bersifat seragam dalam satu sektor,
+    jadi top-K akhir setelah bonus pasti ada di dalam kumpulan ini.
+    """
+    entries = [entry for heap in board["sectors"].values() for entry in heap]
+    return [entry[2] for entry in sorted(entries, reverse=True)]
+
+def leaderboard_sector_summary(board):
+    """Rata-rata skor & jumlah saham per sektor (format sama dengan groupby lama)."""
+    stats = board["sector_stats"]
+    summary = pd.DataFrame(
+        {"Avg_Score": [total / n for total, n in stats.values()],
+         "Jumlah_Saham": [n for _, n in stats.values()]},
+        index=pd.Index(list(stats), name='Sektor')
+    )
+    return summary.sort_values('Avg_Score', ascending=False)
+
+
+# --- ANALISA ROTASI SEKTOR ---
+def analyze_sector_momentum(full_results_df):
+    if full_results_df.empty:
+        return pd.DataFrame(), []
+    sector_summary = full_results_df.groupby('Sektor').agg({
+        'Skor': 'mean',
+        'Ticker': 'count'
+    }).rename(columns={'Ticker': 'Jumlah_Saham', 'Skor': 'Avg_Score'}).sort_values('Avg_Score', ascending=False)
+    return leading_sectors_from_summary(sector_summary)
+
+def leading_sectors_from_summary(sector_summary):
+    """Sektor unggulan dari ringkasan sektor (Avg_Score, Jumlah_Saham)."""
+    if sector_summary.empty:
+        return pd.DataFrame(), []
+    # UPDATE: Standar kekuatan sektor dinaikkan menjadi 70 menyesuaikan kondisi pasar
+    leading_sectors = sector_summary[sector_summary['Avg_Score'] >= SECTOR_HOT_MIN].index.tolist()
+    return sector_summary, leading_sectors
+
+# --- RENCANA TRADING (SL/TP) & POSITION SIZING ---
+def build_trade_plan(stock, trade_mode):
+    """
+    Proteksi berlapis SL/TP untuk satu hasil screening.
+    Return dict sl, tp, rrr, pct_risk, pct_reward.
+    """
+    harga = stock['Harga']
+    plan = TRADE_PLAN_PARAMS[trade_mode]
+
+    # ATR SL: 1.5x ATR (Day Trade) atau 2x ATR (Swing)
+    atr_sl = int(harga - (plan['sl_mult'] * stock['ATR']))
+
+    # Hard Cap SL: maks -3% (Day Trade) atau -8% (Swing)
+    hard_cap_sl = int(harga * (1 - plan['max_loss_pct']))
+
+    # Pilih SL yang paling ketat (nilai terbesar/terdekat dengan harga)
+    sl = max(atr_sl, hard_cap_sl)
+
+    # TP dengan RR minimal 1.5x (Day) atau 2.0x (Swing)
+    tp = int(harga + (harga - sl) * plan['rr_min'])
+
+    rrr = (tp - harga) / (harga - sl) if harga > sl else 0
+
+    pct_risk = ((harga - sl) / harga) * 100 if harga > 0 else 0
+    pct_reward = ((tp - harga) / harga) * 100 if harga > 0 else 0
+    return {"sl": sl, "tp": tp, "rrr": rrr, "pct_risk": pct_risk, "pct_reward": pct_reward}
+
+def hitung_lot_maksimal(harga, sl, modal_risiko, batas_alokasi_rp):
+    """Lot maksimal dari batas kerugian per saham & batas alokasi 15% modal."""
+    risiko_per_lembar = harga - sl
+    if risiko_per_lembar <= 0:
+        return 0
+    lembar_maks_risiko = modal_risiko / risiko_per_lembar
+    lembar_maks_alokasi = batas_alokasi_rp / harga
+    lembar_final = min(lembar_maks_risiko, lembar_maks_alokasi)
+    return int(lembar_final / 100)
+
+def finalize_picks(board, trade_mode, sector_boost, top_n=10):
+    """
+    Pilihan akhir dari leaderboard: bonus Sector Hot, SL/TP, lalu filter
+    Skor >= 70 & RRR >= 1.4. Belum termasuk position sizing (Lot_Maks), karena
+    itu bergantung pada modal tiap user (lihat apply_position_sizing).
+
+    Return (final_picks, sector_report).
+    """
+    sector_report, leading_sectors = leading_sectors_from_summary(leaderboard_sector_summary(board))
+
+    final_picks = []
+    for stock in leaderboard_candidates(board):
+        f_score = stock['Skor']
+        alasan = list(stock['Alasan'])
+
+        if sector_boost and stock['Sektor'] in leading_sectors:
+            f_score += SECTOR_BONUS
+            alasan.append(f"Sector Hot: {stock['Sektor']}")
+
+        # Hard cap final setelah bonus Sector Hot
+        f_score = min(round(f_score), 100)
+
+        # --- PROTEKSI BERLAPIS: SL/TP ---
+        plan = build_trade_plan(stock, trade_mode)
+        sl, tp, rrr = plan['sl'], plan['tp'], plan['rrr']
+
+        if f_score >= SCORE_PICK and rrr >= MIN_RRR:
+            final_picks.append({
+                "Ticker": stock['Ticker'], "Sektor": stock['Sektor'], "Skor": f_score,
+                "Harga_Saat_Ini": int(stock['Harga']),
+                "Syariah": stock['Syariah'],
+                "Quality": stock['Quality'],
+                "Entry": f"Rp {format_rp(stock['Harga']*0.99)} - {format_rp(stock['Harga'])}",
+                "SL": sl, "TP": tp, "RRR": f"{rrr:.1f}x",
+                "Status": "🔥 FULL SIZING" if f_score >= SCORE_FULL_SIZING else "🎯 CICIL SEBAGIAN",
+                "Logic": " | ".join(alasan),
+                "Pct_Risk": f"-{plan['pct_risk']:.1f}%",
+                "Pct_Reward": f"+{plan['pct_reward']:.1f}%"
+            })
+
+    final_picks.sort(key=lambda x: x['Skor'], reverse=True)
+    return final_picks[:top_n], sector_report
+
+def apply_position_sizing(final_picks, modal_risiko, batas_alokasi_rp):
+    """Salinan final_picks dengan kolom Lot_Maks sesuai modal & batas risiko user."""
+    sized = []
+    for pick in final_picks:
+        lot_maksimal = hitung_lot_maksimal(pick['Harga_Saat_Ini'], pick['SL'], modal_risiko, batas_alokasi_rp)
+        sized.append({**pick, "Lot_Maks": f"{format_rp(lot_maksimal)} Lot"})
+    return sized
+
+
+# --- SCAN LENGKAP (Dipakai UI & CLI) ---
+def universe_tickers(trade_mode=None):
+    """
+    Ticker universe (.JK), unik & terurut. Jika liquid_stocks.csv tersedia, universe
+    diambil dari file itu sesuai flag likuiditas mode (day_trade / swing_trade);
+    selain itu memakai universe bawaan (UNIVERSE_SAHAM).
+    """
+    if trade_mode is not None:
+        tickers = liquid_tickers(trade_mode)
+        if tickers is not None:
+            return tickers
+    return list(YF_TICKERS)
+
+def scan_batch_size(n_tickers, max_workers=None):
+    """Ukuran batch scoring untuk universe berukuran n_tickers."""
+    workers = max_workers or os.cpu_count() or 1
+    per_task = -(-n_tickers // (workers * TASKS_PER_WORKER))
+    return int(min(max(TASK_BATCH_SIZE, per_task), MAX_TASK_BATCH_SIZE))
+
+def liquid_label_map():
+    """dict kode → (sektor, syariah) dari liquid_stocks.csv, atau None jika file tidak ada."""
+    liquid = load_liquid_universe()
+    if liquid is None:
+        return None
+    return dict(zip(liquid.index, zip(liquid['sektor'], liquid['syariah'])))
+
+def apply_liquid_labels(results, labels):
+    """Sektor & status syariah dari liquid_stocks.csv (taksonomi sektor yang sama untuk semua)."""
+    for stock in results:
+        label = labels.get(stock['Ticker'])
+        if label is not None:
+            stock['Sektor'], syariah = label
+            stock['Syariah'] = "Ya" if syariah else "Tidak"
+    return results
+
+def run_scan(trade_mode, mtf_filter=True, sector_boost=True, tickers=None, backend=None,
+             top_n=10, on_status=None, on_batch=None, max_workers=None):
+    """
+    Menjalankan screening penuh tanpa Streamlit:
+        tahap 1 snapshot info + pre-filter fundamental,
+        tahap 2 panel harga + scoring streaming ke leaderboard,
+        lalu rotasi sektor & SL/TP.
+
+    on_status(teks)                  : pesan progres antar tahap
+    on_batch(selesai, total, board)  : dipanggil setiap batch scoring selesai
+
+    Return dict: final_picks, sector_report, trade_mode, mtf_filter, sector_boost,
+    total_universe, lolos_fundamental, dinilai, durasi_detik, generated_at (ISO WIB).
+    """
+    def status(text):
+        if on_status is not None:
+            on_status(text)
+
+    started = time.perf_counter()
+    tickers = sorted(set(tickers)) if tickers is not None else universe_tickers(trade_mode)
+    labels = liquid_label_map()
+
+    # TAHAP 1: gerbang fundamental (market cap, ROE/ROA) untuk seluruh universe
+    # sekaligus dari snapshot info → hanya yang lolos yang diambil history-nya
+    status("Menyaring fundamental seluruh universe...")
+    snapshot = refresh_info_snapshot(tickers)
+    gate = fundamental_prefilter(snapshot)
+    lolos = gate.index[gate['Lolos']].tolist()
+    status(f"{len(lolos)} dari {len(tickers)} saham lolos filter fundamental.")
+
+    # TAHAP 2: satu panel harga (memory-mapped) untuk saham yang lolos
+    interval = '15m' if trade_mode == "Day Trading" else '1d'
+    panel = get_universe_panel(lolos, interval=interval) if lolos else None
+
+    def get_history(ticker):
+        if panel is not None and ticker in panel["ticker_index"]:
+            return panel_history(panel, ticker)
+        return refresh_history(ticker, interval)
+
+    def get_info(ticker):
+        return snapshot.loc[ticker].to_dict()
+
+    # Day Trading: konteks tren Daily dari tabel harian (dibangun sekali per hari),
+    # scan intraday hanya mengambil data 15m
+    get_context = None
+    if trade_mode == "Day Trading" and lolos:
+        get_context = context_lookup(get_daily_context(lolos)).get
+
+    status("Menyegarkan data harga saham yang lolos...")
+    load_item = make_loader(get_history, get_info, get_context)
+    board = new_leaderboard(k=top_n)
+    scan = iter_scan(lolos, load_item, trade_mode, mtf_filter, backend=backend, max_workers=max_workers,
+                     io_workers=SCAN_IO_WORKERS, batch_size=scan_batch_size(len(lolos), max_workers))
+    for completed, batch_results in scan:
+        if labels is not None:
+            batch_results = apply_liquid_labels(batch_results, labels)
+        for stock in batch_results:
+            # Hanya kandidat yang rencana tradingnya layak (RRR) masuk heap top-K
+            plan = build_trade_plan(stock, trade_mode)
+            leaderboard_add(board, stock, eligible=plan['rrr'] >= MIN_RRR)
+        if on_batch is not None:
+            on_batch(completed, len(lolos), board)
+
+    final_picks, sector_report = finalize_picks(board, trade_mode, sector_boost, top_n=top_n)
+    elapsed = time.perf_counter() - started
+    if elapsed > SCAN_LATENCY_BUDGET[trade_mode]:
+        print(f"Peringatan: Scan {trade_mode} {len(tickers)} saham {elapsed:.1f} detik, "
+              f"melewati batas {SCAN_LATENCY_BUDGET[trade_mode]:.0f} detik.")
+    return {
+        "final_picks": final_picks,
+        "sector_report": sector_report,
+        "trade_mode": trade_mode,
+        "mtf_filter": mtf_filter,
+        "sector_boost": sector_boost,
+        "total_universe": len(tickers),
+        "lolos_fundamental": len(lolos),
+        "dinilai": board["count"],
+        "durasi_detik": round(elapsed, 2),
+        "generated_at": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(timespec='seconds'),
+    }
+
+
+# --- SNAPSHOT HASIL (Parquet / JSON) ---
+def _snapshot_meta(result):
+    return {k: v for k, v in result.items() if k not in ("final_picks", "sector_report")}
+
+def write_snapshot(result, out=None, fmt="both"):
+    """
+    Menulis hasil run_scan ke disk secara atomik.
+
+    - out None  : <SNAPSHOT_DIR>/<mode>_<YYYYmmdd-HHMMSS>.{parquet,json}
+    - out path  : format mengikuti ekstensi (.parquet / .json)
+    JSON berisi metadata, final_picks & sector_report; Parquet berisi tabel final_picks
+    (metadata disimpan di kolom tambahan agar file tetap mandiri).
+    Return list path yang ditulis.
+    """
+    if out is None:
+        mode_key = "day" if result["trade_mode"] == "Day Trading" else "swing"
+        stamp = datetime.fromisoformat(result["generated_at"]).strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(SNAPSHOT_DIR, f"{mode_key}_{stamp}")
+        targets = [f"{base}.{ext}" for ext in (("parquet", "json") if fmt == "both" else (fmt,))]
+    else:
+        targets = [out]
+
+    written = []
+    for path in targets:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if path.endswith(".parquet"):
+            picks = pd.DataFrame(result["final_picks"])
+            for key, value in _snapshot_meta(result).items():
+                picks[key] = value
+            picks.to_parquet(tmp_path, index=False)
+        else:
+            payload = {
+                **_snapshot_meta(result),
+                "final_picks": result["final_picks"],
+                "sector_report": result["sector_report"].reset_index().to_dict(orient="records"),
+            }
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2, default=float)
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+def read_snapshot(path):
+    """Kebalikan write_snapshot untuk file .json → dict hasil seperti run_scan."""
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    sector_report = pd.DataFrame(payload.get("sector_report", []))
+    if 'Sektor' in sector_report.columns:
+        sector_report = sector_report.set_index('Sektor')
+    return {**payload, "sector_report": sector_report}
+
+def main(argv=None):
+    """Entry point CLI (cron sebelum pembukaan & setelah penutupan bursa)."""
+    parser = argparse.ArgumentParser(description="Screening saham headless (tanpa Streamlit).")
+    parser.add_argument("--mode", choices=sorted(TRADE_MODES), default="swing")
+    parser.add_argument("--out", help="File output (.parquet / .json). Default: snapshot bertimestamp di SNAPSHOT_DIR")
+    parser.add_argument("--format", choices=("parquet", "json", "both"), default="both",
+                        help="Format snapshot bertimestamp jika --out tidak diisi")
+    parser.add_argument("--no-mtf", action="store_true", help="Matikan filter searah tren besar")
+    parser.add_argument("--no-sector-boost", action="store_true", help="Matikan bonus Sector Hot")
+    parser.add_argument("--backend", choices=BACKENDS, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah worker scoring")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    result = run_scan(
+        TRADE_MODES[args.mode], mtf_filter=not args.no_mtf, sector_boost=not args.no_sector_boost,
+        backend=args.backend, top_n=args.top, on_status=print, max_workers=args.workers
+    )
+    paths = write_snapshot(result, out=args.out, fmt=args.format)
+    print(f"✅ {len(result['final_picks'])} saham terpilih dari {result['dinilai']} yang dinilai "
+          f"({time.perf_counter() - started:.1f} detik).")
+    for path in paths:
+        print(f"   → {path}")
+    shutdown_process_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,10 +13,12 @@ from fpdf import FPDF
 try:
     from modules.data_loader import get_full_stock_data
     from modules.universe import is_syariah
+    from modules.indicators import compute_indicator
 except ModuleNotFoundError:
     # Fallback jika dipanggil dari internal folder
     from .data_loader import get_full_stock_data
     from .universe import is_syariah
+    from .indicators import compute_indicator
 
 def translate_sector(sector_en):
     mapping = {
@@ -62,40 +64,34 @@ def analyze_news_sentiment(ticker_symbol):
         return "Netral", "Gagal memuat berita."
 
 # --- FUNGSI ANALISA TEKNIKAL MENDALAM ---
-def calculate_technical_pro(df):
-    df['MA20'] = df['Close'].rolling(20).mean()
-    df['MA50'] = df['Close'].rolling(50).mean()
-    df['MA200'] = df['Close'].rolling(200).mean()
+def calculate_technical_pro(df, ticker=None):
+    """
+    Indikator analisa teknikal harian. `ticker` mengaktifkan cache indikator bersama.
+    Mengembalikan bundle kolom indikator (index sama dengan `df`); `df` tidak diubah.
+    """
+    def ind(name, **params):
+        return compute_indicator(df, name, ticker, '1d', **params)
+
+    cols = {}
+    cols['MA20'] = ind('sma', window=20)
+    cols['MA50'] = ind('sma', window=50)
+    cols['MA200'] = ind('sma', window=200)
     
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    df['RSI'] = 100 - (100 / (1 + (gain/loss)))
+    cols['RSI'] = ind('rsi', window=14)
+    cols['MACD'], cols['Signal_Line'], cols['MACD_Hist'] = ind('macd', fast=12, slow=26, signal=9)
     
-    exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-    exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = exp1 - exp2
-    df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    df['MACD_Hist'] = df['MACD'] - df['Signal_Line']
-    
-    df['BB_Mid'] = df['MA20']
-    df['BB_Std'] = df['Close'].rolling(20).std()
-    df['BB_Upper'] = df['BB_Mid'] + (2 * df['BB_Std'])
-    df['BB_Lower'] = df['BB_Mid'] - (2 * df['BB_Std'])
-
-    high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift())
-    low_close = np.abs(df['Low'] - df['Close'].shift())
-    df['ATR'] = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1).rolling(14).mean()
+    cols['BB_Mid'], cols['BB_Upper'], cols['BB_Lower'] = ind('bollinger', window=20, n_std=2)
+
+    cols['ATR'] = ind('atr', period=14)
     
-    df['Vol_MA20'] = df['Volume'].rolling(20).mean()
-    df['Typical_Price'] = (df['High'] + df['Low'] + df['Close']) / 3
-    df['VWAP_20'] = (df['Typical_Price'] * df['Volume']).rolling(20).sum() / df['Volume'].rolling(20).sum()
-    df['EMA9'] = df['Close'].ewm(span=9, adjust=False).mean()
-    df['EMA21'] = df['Close'].ewm(span=21, adjust=False).mean()
-    df['Value'] = df['Close'] * df['Volume']
+    cols['Vol_MA20'] = ind('sma', window=20, column='Volume')
+    cols['Typical_Price'] = ((df['High'] + df['Low'] + df['Close']) / 3).to_numpy()
+    cols['VWAP_20'] = ind('vwap', window=20, typical=True)
+    cols['EMA9'] = ind('ema', span=9)
+    cols['EMA21'] = ind('ema', span=21)
+    cols['Value'] = (df['Close'] * df['Volume']).to_numpy()
     
-    return df
+    return pd.DataFrame(cols, index=df.index)
 
 # --- FUNGSI PDF MENGGUNAKAN FPDF ---
 def generate_pdf_fpdf(data, logo_path="logo_expert_stock_pro.png"):
@@ -292,7 +288,7 @@ def run_teknikal():
 
     if st.button(f"Jalankan Analisa Lengkap {ticker_input}"):
         with st.spinner("Mengevaluasi tren, indikator, pola, risiko, dan sentimen berita..."):
-            data = get_full_stock_data(ticker)
+            data = get_full_stock_data(ticker, components={"history", "info"})
             df = data['history']
             info = data.get('info', {})
             
@@ -300,7 +296,7 @@ def run_teknikal():
                 st.error("Data tidak mencukupi untuk analisa MA200. Mohon coba saham lain.")
                 return
 
-            df = calculate_technical_pro(df)
+            df = pd.concat([df, calculate_technical_pro(df, ticker=ticker)], axis=1)
             last = df.iloc[-1]
             prev_1 = df.iloc[-2] 
             prev_5 = df.iloc[-5] 
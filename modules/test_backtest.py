@@ -0,0 +1,161 @@
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    from modules import backtest, optimizer
+    from modules.screening_engine import score_universe
+    from modules.scoring_rules import SWING, DAY, stack_right_aligned, daily_trend_values
+    from modules.test_indicators import make_ohlc
+except ModuleNotFoundError:
+    import backtest
+    import optimizer
+    from screening_engine import score_universe
+    from scoring_rules import SWING, DAY, stack_right_aligned, daily_trend_values
+    from test_indicators import make_ohlc
+
+TICKERS = ["BBCA.JK", "BBRI.JK", "TLKM.JK", "ASII.JK", "ADRO.JK", "ANTM.JK", "UNVR.JK", "ICBP.JK"]
+
+
+def make_panel(n_tickers, n_bars, seed):
+    """Panel sintetis: sebagian ticker baru listing (NaN di kiri) & ada bar suspensi."""
+    rng = np.random.default_rng(seed)
+    values = np.full((n_tickers, n_bars, 5), np.nan)
+    for i in range(n_tickers):
+        df = make_ohlc(n_bars, seed * 1000 + i)
+        df['Open'] = df['Close'].shift().fillna(df['Close'])
+        values[i] = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy()
+        if i % 3 == 0:
+            values[i, :rng.integers(1, n_bars // 3)] = np.nan
+        if i % 4 == 1:
+            values[i, rng.choice(n_bars, 6, replace=False)] = np.nan
+    return values
+
+
+def _assert_matches_scan(values, history, trade_mode, daily_for=None):
+    """Skor backtest di bar t harus sama dengan scan yang dijalankan pada bar t."""
+    n_tickers, n_bars = values.shape[:2]
+    checked = 0
+    for t in range(3, n_bars, 11):
+        for i in range(n_tickers):
+            if np.isnan(values[i, t, 3]):
+                continue
+            daily = None if daily_for is None else daily_for(i, t)
+            result = score_universe([TICKERS[i % len(TICKERS)]], values[i:i + 1, :t + 1], trade_mode, True,
+                                    daily=daily)
+            if result:
+                assert history['keep'][i, t], (i, t)
+                assert history['score'][i, t] == result[0]['Skor'], (i, t)
+                assert np.isclose(history['atr'][i, t], result[0]['ATR'], equal_nan=True)
+            else:
+                assert not history['keep'][i, t], (i, t)
+            checked += 1
+    assert checked > 100
+
+
+def test_score_history_matches_scan_swing():
+    values = make_panel(12, 260, 1)
+    history = backtest.score_history(values, SWING, mtf_filter=True, chunk_size=5)
+    _assert_matches_scan(values, history, SWING)
+
+
+def test_score_history_matches_scan_day_with_daily_context():
+    n_tickers = 8
+    dates = pd.date_range("2024-01-02 09:00", periods=10 * 20, freq="15min")
+    dates = pd.DatetimeIndex([d + pd.Timedelta(days=i // 20) for i, d in enumerate(dates)])
+    daily_dates = pd.bdate_range(end=dates[-1].normalize(), periods=90)
+    values = make_panel(n_tickers, len(dates), 2)
+    daily_values = make_panel(n_tickers, len(daily_dates), 3)
+    context = backtest.daily_context(daily_values, daily_dates, dates)
+    history = backtest.score_history(values, DAY, mtf_filter=True, context=context)
+
+    def daily_for(i, t):
+        # Scan Day Trading dengan history harian s.d. sesi sebelum tanggal bar t
+        before = daily_dates < dates[t].normalize()
+        close = daily_values[i, before, 3]
+        return daily_trend_values(stack_right_aligned([close[~np.isnan(close)]]))
+
+    _assert_matches_scan(values, history, DAY, daily_for)
+
+
+def test_simulate_trades_outcomes():
+    # 4 ticker, sinyal di bar 0; entry 1000, SL 950, TP 1100
+    dates = pd.bdate_range("2024-01-01", periods=4)
+    values = np.full((4, 4, 5), 1000.0)
+    values[0, 1] = [990, 1120, 980, 1100, 1]    # TP
+    values[1, 1] = [990, 1000, 940, 960, 1]     # SL
+    values[2, 1] = [900, 920, 890, 910, 1]      # gap di bawah SL → keluar di Open
+    values[3, 1] = [990, 1150, 900, 1000, 1]    # SL & TP di bar sama → SL
+    picks = np.zeros((4, 4), dtype=bool)
+    picks[:, 0] = True
+    selection = {
+        "picks": picks, "f_score": np.full((4, 4), 80.0), "harga": np.full((4, 4), 1000.0),
+        "sl": np.full((4, 4), 950.0), "tp": np.full((4, 4), 1100.0),
+    }
+    trades = backtest.simulate_trades(values, dates, selection, backtest.backtest_params(SWING, max_hold=2))
+    assert list(trades["outcome"]) == ["TP", "SL", "SL", "SL"]
+    assert list(trades["exit"]) == [1100, 950, 900, 950]
+
+    # Tidak tersentuh → TIMEOUT di Close bar terakhir jendela
+    flat = np.full((1, 4, 5), 1000.0)
+    one = {k: v[:1] for k, v in selection.items()}
+    trades = backtest.simulate_trades(flat, dates, one, backtest.backtest_params(SWING, max_hold=2))
+    assert list(trades["outcome"]) == ["TIMEOUT"] and list(trades["bars_held"]) == [2]
+
+
+def test_run_backtest_summary():
+    values = make_panel(8, 300, 4)
+    dates = pd.bdate_range("2023-01-02", periods=300)
+    result = backtest.run_backtest(values, dates, TICKERS, SWING, mtf_filter=False, sector_boost=True)
+    summary = result["summary"]
+    assert list(summary.index) == [70, 85]
+    assert summary.loc[70, "Jumlah_Trade"] == len(result["trades"])
+    assert summary.loc[85, "Jumlah_Trade"] <= summary.loc[70, "Jumlah_Trade"]
+    assert (result["trades"]["Tanggal_Exit"] > result["trades"]["Tanggal_Entry"]).all()
+
+
+def test_score_history_cache_and_params():
+    # Cache indikator dipakai ulang antar parameter tanpa mengubah hasil
+    values = make_panel(10, 200, 6)
+    cache = {}
+    for params in ({"st_multiplier": 2}, {"st_multiplier": 3, "rsi_window": 9}, {"vol_spike": 1.5}):
+        cached = backtest.score_history(values, SWING, params=params, cache=cache, chunk_size=4)
+        fresh = backtest.score_history(values, SWING, params=params, chunk_size=4)
+        assert np.array_equal(cached['score'], fresh['score'])
+        assert np.array_equal(cached['keep'], fresh['keep'])
+    assert ('st_dir', 2) in next(iter(next(iter(cache.values())).values()))
+
+
+def test_sweep_matches_single_backtest():
+    values = make_panel(8, 250, 7)
+    dates = pd.bdate_range("2023-01-02", periods=250)
+    grid = {"st_multiplier": [2, 3], "rr_min": [1.5, 2.0]}
+    table = optimizer.run_sweep(values, dates, TICKERS, SWING, grid=grid, max_workers=1, min_trades=0)
+    assert len(table) == 4 and list(table["Rank"]) == [1, 2, 3, 4]
+    for _, row in table.iterrows():
+        combo = {"st_multiplier": int(row["st_multiplier"]), "rr_min": float(row["rr_min"])}
+        summary = backtest.run_backtest(values, dates, TICKERS, SWING, **combo)["summary"]
+        assert row["Jumlah_Trade@70"] == summary.loc[70, "Jumlah_Trade"]
+        assert np.isclose(row["Expectancy_R@70"], summary.loc[70, "Expectancy_R"], equal_nan=True)
+
+
+def benchmark(n_tickers=200, n_bars=500):
+    values = make_panel(n_tickers, n_bars, 5)
+    dates = pd.bdate_range("2022-01-03", periods=n_bars)
+    tickers = [TICKERS[i % len(TICKERS)] for i in range(n_tickers)]
+    t0 = time.perf_counter()
+    result = backtest.run_backtest(values, dates, tickers, SWING)
+    elapsed = time.perf_counter() - t0
+    print(f"📊 Backtest Swing {n_tickers} ticker × {n_bars} bar: {elapsed:.2f} detik")
+    print(result["summary"].round(2).to_string())
+
+
+if __name__ == "__main__":
+    test_score_history_matches_scan_swing()
+    test_score_history_matches_scan_day_with_daily_context()
+    test_simulate_trades_outcomes()
+    test_run_backtest_summary()
+    test_score_history_cache_and_params()
+    test_sweep_matches_single_backtest()
+    print("✅ Skor backtest identik dengan scan per tanggal.")
+    benchmark()
@@ -0,0 +1,126 @@
+import os
+import time
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    from modules import drive_sync
+except ModuleNotFoundError:
+    import drive_sync
+
+
+def make_universe(n=900, seed=0, stamp="2024-01-02 06:00:00"):
+    """Tabel seukuran liquid_stocks.csv hasil universe_generator."""
+    rng = np.random.default_rng(seed)
+    value = rng.lognormal(21, 1.5, n)
+    return pd.DataFrame({
+        "ticker": [f"T{i:03d}.JK" for i in range(n)],
+        "sektor": rng.choice(["Energy", "Financials", "Infrastructures", "Basic Materials"], n),
+        "syariah": rng.choice(["Ya", "Tidak", "Cek Manual"], n),
+        "value_MA20": value,
+        "day_trade": value >= 5e9, "swing_trade": value >= 2e9,
+        "avg_PER_3yr_sector": rng.normal(12, 3, n), "avg_PBV_3yr_sector": rng.normal(1.5, 0.4, n),
+        "last_update_universe": stamp,
+    })
+
+
+def test_sync_skips_unchanged_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = drive_sync.local_backend(tmp)
+        df = make_universe()
+        exclude = ("last_update_universe",)
+        assert drive_sync.sync_table(backend, df, "liquid_stocks", exclude_from_hash=exclude) == {
+            "liquid_stocks.parquet": "uploaded"}
+
+        # Isi sama (hanya timestamp berubah) → tidak diunggah ulang
+        again = df.assign(last_update_universe="2024-01-03 06:00:00")
+        assert drive_sync.sync_table(backend, again, "liquid_stocks", exclude_from_hash=exclude) == {
+            "liquid_stocks.parquet": "skipped"}
+
+        changed = df.copy()
+        changed.loc[5, "day_trade"] = not changed.loc[5, "day_trade"]
+        status = drive_sync.sync_table(backend, changed, "liquid_stocks", formats=("parquet", "csv"),
+                                       exclude_from_hash=exclude)
+        assert status == {"liquid_stocks.parquet": "uploaded", "liquid_stocks.csv": "uploaded"}
+
+        pd.testing.assert_frame_equal(drive_sync.read_table(backend, "liquid_stocks.parquet"), changed)
+        assert drive_sync.read_table(backend, "tidak_ada.csv") is None
+
+
+class _FakeHttpError(Exception):
+    """Bentuk minimal googleapiclient.errors.HttpError (status di .resp)."""
+    def __init__(self, status):
+        super().__init__(status)
+        self.resp = type("Resp", (), {"status": status})()
+
+
+def _fake_drive(files):
+    """Service Drive palsu: cukup list & get(appProperties) untuk remote_hash."""
+    class Request:
+        def __init__(self, fn):
+            self.execute = fn
+
+    class Files:
+        def list(self, q, fields):
+            name = q.split("'")[1]
+            return Request(lambda: {"files": [dict(v, name=name) for k, v in files.items() if k == name]})
+
+        def get(self, fileId, fields):
+            def execute():
+                for meta in files.values():
+                    if meta["id"] == fileId:
+                        return {"appProperties": dict(meta["appProperties"])}
+                raise _FakeHttpError(404)
+            return Request(execute)
+
+    service = type("Service", (), {"files": lambda self: Files()})()
+    return {"kind": "gdrive", "folder_id": "F", "service": service, "files": {}, "lock": threading.Lock()}
+
+
+def test_remote_hash_rereads_properties_and_drops_deleted_ids():
+    files = {"liquid_stocks.parquet": {"id": "A", "appProperties": {drive_sync.HASH_PROPERTY: "lama"}}}
+    backend = _fake_drive(files)
+    assert drive_sync.remote_hash(backend, "liquid_stocks.parquet") == "lama"
+
+    # Proses lain menimpa file → hash di cache tidak boleh dipakai untuk skip
+    files["liquid_stocks.parquet"]["appProperties"] = {drive_sync.HASH_PROPERTY: "baru"}
+    assert drive_sync.remote_hash(backend, "liquid_stocks.parquet") == "baru"
+
+    # File dihapus lalu dibuat ulang dengan ID lain → ID basi dibuang, folder di-list ulang
+    files["liquid_stocks.parquet"] = {"id": "B", "appProperties": {drive_sync.HASH_PROPERTY: "baru"}}
+    assert drive_sync.remote_hash(backend, "liquid_stocks.parquet") is None
+    assert "liquid_stocks.parquet" not in backend["files"]
+    assert drive_sync.remote_hash(backend, "liquid_stocks.parquet") == "baru"
+    assert backend["files"]["liquid_stocks.parquet"]["id"] == "B"
+
+
+def test_parquet_payload_smaller_than_csv():
+    df = make_universe()
+    assert len(drive_sync.table_payload(df)) < len(drive_sync.table_payload(df, "csv"))
+
+
+def benchmark(n=900, runs=20):
+    df = make_universe(n)
+    csv_bytes = len(drive_sync.table_payload(df, "csv"))
+    parquet_bytes = len(drive_sync.table_payload(df))
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = drive_sync.local_backend(tmp)
+        t0 = time.perf_counter()
+        for i in range(runs):
+            drive_sync.sync_table(backend, df.assign(last_update_universe=str(i)), "liquid_stocks",
+                                  exclude_from_hash=("last_update_universe",))
+        elapsed = (time.perf_counter() - t0) / runs
+        uploaded = os.path.getsize(os.path.join(tmp, "liquid_stocks.parquet"))
+    print(f"📦 Payload {n} emiten: CSV {csv_bytes / 1024:.1f} KB → Parquet zstd {parquet_bytes / 1024:.1f} KB "
+          f"({uploaded / 1024:.1f} KB di tujuan)")
+    print(f"⏱️ Sync tanpa perubahan isi: {elapsed * 1000:.1f} ms/run (1 unggahan dari {runs} run)")
+
+
+if __name__ == "__main__":
+    test_sync_skips_unchanged_content()
+    test_remote_hash_rereads_properties_and_drops_deleted_ids()
+    test_parquet_payload_smaller_than_csv()
+    print("✅ Sinkronisasi Drive melewati isi yang tidak berubah.")
+    benchmark()
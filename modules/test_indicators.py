@@ -0,0 +1,234 @@
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    from modules import indicators
+    from modules.indicators import supertrend, psar, ema, rsi, macd, atr, rolling_vwap, bollinger, compute_indicator
+except ModuleNotFoundError:
+    import indicators
+    from indicators import supertrend, psar, ema, rsi, macd, atr, rolling_vwap, bollinger, compute_indicator
+
+
+# --- REFERENSI: implementasi .iloc lama dari screening.calculate_supertrend ---
+def supertrend_reference(df, period=10, multiplier=2):
+    hl2 = (df['High'] + df['Low']) / 2
+    high_low = df['High'] - df['Low']
+    high_close = np.abs(df['High'] - df['Close'].shift())
+    low_close = np.abs(df['Low'] - df['Close'].shift())
+    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    atr = tr.rolling(period).mean()
+
+    upper_band = hl2 + (multiplier * atr)
+    lower_band = hl2 - (multiplier * atr)
+
+    supertrend_line = pd.Series(index=df.index, dtype=float)
+    direction = pd.Series(index=df.index, dtype=int)
+
+    for i in range(1, len(df)):
+        if df['Close'].iloc[i] > upper_band.iloc[i - 1]:
+            direction.iloc[i] = 1
+        elif df['Close'].iloc[i] < lower_band.iloc[i - 1]:
+            direction.iloc[i] = -1
+        else:
+            direction.iloc[i] = direction.iloc[i - 1]
+            if direction.iloc[i] == 1 and lower_band.iloc[i] < lower_band.iloc[i - 1]:
+                lower_band.iloc[i] = lower_band.iloc[i - 1]
+            if direction.iloc[i] == -1 and upper_band.iloc[i] > upper_band.iloc[i - 1]:
+                upper_band.iloc[i] = upper_band.iloc[i - 1]
+
+        supertrend_line.iloc[i] = lower_band.iloc[i] if direction.iloc[i] == 1 else upper_band.iloc[i]
+
+    return supertrend_line.to_numpy(), direction.to_numpy()
+
+
+# --- REFERENSI: loop PSAR lama dari screening.calculate_psar ---
+def psar_reference(high, low, close, af_start=0.02, af_step=0.02, af_max=0.2):
+    n = len(close)
+    psar_line = close.copy()
+    bull = True
+    af = af_start
+    hp = high[0]
+    lp = low[0]
+    for i in range(2, n):
+        if bull:
+            psar_line[i] = psar_line[i - 1] + af * (hp - psar_line[i - 1])
+            psar_line[i] = min(psar_line[i], low[i - 1], low[i - 2])
+            if low[i] < psar_line[i]:
+                bull = False
+                psar_line[i] = hp
+                lp = low[i]
+                af = af_start
+            else:
+                if high[i] > hp:
+                    hp = high[i]
+                    af = min(af + af_step, af_max)
+        else:
+            psar_line[i] = psar_line[i - 1] + af * (lp - psar_line[i - 1])
+            psar_line[i] = max(psar_line[i], high[i - 1], high[i - 2])
+            if high[i] > psar_line[i]:
+                bull = True
+                psar_line[i] = lp
+                hp = high[i]
+                af = af_start
+            else:
+                if low[i] < lp:
+                    lp = low[i]
+                    af = min(af + af_step, af_max)
+    return psar_line
+
+
+def make_ohlc(n_bars, seed):
+    """Random walk OHLC sintetis (harga saham Rp ratusan - ribuan)."""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    spread = close * rng.uniform(0.002, 0.03, n_bars)
+    high = close + spread * rng.uniform(0, 1, n_bars)
+    low = close - spread * rng.uniform(0, 1, n_bars)
+    volume = rng.integers(1_000, 5_000_000, n_bars).astype(float)
+    idx = pd.date_range("2024-01-01", periods=n_bars, freq="B")
+    return pd.DataFrame({"High": high, "Low": low, "Close": close, "Volume": volume}, index=idx)
+
+
+def test_supertrend_equivalence():
+    for seed in range(20):
+        for multiplier in (2, 3):
+            df = make_ohlc(300, seed)
+            ref_line, ref_dir = supertrend_reference(df, 10, multiplier)
+            line, direction = supertrend(df['High'], df['Low'], df['Close'], 10, multiplier)
+            np.testing.assert_allclose(line, ref_line, equal_nan=True)
+            np.testing.assert_array_equal(direction, ref_dir)
+
+
+def test_supertrend_multi_ticker_matches_single():
+    frames = [make_ohlc(250, seed) for seed in range(8)]
+    high = np.vstack([f['High'] for f in frames])
+    low = np.vstack([f['Low'] for f in frames])
+    close = np.vstack([f['Close'] for f in frames])
+    lines, dirs = supertrend(high, low, close, 10, 3)
+    for i, f in enumerate(frames):
+        line, direction = supertrend(f['High'], f['Low'], f['Close'], 10, 3)
+        np.testing.assert_allclose(lines[i], line, equal_nan=True)
+        np.testing.assert_array_equal(dirs[i], direction)
+
+
+def test_supertrend_short_history():
+    df = make_ohlc(5, 0)
+    line, direction = supertrend(df['High'], df['Low'], df['Close'], 10, 2)
+    assert np.isnan(line).all() and np.isnan(direction).all()
+
+
+def test_psar_equivalence():
+    frames = [make_ohlc(300, seed) for seed in range(10)]
+    for f in frames:
+        h, l, c = f['High'].to_numpy(), f['Low'].to_numpy(), f['Close'].to_numpy()
+        ref = psar_reference(h, l, c)
+        line, bull = psar(h, l, c)
+        np.testing.assert_allclose(line, ref)
+        # status tren SAR konsisten dengan posisi titik terhadap harga
+        assert ((c > line) == bull)[2:].mean() > 0.95
+    lines, bulls = psar(np.vstack([f['High'] for f in frames]),
+                        np.vstack([f['Low'] for f in frames]),
+                        np.vstack([f['Close'] for f in frames]))
+    for i, f in enumerate(frames):
+        line, bull = psar(f['High'], f['Low'], f['Close'])
+        np.testing.assert_allclose(lines[i], line)
+        np.testing.assert_array_equal(bulls[i], bull)
+
+
+def test_pandas_indicator_equivalence():
+    df = make_ohlc(400, 7)
+    close, high, low, vol = df['Close'], df['High'], df['Low'], df['Volume']
+
+    np.testing.assert_allclose(ema(close, 9), close.ewm(span=9, adjust=False).mean())
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    np.testing.assert_allclose(rsi(close, 14), 100 - (100 / (1 + (gain / loss))), equal_nan=True)
+
+    ref_macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    ref_signal = ref_macd.ewm(span=9, adjust=False).mean()
+    line, signal_line, hist = macd(close)
+    np.testing.assert_allclose(line, ref_macd)
+    np.testing.assert_allclose(signal_line, ref_signal)
+    np.testing.assert_allclose(hist, ref_macd - ref_signal)
+
+    tr = pd.concat([high - low, np.abs(high - close.shift()), np.abs(low - close.shift())], axis=1).max(axis=1)
+    np.testing.assert_allclose(atr(high, low, close, 14), tr.rolling(14).mean(), equal_nan=True)
+
+    ref_vwap = (close * vol).rolling(5).sum() / vol.rolling(5).sum()
+    np.testing.assert_allclose(rolling_vwap(close, vol, 5), ref_vwap, equal_nan=True)
+
+    mid, upper, lower = bollinger(close, 20)
+    ref_std = close.rolling(20).std()
+    np.testing.assert_allclose(upper, close.rolling(20).mean() + 2 * ref_std, equal_nan=True)
+    np.testing.assert_allclose(lower, close.rolling(20).mean() - 2 * ref_std, equal_nan=True)
+
+
+def test_indicator_cache_hit_and_invalidation():
+    indicators.clear_indicator_cache()
+    df = make_ohlc(300, 3)
+    first = compute_indicator(df, 'rsi', 'TEST.JK', '1d', window=14)
+    assert compute_indicator(df, 'rsi', 'TEST.JK', '1d', window=14) is first
+    assert not first.flags.writeable
+    np.testing.assert_allclose(first, rsi(df['Close'], 14), equal_nan=True)
+
+    # parameter berbeda / bar baru → kunci berbeda
+    assert compute_indicator(df, 'rsi', 'TEST.JK', '1d', window=9) is not first
+    longer = pd.concat([df, make_ohlc(301, 4).iloc[[-1]].set_axis([df.index[-1] + pd.offsets.BDay()])])
+    assert compute_indicator(longer, 'rsi', 'TEST.JK', '1d', window=14) is not first
+    assert indicators.indicator_cache_info()["entries"] == 3
+
+
+def test_indicator_cache_memory_cap():
+    indicators.clear_indicator_cache()
+    old_cap = indicators.INDICATOR_CACHE_MAX_BYTES
+    df = make_ohlc(1000, 5)
+    indicators.INDICATOR_CACHE_MAX_BYTES = 3 * df['Close'].to_numpy().nbytes
+    try:
+        for window in range(5, 15):
+            compute_indicator(df, 'sma', 'TEST.JK', '1d', window=window)
+        info = indicators.indicator_cache_info()
+        assert info["entries"] == 3 and info["bytes"] <= info["max_bytes"]
+    finally:
+        indicators.INDICATOR_CACHE_MAX_BYTES = old_cap
+        indicators.clear_indicator_cache()
+
+
+def benchmark(n_tickers=200, n_bars=500):
+    frames = [make_ohlc(n_bars, seed) for seed in range(n_tickers)]
+
+    t0 = time.perf_counter()
+    for f in frames[:20]:
+        supertrend_reference(f, 10, 3)
+    t_ref = (time.perf_counter() - t0) / 20 * n_tickers
+
+    t0 = time.perf_counter()
+    for f in frames:
+        supertrend(f['High'].to_numpy(), f['Low'].to_numpy(), f['Close'].to_numpy(), 10, 3)
+    t_single = time.perf_counter() - t0
+
+    high = np.vstack([f['High'] for f in frames])
+    low = np.vstack([f['Low'] for f in frames])
+    close = np.vstack([f['Close'] for f in frames])
+    t0 = time.perf_counter()
+    supertrend(high, low, close, 10, 3)
+    t_batch = time.perf_counter() - t0
+
+    print(f"📊 Supertrend {n_tickers} ticker × {n_bars} bar:")
+    print(f"   Loop .iloc lama (estimasi) : {t_ref:8.3f} detik")
+    print(f"   Kernel NumPy per ticker    : {t_single:8.3f} detik ({t_ref / t_single:,.0f}x)")
+    print(f"   Kernel NumPy 1 panggilan   : {t_batch:8.3f} detik ({t_ref / t_batch:,.0f}x)")
+
+
+if __name__ == "__main__":
+    test_supertrend_equivalence()
+    test_supertrend_multi_ticker_matches_single()
+    test_supertrend_short_history()
+    test_psar_equivalence()
+    test_pandas_indicator_equivalence()
+    test_indicator_cache_hit_and_invalidation()
+    test_indicator_cache_memory_cap()
+    print("✅ Kernel indikator identik dengan implementasi lama.")
+    benchmark()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from modules import live_watch
+except ModuleNotFoundError:
+    import live_watch
+
+
+def _panel(values, tickers):
+    dates = pd.date_range("2024-01-02 09:00", periods=values.shape[1], freq="15min")
+    return {"values": values, "tickers": tickers, "dates": dates}
+
+
+def test_only_changed_last_bars_are_rescored():
+    values = np.arange(3 * 4 * 5, dtype=float).reshape(3, 4, 5)
+    values[1, -1] = np.nan            # bar terakhir BBRI belum ada (suspensi)
+    values[2] = np.nan                # ASII belum punya data sama sekali
+    tickers = ["BBCA.JK", "BBRI.JK", "ASII.JK"]
+    first = live_watch.last_bar_signatures(_panel(values, tickers))
+    assert sorted(first) == ["BBCA.JK", "BBRI.JK"]
+    assert first["BBRI.JK"][4] == values[1, 2, 3]  # bar terakhir yang ada transaksinya
+
+    assert live_watch.changed_tickers(first, {}) == ["BBCA.JK", "BBRI.JK"]
+    assert live_watch.changed_tickers(first, first) == []
+
+    # Bar berjalan BBCA ter-update (Close & Volume berubah) → hanya BBCA dinilai ulang
+    values = values.copy()
+    values[0, -1, 3] += 5
+    second = live_watch.last_bar_signatures(_panel(values, tickers))
+    assert live_watch.changed_tickers(second, first) == ["BBCA.JK"]
+
+
+def test_diff_picks_and_alerts():
+    previous = [{"Ticker": "BBCA", "Skor": 80}, {"Ticker": "TLKM", "Skor": 75}, {"Ticker": "ADRO", "Skor": 90}]
+    current = [{"Ticker": "BBCA", "Skor": 88}, {"Ticker": "ADRO", "Skor": 90},
+               {"Ticker": "ANTM", "Skor": 86}, {"Ticker": "UNVR", "Skor": 72}]
+    diff = live_watch.diff_picks(previous, current)
+    assert [p["Ticker"] for p in diff["baru"]] == ["ANTM", "UNVR"]
+    assert [p["Ticker"] for p in diff["keluar"]] == ["TLKM"]
+    assert [(p["Ticker"], p["Skor_Lama"], p["Skor"]) for p in diff["berubah"]] == [("BBCA", 80, 88)]
+    # Alert hanya untuk saham BARU dengan skor >= 85 (BBCA naik ke 88 tidak memicu alert)
+    assert [p["Ticker"] for p in live_watch.alert_picks(diff)] == ["ANTM"]
+
+    first = live_watch.diff_picks(None, current)
+    assert len(first["baru"]) == 4 and not first["keluar"] and not first["berubah"]
+
+
+def test_watchers_share_feed_and_sector_boost():
+    calls = []
+    tickers = ["BBCA.JK", "BBRI.JK"]
+    values = np.arange(2 * 3 * 5, dtype=float).reshape(2, 3, 5)
+
+    def fake_prepare(feed):
+        feed.update(date="20240102", lolos=tickers, snapshot=None, context=None, labels=None)
+
+    def fake_panel(lolos, interval, min_age):
+        calls.append(interval)
+        return _panel(values, tickers)
+
+    originals = (live_watch._prepare_universe, live_watch.get_universe_panel, live_watch.iter_scan)
+    live_watch._prepare_universe = fake_prepare
+    live_watch.get_universe_panel = fake_panel
+    live_watch.iter_scan = lambda *args, **kwargs: iter(())
+    try:
+        live_watch.stop_watchers()
+        live_watch.get_live_picks("Day Trading", mtf_filter=True, sector_boost=True)
+        live_watch.get_live_picks("Day Trading", mtf_filter=True, sector_boost=False)
+        live_watch.get_live_picks("Day Trading", mtf_filter=False, sector_boost=True)
+        # Satu watcher per (mode, MTF) & satu refresh bar untuk semua watcher mode itu
+        assert sorted(live_watch._WATCHERS) == [("Day Trading", False), ("Day Trading", True)]
+        assert calls == ["15m"]
+    finally:
+        live_watch._prepare_universe, live_watch.get_universe_panel, live_watch.iter_scan = originals
+        live_watch.stop_watchers()
+
+
+if __name__ == "__main__":
+    test_only_changed_last_bars_are_rescored()
+    test_diff_picks_and_alerts()
+    test_watchers_share_feed_and_sector_boost()
+    print("✅ Mode pantau hanya menilai ulang bar yang berubah.")
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import subprocess
+
+try:
+    from modules.scan_cache import try_file_lock, release_file_lock
+except ModuleNotFoundError:
+    from scan_cache import try_file_lock, release_file_lock
+
+
+LOCK_HOLDER = """
+import sys, time
+from scan_cache import try_file_lock
+print(try_file_lock(sys.argv[1]), flush=True)
+time.sleep(60)
+"""
+
+
+def test_file_lock_follows_holder_process():
+    with tempfile.TemporaryDirectory() as tmp:
+        lock_path = os.path.join(tmp, "scan.lock")
+        assert try_file_lock(lock_path)
+        assert not try_file_lock(lock_path)
+        release_file_lock(lock_path)
+        assert not os.path.exists(lock_path)
+
+        # Proses lain memegang lock: tidak bisa diambil & tidak ikut terhapus oleh release proses ini
+        holder = subprocess.Popen([sys.executable, "-c", LOCK_HOLDER, lock_path], stdout=subprocess.PIPE,
+                                  text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        try:
+            assert holder.stdout.readline().strip() == "True"
+            assert not try_file_lock(lock_path)
+            release_file_lock(lock_path)
+            assert os.path.exists(lock_path) and not try_file_lock(lock_path)
+        finally:
+            holder.kill()
+            holder.wait()
+
+        # Pemegang mati tanpa melepas lock → langsung bisa diambil, tanpa menunggu lock basi
+        assert try_file_lock(lock_path)
+        release_file_lock(lock_path)
+
+
+if __name__ == "__main__":
+    test_file_lock_follows_holder_process()
+    print("✅ Lock antar proses dilepas bersama proses pemegangnya.")
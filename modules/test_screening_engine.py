@@ -0,0 +1,93 @@
+import os
+import time
+import tempfile
+import pandas as pd
+
+try:
+    from modules import screening_engine as engine
+    from modules.universe import load_liquid_universe, liquid_tickers
+    from modules.test_indicators import make_ohlc
+except ModuleNotFoundError:
+    import screening_engine as engine
+    from universe import load_liquid_universe, liquid_tickers
+    from test_indicators import make_ohlc
+
+SWING = "Swing Trading"
+
+
+def test_liquid_universe_flags():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "liquid_stocks.csv")
+        pd.DataFrame({
+            "ticker": ["BBCA.JK", "ADRO.JK", "zzzz", "BBCA.JK"],
+            "sektor": ["Financials", "Energy", "Energy", "Financials"],
+            "syariah": ["Cek Manual", "Cek Manual", "Ya", "Cek Manual"],
+            "day_trade": [True, False, False, True],
+            "swing_trade": [True, True, True, True],
+        }).to_csv(path, index=False)
+
+        assert liquid_tickers("Day Trading", path) == ["BBCA.JK"]
+        assert liquid_tickers(SWING, path) == ["ADRO.JK", "BBCA.JK", "ZZZZ.JK"]
+        table = load_liquid_universe(path)
+        # ADRO terdaftar di ISSI walau file masih "Cek Manual"; ZZZZ ditandai di file
+        assert table["syariah"].to_dict() == {"BBCA": False, "ADRO": True, "ZZZZ": True}
+        assert load_liquid_universe(path) is table  # file tidak berubah → tidak dibaca ulang
+    assert liquid_tickers(SWING, os.path.join(tmp, "tidak_ada.csv")) is None
+
+
+def test_scan_batch_size():
+    assert engine.scan_batch_size(50, max_workers=8) == engine.TASK_BATCH_SIZE
+    assert engine.scan_batch_size(900, max_workers=1) == engine.MAX_TASK_BATCH_SIZE
+    assert engine.scan_batch_size(900, max_workers=4) == 57
+
+
+def full_exchange_scan(n_tickers=900, n_bars=260, backend=None, max_workers=None):
+    """
+    Tahap 2 run_scan (load dari panel lokal → scoring streaming → leaderboard →
+    pilihan akhir) untuk universe sintetis seukuran bursa. Return (detik, hasil).
+    """
+    dates = pd.bdate_range("2024-01-02", periods=n_bars)
+    tickers = [f"T{i:03d}.JK" for i in range(n_tickers)]
+    histories = {}
+    for i, ticker in enumerate(tickers):
+        df = make_ohlc(n_bars, 10_000 + i)
+        df.index = dates
+        df['Open'] = df['Close'].shift().fillna(df['Close'])
+        histories[ticker] = df
+    info = {"marketCap": 1e9, "returnOnEquity": 0.1, "returnOnAssets": 0.05}
+
+    started = time.perf_counter()
+    load_item = engine.make_loader(histories.get, lambda ticker: info)
+    board = engine.new_leaderboard(k=10)
+    for _, batch_results in engine.iter_scan(
+        tickers, load_item, SWING, True, backend=backend, max_workers=max_workers,
+        io_workers=engine.SCAN_IO_WORKERS, batch_size=engine.scan_batch_size(n_tickers, max_workers),
+    ):
+        for stock in batch_results:
+            plan = engine.build_trade_plan(stock, SWING)
+            engine.leaderboard_add(board, stock, eligible=plan['rrr'] >= engine.MIN_RRR)
+    final_picks, _ = engine.finalize_picks(board, SWING, sector_boost=True)
+    return time.perf_counter() - started, {"dinilai": board["count"], "final_picks": final_picks}
+
+
+def test_full_exchange_swing_scan_within_budget():
+    elapsed, result = full_exchange_scan(backend="thread")
+    assert result["dinilai"] > 0
+    assert elapsed < engine.SCAN_LATENCY_BUDGET[SWING], elapsed
+
+
+def benchmark():
+    for backend in engine.BACKENDS:
+        elapsed, result = full_exchange_scan(backend=backend)
+        budget = engine.SCAN_LATENCY_BUDGET[SWING]
+        print(f"📊 Scan Swing 900 ticker ({backend}): {elapsed:.2f} detik "
+              f"(batas {budget:.0f} detik, {result['dinilai']} dinilai)")
+    engine.shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    test_liquid_universe_flags()
+    test_scan_batch_size()
+    test_full_exchange_swing_scan_within_budget()
+    print("✅ Universe likuid & batas waktu scan terpenuhi.")
+    benchmark()
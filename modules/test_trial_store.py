@@ -0,0 +1,278 @@
+import os
+import csv
+import time
+import sys
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    from modules import trial_store as ts
+except ModuleNotFoundError:
+    import trial_store as ts
+
+
+def make_sheet(path, n):
+    """Sheet trial lokal berisi n pengguna (format nomor bercampur seperti di sheet asli)."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(ts.TRIAL_HEADER)
+        for i in range(n):
+            nomor = [f"0812{i:08d}", f"+62812{i:08d}", f"62812{i:08d}.0"][i % 3]
+            writer.writerow([nomor, f"User {i}", "2024-01-01", "2024-01-15"])
+
+
+@contextmanager
+def isolated_queue(tmp, flush_interval=3600):
+    """
+    Antrean di folder sementara & thread pengirim praktis tidak pernah jalan sendiri
+    (kecuali flush_interval diperkecil). Global modul yang diganti test dipulihkan.
+    """
+    saved = ts.TRIAL_QUEUE_DIR, ts.FLUSH_INTERVAL, ts.append_rows, ts.read_rows
+    ts.clear_trial_index()
+    ts.TRIAL_QUEUE_DIR = os.path.join(tmp, "queue")
+    ts.FLUSH_INTERVAL = flush_interval
+    try:
+        yield
+    finally:
+        ts.clear_trial_index()
+        ts.TRIAL_QUEUE_DIR, ts.FLUSH_INTERVAL, ts.append_rows, ts.read_rows = saved
+
+
+def count_lines(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def test_lookup_register_and_incremental_refresh():
+    with tempfile.TemporaryDirectory() as tmp, isolated_queue(tmp):
+        path = os.path.join(tmp, "trial.csv")
+        make_sheet(path, 30)
+        backend = ts.local_sheet_backend(path)
+
+        assert ts.lookup_trial(backend, "+62 812-0000-0001")["Nama"] == "User 1"
+        assert ts.lookup_trial(backend, "081200000002")["Tanggal_Expired"] == "2024-01-15"
+        assert ts.lookup_trial(backend, "0899") is None
+
+        # Pendaftaran baru langsung terlihat di indeks, sheet ditulis saat antrean dikirim
+        ts.register_trial(backend, "Baru", "0899 1234", "2024-02-01", "2024-02-15")
+        assert ts.lookup_trial(backend, "628991234")["Nama"] == "Baru"
+        assert ts.register_trial(backend, "Lagi", "08991234", "2024-03-01", "2024-03-15")["Nama"] == "Baru"
+        assert count_lines(path) == 31
+        assert ts.flush_queue(backend) == 1 and ts.pending_rows(backend) == []
+
+        # Baris dari proses lain ditemukan lewat refresh inkremental saat nomor belum dikenal
+        # (setelah jeda MISS_REFRESH_INTERVAL sejak refresh terakhir)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(["08770000", "Lain", "2024-02-02", "2024-02-16"])
+        ts.get_trial_index(backend)["checked_at"] -= ts.MISS_REFRESH_INTERVAL
+        assert ts.lookup_trial(backend, "8770000")["Nama"] == "Lain"
+
+        index = ts.get_trial_index(backend)
+        assert index["rows_seen"] == 33 and count_lines(path) == 33
+
+
+def test_sheet_reads_outside_lock_and_throttled_misses():
+    with tempfile.TemporaryDirectory() as tmp, isolated_queue(tmp):
+        path = os.path.join(tmp, "trial.csv")
+        make_sheet(path, 10)
+        backend = ts.local_sheet_backend(path)
+        index = ts.get_trial_index(backend)
+
+        reads = []
+        gate = threading.Event()
+        original = ts.read_rows
+
+        def slow_read(backend, start_row=1):
+            reads.append(start_row)
+            gate.wait(5)
+            return original(backend, start_row)
+        ts.read_rows = slow_read
+        try:
+            # Request sheet yang lambat tidak menahan login nomor yang sudah dikenal,
+            # termasuk saat indeks sudah lewat TTL (thread itu tidak ikut me-refresh)
+            index["checked_at"] -= ts.TRIAL_INDEX_TTL
+            worker = threading.Thread(target=ts.refresh_index, args=(backend, index))
+            worker.start()
+            while not reads:
+                time.sleep(0.001)
+            t0 = time.perf_counter()
+            assert ts.lookup_trial(backend, "081200000004")["Nama"] == "User 4"
+            assert time.perf_counter() - t0 < 1
+            gate.set()
+            worker.join()
+
+            # Nomor tak dikenal beruntun: paling banyak satu refresh per MISS_REFRESH_INTERVAL
+            reads.clear()
+            for i in range(20):
+                assert ts.lookup_trial(backend, f"0855{i:06d}") is None
+            assert reads == []
+            index["checked_at"] -= ts.MISS_REFRESH_INTERVAL
+            for i in range(20):
+                assert ts.lookup_trial(backend, f"0855{i:06d}") is None
+            assert reads == [12]
+        finally:
+            ts.read_rows = original
+            gate.set()
+
+
+def test_empty_sheet_gets_header():
+    with tempfile.TemporaryDirectory() as tmp, isolated_queue(tmp):
+        path = os.path.join(tmp, "trial.csv")
+        backend = ts.local_sheet_backend(path)
+        assert ts.lookup_trial(backend, "0812") is None
+        ts.register_trial(backend, "Pertama", "0812", "2024-01-01", "2024-01-15")
+        ts.flush_queue(backend)
+        ts.clear_trial_index()
+        backend = ts.local_sheet_backend(path)
+        assert ts.lookup_trial(backend, "812")["Nama"] == "Pertama"
+        with open(path, newline="", encoding="utf-8") as f:
+            assert next(csv.reader(f)) == ts.TRIAL_HEADER
+
+
+def test_write_behind_batches_and_survives_failures():
+    with tempfile.TemporaryDirectory() as tmp, isolated_queue(tmp):
+        path = os.path.join(tmp, "trial.csv")
+        make_sheet(path, 5)
+        backend = ts.local_sheet_backend(path)
+
+        calls = []
+        original = ts.append_rows
+
+        def failing(backend, rows):
+            calls.append(len(rows))
+            raise ConnectionError("quota")
+        ts.append_rows = failing
+        try:
+            for i in range(50):
+                ts.register_trial(backend, f"Promo {i}", f"0857{i:06d}", "2024-02-01", "2024-02-15")
+            try:
+                ts.flush_queue(backend)
+            except ConnectionError:
+                pass
+            # Pengiriman gagal: antrean utuh & nomor tetap tidak bisa daftar dua kali
+            assert len(ts.pending_rows(backend)) == 50
+            assert ts.register_trial(backend, "Dobel", "+62857000003", "2024-03-01", "2024-03-15")["Nama"] == "Promo 3"
+        finally:
+            ts.append_rows = original
+
+        # "Proses baru": antrean di disk tetap dihitung terdaftar, lalu dikirim dalam satu batch
+        ts.clear_trial_index()
+        backend = ts.local_sheet_backend(path)
+        assert ts.lookup_trial(backend, "857000049")["Nama"] == "Promo 49"
+        ts.append_rows = lambda backend, rows: (calls.append(len(rows)), original(backend, rows))
+        try:
+            assert ts.flush_queue(backend) == 50
+        finally:
+            ts.append_rows = original
+        assert calls == [50, 50]
+        assert ts.pending_rows(backend) == [] and count_lines(path) == 56
+
+        ts.clear_trial_index()
+        backend = ts.local_sheet_backend(path)
+        assert ts.lookup_trial(backend, "0857000010")["Tanggal_Expired"] == "2024-02-15"
+        assert ts.get_trial_index(backend)["rows_seen"] == 56
+
+
+def test_flusher_thread_retries_until_sent():
+    with tempfile.TemporaryDirectory() as tmp, isolated_queue(tmp, flush_interval=0.01):
+        path = os.path.join(tmp, "trial.csv")
+        make_sheet(path, 3)
+        backend = ts.local_sheet_backend(path)
+
+        attempts = []
+        original = ts.append_rows
+
+        def flaky(backend, rows):
+            attempts.append(len(rows))
+            if len(attempts) < 3:
+                raise ConnectionError("quota")
+            original(backend, rows)
+        ts.append_rows = flaky
+        try:
+            ts.register_trial(backend, "Cepat", "0811", "2024-02-01", "2024-02-15")
+            deadline = time.time() + 5
+            while ts.pending_rows(backend) and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            ts.stop_trial_flushers(flush=False)
+            ts.append_rows = original
+        assert attempts == [1, 1, 1] and count_lines(path) == 5
+
+
+QUEUE_WRITER = """
+import sys, trial_store as ts
+ts.TRIAL_QUEUE_DIR, path, tag = sys.argv[1:4]
+backend = ts.local_sheet_backend(path)
+for i in range(150):
+    ts.enqueue_rows(backend, [[f"'08{tag}{i:05d}", f"Proses {tag}", "2024-02-01", "2024-02-15"]])
+    ts.flush_queue(backend, batch=7)
+"""
+
+
+def test_queue_shared_by_two_processes():
+    with tempfile.TemporaryDirectory() as tmp, isolated_queue(tmp):
+        path = os.path.join(tmp, "trial.csv")
+        make_sheet(path, 1)
+        # Dua proses server menambah & mengirim antrean yang sama bersamaan
+        writers = [subprocess.Popen([sys.executable, "-c", QUEUE_WRITER, ts.TRIAL_QUEUE_DIR, path, tag],
+                                    cwd=os.path.dirname(os.path.abspath(__file__)))
+                   for tag in ("1", "2")]
+        assert [w.wait(60) for w in writers] == [0, 0]
+
+        backend = ts.local_sheet_backend(path)
+        while ts.flush_queue(backend):
+            pass
+        with open(path, newline="", encoding="utf-8") as f:
+            nomor = [row[0] for row in csv.reader(f)][2:]
+        # Tiap baris tepat sekali di sheet: tidak ada yang dobel maupun hilang
+        assert sorted(nomor) == sorted(f"08{tag}{i:05d}" for tag in "12" for i in range(150))
+        assert ts.pending_rows(backend) == []
+
+
+def benchmark(n=50_000, logins=2_000, signups=500):
+    with tempfile.TemporaryDirectory() as tmp, isolated_queue(tmp):
+        path = os.path.join(tmp, "trial.csv")
+        make_sheet(path, n)
+        backend = ts.local_sheet_backend(path)
+
+        # Cara lama: baca seluruh sheet + apply bersihkan_nomor_wa setiap login
+        t0 = time.perf_counter()
+        for i in range(20):
+            df = pd.read_csv(path, dtype=str)
+            df['Nomor_WA_Clean'] = df['Nomor_WA'].apply(ts.bersihkan_nomor_wa)
+            df[df['Nomor_WA_Clean'] == f"812{i:08d}"]
+        old = (time.perf_counter() - t0) / 20
+
+        t0 = time.perf_counter()
+        ts.get_trial_index(backend)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in range(logins):
+            ts.lookup_trial(backend, f"0812{(i * 7919) % n:08d}")
+        new = (time.perf_counter() - t0) / logins
+
+        t0 = time.perf_counter()
+        for i in range(signups):
+            ts.register_trial(backend, f"Promo {i}", f"0857{i:06d}", "2024-02-01", "2024-02-15")
+        signup = (time.perf_counter() - t0) / signups
+        batches = 0
+        while ts.flush_queue(backend):
+            batches += 1
+    print(f"⏱️ Sheet {n} pengguna: cara lama {old * 1000:.1f} ms/login, "
+          f"indeks {new * 1e6:.1f} µs/login (bangun indeks sekali {build * 1000:.0f} ms)")
+    print(f"⏱️ {signups} pendaftaran: {signup * 1000:.2f} ms/pendaftaran (antrean lokal + fsync), "
+          f"dikirim dalam {batches} panggilan append_rows")
+
+
+if __name__ == "__main__":
+    test_lookup_register_and_incremental_refresh()
+    test_sheet_reads_outside_lock_and_throttled_misses()
+    test_empty_sheet_gets_header()
+    test_write_behind_batches_and_survives_failures()
+    test_flusher_thread_retries_until_sent()
+    test_queue_shared_by_two_processes()
+    print("✅ Indeks trial: lookup O(1), pendaftaran write-behind & refresh inkremental.")
+    benchmark()
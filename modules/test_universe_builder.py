@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from modules import universe_builder as ub
+except ModuleNotFoundError:
+    import universe_builder as ub
+
+
+def test_pending_tickers_resume_and_retry():
+    pre = ub.normalize_pre_data(pd.DataFrame({
+        "Kode Saham": ["BBCA", "BBRI.JK", " TLKM ", "BBCA", "ASII"],
+        "Sektor": ["Finance", "Finance", "Infra", "Finance", "Auto"],
+    }))
+    assert list(pre["ticker"]) == ["BBCA.JK", "BBRI.JK", "TLKM.JK", "ASII.JK"]
+    assert set(pre["syariah"]) == {"Cek Manual"}
+
+    done = ["BBCA.JK", "TLKM.JK"]
+    failed = {"BBRI.JK": "Data historis kosong"}
+    # Melanjutkan run: semua yang belum selesai (termasuk yang gagal)
+    assert ub.pending_tickers(pre, done, failed) == ["BBRI.JK", "ASII.JK"]
+    # Ulangi yang gagal saja
+    assert ub.pending_tickers(pre, done, failed, retry_failed_only=True) == ["BBRI.JK"]
+    assert ub.run_fingerprint(pre) != ub.run_fingerprint(pre.iloc[:3])
+
+
+def test_finalize_universe_sector_medians():
+    rows = pd.DataFrame({
+        "ticker": ["A.JK", "B.JK", "C.JK"], "sektor": ["X", "X", "Y"], "syariah": "Cek Manual",
+        "value_MA20": [6e9, 3e9, 1e9], "day_trade": [True, False, False], "swing_trade": [True, True, False],
+        "PER_raw": [10.0, 20.0, np.nan], "PBV_raw": [1.0, 3.0, 2.0],
+    })
+    final = ub.finalize_universe(rows)
+    assert list(final.columns) == ub.OUTPUT_COLUMNS
+    assert list(final["avg_PER_3yr_sector"].iloc[:2]) == [15.0, 15.0]
+    assert final["avg_PBV_3yr_sector"].iloc[2] == 2.0
+
+
+if __name__ == "__main__":
+    test_pending_tickers_resume_and_retry()
+    test_finalize_universe_sector_medians()
+    print("✅ Generator universe: resume & retry ticker gagal.")
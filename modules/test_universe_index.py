@@ -0,0 +1,42 @@
+import os
+import sys
+import subprocess
+
+try:
+    from modules.universe import (
+        get_all_tickers, get_sector_data, is_syariah, ticker_ids, SECTORS, SECTOR_CODES, SYARIAH_MASK, UNIVERSE_SAHAM
+    )
+except ModuleNotFoundError:
+    from universe import (
+        get_all_tickers, get_sector_data, is_syariah, ticker_ids, SECTORS, SECTOR_CODES, SYARIAH_MASK, UNIVERSE_SAHAM
+    )
+
+
+def test_universe_index():
+    # Indeks = cara lama (scan linear per sektor), termasuk ticker ganda TOWR & DSNG
+    tickers = get_all_tickers()
+    assert len(tickers) == len(set(tickers)) and tickers == sorted(tickers)
+    for ticker in tickers:
+        sector = next(s for s, members in UNIVERSE_SAHAM.items() if ticker in members)
+        assert get_sector_data(ticker)[0] == sector
+    assert get_sector_data("TOWR")[0] == "INFRASTRUCTURE"
+    assert get_sector_data("DSNG")[0] == "BASIC_INDUSTRIAL"
+
+    ids = ticker_ids(["BBCA.JK", "towr", "XXXX"])
+    assert ids[-1] == -1 and SECTORS[SECTOR_CODES[ids[-1]]] == "UNKNOWN"
+    assert get_sector_data("XXXX") == ("UNKNOWN", {"avg_per": 15.0, "avg_pbv": 1.5})
+    assert list(SYARIAH_MASK[ids]) == [is_syariah("BBCA"), is_syariah("TOWR"), False]
+
+
+def test_universe_import_is_light():
+    # Modul analisa yang hanya butuh is_syariah tidak ikut memuat yfinance / pandas
+    code = "import sys, universe; print(sorted({'yfinance', 'pandas', 'price_store'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+
+if __name__ == "__main__":
+    test_universe_index()
+    test_universe_import_is_light()
+    print("✅ Indeks universe sama dengan pencarian linear per sektor.")
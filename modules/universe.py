@@ -4,6 +4,15 @@ Status: FULL AUDIT (100% Indeks Coverage)
 Cakupan: Kompas100, JII70, LQ45, IDX80, IDXG30, IDXQ30, IDXHIDIV20 + Mid-Cap Pilihan
 """
 
+import os
+from types import MappingProxyType
+import numpy as np
+
+try:
+    from modules.config import DATA_DIR
+except ModuleNotFoundError:
+    from config import DATA_DIR
+
 UNIVERSE_SAHAM = {
     "BANKING": [
         "AGRO", "ARTO", "BBCA", "BBRI", "BBYB", "BBHI", "BBKP", "BBNI", "BBTN", "BDMN", 
@@ -59,7 +68,7 @@ SECTOR_BENCHMARKS = {
 }
 
 # 3. DATABASE SAHAM SYARIAH (ISSI) - Telah diperluas sesuai JII70 & ISSI terbaru
-SYARIAH_STOCKS_ISSI = {
+SYARIAH_STOCKS_ISSI = frozenset({
     "AADI", "AALI", "ACES", "ACST", "ADCP", "ADHI", "ADMR", "ADRO", "AGII", "AMMN", 
     "AMMS", "AMRT", "ANTM", "APLN", "ARCI", "ARNA", "ASII", "ASRI", "ASSA", "AUTO", 
     "AVIA", "BELI", "BIPI", "BIRD", "BKSL", "BREN", "BRIS", "BRMS", "BRPT", "BSDE", 
@@ -73,24 +82,124 @@ SYARIAH_STOCKS_ISSI = {
     "SCMA", "SGER", "SIDO", "SILO", "SIMP", "SMDR", "SMGR", "SMRA", "SMSM", "SSIA", 
     "TAPG", "TBLA", "TINS", "TKIM", "TLKM", "TOBA", "TPIA", "TSPC", "ULTJ", "UNTR", 
     "UNVR", "WIFI", "WIKA", "WOOD", "ELPI", "NELY", "TMAS"
-}
+})
+
+# 4. INDEKS UNIVERSE (dibangun sekali saat import, read-only)
+# Metadata per ticker cukup diambil lewat indexing array dengan ID integer:
+#     ids = ticker_ids(tickers)  →  SECTOR_CODES[ids], SYARIAH_MASK[ids], AVG_PER[ids]
+# Ticker di luar universe mendapat ID -1, yang menunjuk slot terakhir array
+# (sektor "UNKNOWN", benchmark bawaan, non-syariah).
+DEFAULT_BENCHMARK = MappingProxyType({"avg_per": 15.0, "avg_pbv": 1.5})
+
+def _build_index():
+    # Ticker ganda (mis. TOWR, DSNG) ikut sektor PERTAMA yang memuatnya
+    sector_of = {}
+    for sector, tickers in UNIVERSE_SAHAM.items():
+        for ticker in tickers:
+            sector_of.setdefault(ticker, sector)
+
+    tickers = tuple(sorted(sector_of))
+    sectors = tuple(UNIVERSE_SAHAM) + ("UNKNOWN",)
+    sector_pos = {sector: k for k, sector in enumerate(sectors)}
+    benchmarks = [SECTOR_BENCHMARKS.get(sector, DEFAULT_BENCHMARK) for sector in sectors]
+
+    codes = np.array([sector_pos[sector_of[t]] for t in tickers] + [sector_pos["UNKNOWN"]], dtype=np.int16)
+    syariah = np.array([t in SYARIAH_STOCKS_ISSI for t in tickers] + [False])
+    avg_per = np.array([benchmarks[c]["avg_per"] for c in codes])
+    avg_pbv = np.array([benchmarks[c]["avg_pbv"] for c in codes])
+    for arr in (codes, syariah, avg_per, avg_pbv):
+        arr.flags.writeable = False
+
+    sector_data = MappingProxyType({
+        t: (sector_of[t], MappingProxyType(dict(benchmarks[sector_pos[sector_of[t]]]))) for t in tickers
+    })
+    return tickers, sectors, codes, syariah, avg_per, avg_pbv, sector_data
+
+TICKERS, SECTORS, SECTOR_CODES, SYARIAH_MASK, AVG_PER, AVG_PBV, _SECTOR_DATA = _build_index()
+TICKER_IDS = MappingProxyType({t: i for i, t in enumerate(TICKERS)})
+YF_TICKERS = tuple(f"{t}.JK" for t in TICKERS)
+_UNKNOWN = ("UNKNOWN", DEFAULT_BENCHMARK)
+
+
+# --- Fungsi Helper ---
+def _kode(ticker):
+    """'bbca.jk' → 'BBCA'."""
+    kode = ticker.upper()
+    return kode[:-3] if kode.endswith(".JK") else kode
+
+def ticker_id(ticker):
+    """ID integer ticker di indeks universe (-1 jika di luar universe)."""
+    return TICKER_IDS.get(_kode(ticker), -1)
+
+def ticker_ids(tickers):
+    """Array ID integer untuk list ticker (boleh dengan/tanpa akhiran .JK)."""
+    return np.fromiter((TICKER_IDS.get(_kode(t), -1) for t in tickers), dtype=np.int64)
 
-# --- Fungsi Helper Tetap Sama ---
 def get_all_tickers():
-    all_tickers = []
-    for tickers in UNIVERSE_SAHAM.values():
-        all_tickers.extend(tickers)
-    return sorted(list(set(all_tickers)))
+    return list(TICKERS)
 
 def get_sector_data(ticker):
-    ticker_upper = ticker.upper()
-    for sector, tickers in UNIVERSE_SAHAM.items():
-        if ticker_upper in tickers:
-            return sector, SECTOR_BENCHMARKS.get(sector, {"avg_per": 15.0, "avg_pbv": 1.5})
-    return "UNKNOWN", {"avg_per": 15.0, "avg_pbv": 1.5}
+    return _SECTOR_DATA.get(_kode(ticker), _UNKNOWN)
 
 def is_syariah(ticker):
-    return ticker.upper() in SYARIAH_STOCKS_ISSI
+    return _kode(ticker) in SYARIAH_STOCKS_ISSI
+
+
+# 5. UNIVERSE LIKUID (liquid_stocks.csv hasil universe_generator, bisa 900+ emiten)
+LIQUID_STOCKS_PATH = os.environ.get("LIQUID_STOCKS_PATH", os.path.join(DATA_DIR, "liquid_stocks.csv"))
+
+# Kolom flag likuiditas per mode trading
+LIQUIDITY_FLAGS = {"Day Trading": "day_trade", "Swing Trading": "swing_trade"}
+
+_TRUE_TEXT = {"true", "1", "ya", "y", "yes", "syariah"}
+
+# Tabel yang sudah dibaca: path → (mtime, DataFrame)
+_LIQUID_CACHE = {}
+
+def _as_bool(series):
+    return series.astype(str).str.strip().str.lower().isin(_TRUE_TEXT)
+
+def load_liquid_universe(path=None):
+    """
+    Tabel liquid_stocks.csv (index = kode tanpa .JK) dengan kolom sektor, syariah (bool),
+    day_trade, swing_trade. Dibaca ulang hanya jika file berubah. None jika file tidak ada.
+    """
+    path = path or LIQUID_STOCKS_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _LIQUID_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    # pandas hanya dimuat saat file universe likuid benar-benar dibaca
+    import pandas as pd
+
+    try:
+        raw = pd.read_csv(path)
+        kode = raw['ticker'].astype(str).str.strip().str.upper().str.replace(r"\.JK$", "", regex=True)
+        table = pd.DataFrame({
+            'sektor': raw.get('sektor', pd.Series("UNKNOWN", index=raw.index)).fillna("UNKNOWN").astype(str),
+            # Status ISSI tetap diakui walau kolom syariah di file masih "Cek Manual"
+            'syariah': _as_bool(raw.get('syariah', pd.Series("", index=raw.index))) | kode.isin(SYARIAH_STOCKS_ISSI),
+            **{flag: _as_bool(raw.get(flag, pd.Series("", index=raw.index))) for flag in LIQUIDITY_FLAGS.values()},
+        })
+        table.index = pd.Index(kode, name='Ticker')
+        table = table[~table.index.duplicated()]
+    except Exception as e:
+        print(f"Peringatan: {path} tidak bisa dibaca, memakai universe bawaan. Detail: {e}")
+        return None
+    _LIQUID_CACHE[path] = (mtime, table)
+    return table
+
+def liquid_tickers(trade_mode, path=None):
+    """Ticker (.JK) yang lolos flag likuiditas mode trading, atau None jika file tidak ada."""
+    table = load_liquid_universe(path)
+    if table is None:
+        return None
+    return sorted(f"{t}.JK" for t in table.index[table[LIQUIDITY_FLAGS[trade_mode]]])
+
 
 if __name__ == "__main__":
     print(f"Audit Selesai. Total unik ticker di Universe: {len(get_all_tickers())} emiten.")
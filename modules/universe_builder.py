@@ -0,0 +1,222 @@
+"""
+Modul: universe_builder.py
+Logika inti universe_generator (tanpa UI): dari pre_liquid_stocks.csv menjadi
+tabel liquid_stocks.csv (flag likuiditas day_trade / swing_trade + median
+valuasi sektoral).
+
+Pengambilan data dilakukan per potongan (CHUNK_SIZE ticker):
+    - history : satu request multi-ticker lewat price_store.refresh_many
+    - info    : snapshot info_store (thread terbatas, cache 24 jam)
+Setiap potongan selesai, baris hasil ditulis ke checkpoint di disk sehingga
+proses yang terputus bisa dilanjutkan tanpa mengulang dari awal. Ticker yang
+gagal dicatat (beserta alasannya) agar hanya ticker itu yang diulang.
+
+Struktur file : <DATA_DIR>/universe_generator/checkpoint.parquet
+                <DATA_DIR>/universe_generator/failed.json
+Checkpoint berlaku untuk satu "run" = tanggal + daftar ticker input; input
+berbeda (atau hari berganti) otomatis memulai run baru.
+
+Catatan: modul ini tidak meng-import streamlit.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytz
+
+try:
+    from modules.price_store import DATA_DIR, BATCH_CHUNK_SIZE, refresh_many
+    from modules.info_store import refresh_info_snapshot
+except ModuleNotFoundError:
+    from price_store import DATA_DIR, BATCH_CHUNK_SIZE, refresh_many
+    from info_store import refresh_info_snapshot
+
+GENERATOR_DIR = os.path.join(DATA_DIR, "universe_generator")
+CHECKPOINT_PATH = os.path.join(GENERATOR_DIR, "checkpoint.parquet")
+FAILED_PATH = os.path.join(GENERATOR_DIR, "failed.json")
+
+# Batas rata-rata nilai transaksi harian (20 hari) untuk flag likuiditas
+LIMIT_DAY_TRADE = 5_000_000_000
+LIMIT_SWING_TRADE = 2_000_000_000
+VALUE_WINDOW = 20
+
+# Ticker per potongan (= ukuran request multi-ticker Yahoo) & thread info
+CHUNK_SIZE = BATCH_CHUNK_SIZE
+INFO_WORKERS = 8
+
+ROW_COLUMNS = ['ticker', 'sektor', 'syariah', 'value_MA20', 'day_trade', 'swing_trade', 'PER_raw', 'PBV_raw']
+OUTPUT_COLUMNS = [
+    'ticker', 'sektor', 'syariah', 'value_MA20',
+    'day_trade', 'swing_trade', 'avg_PER_3yr_sector',
+    'avg_PBV_3yr_sector', 'last_update_universe'
+]
+
+
+# --- INPUT & IDENTITAS RUN ---
+def normalize_pre_data(pre_data):
+    """pre_liquid_stocks.csv → DataFrame ticker (.JK), sektor, syariah (urutan input, tanpa duplikat)."""
+    raw = pre_data['Kode Saham'].astype(str).str.strip()
+    tickers = raw.where(raw.str.endswith('.JK'), raw + '.JK')
+    pre = pd.DataFrame({
+        'ticker': tickers,
+        'sektor': pre_data['Sektor'] if 'Sektor' in pre_data else 'Unknown',
+        # Nilai syariah manual dari file pre_liquid jika ada, jika tidak 'Cek Manual'
+        'syariah': pre_data['Syariah'] if 'Syariah' in pre_data else 'Cek Manual',
+    })
+    return pre.drop_duplicates('ticker').reset_index(drop=True)
+
+def run_fingerprint(pre):
+    """Identitas run: tanggal (WIB) + hash daftar ticker input."""
+    today = datetime.now(pytz.timezone('Asia/Jakarta')).strftime('%Y%m%d')
+    digest = hashlib.sha1("\n".join(pre['ticker']).encode()).hexdigest()[:12]
+    return f"{today}-{digest}"
+
+
+# --- CHECKPOINT & LOG GAGAL ---
+def _empty_rows():
+    return pd.DataFrame(columns=ROW_COLUMNS)
+
+def load_checkpoint(fingerprint):
+    """Baris yang sudah selesai untuk run `fingerprint` (kosong jika run lain / belum ada)."""
+    if not os.path.exists(CHECKPOINT_PATH):
+        return _empty_rows()
+    try:
+        rows = pd.read_parquet(CHECKPOINT_PATH)
+    except Exception as e:
+        print(f"Peringatan: Checkpoint generator rusak, run dimulai ulang. Detail: {e}")
+        return _empty_rows()
+    if 'fingerprint' not in rows.columns:
+        return _empty_rows()
+    rows = rows[rows['fingerprint'] == fingerprint].drop(columns='fingerprint')
+    return rows.reset_index(drop=True)
+
+def _write_atomic(path, write):
+    os.makedirs(GENERATOR_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def save_checkpoint(rows, fingerprint):
+    table = rows.reindex(columns=ROW_COLUMNS).assign(fingerprint=fingerprint)
+    _write_atomic(CHECKPOINT_PATH, lambda tmp: table.to_parquet(tmp, index=False))
+
+def load_failed(fingerprint):
+    """dict ticker → alasan gagal untuk run `fingerprint`."""
+    if not os.path.exists(FAILED_PATH):
+        return {}
+    try:
+        with open(FAILED_PATH, encoding="utf-8") as f:
+            payload = json.load(f)
+    except Exception:
+        return {}
+    return payload.get("failed", {}) if payload.get("fingerprint") == fingerprint else {}
+
+def save_failed(failed, fingerprint):
+    payload = {"fingerprint": fingerprint, "failed": failed}
+
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+    _write_atomic(FAILED_PATH, write)
+
+def clear_checkpoint():
+    """Hapus checkpoint & log gagal (run berikutnya mulai dari awal)."""
+    for path in (CHECKPOINT_PATH, FAILED_PATH):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def pending_tickers(pre, done, failed, retry_failed_only=False):
+    """Ticker yang masih perlu diproses: belum selesai, atau hanya yang gagal."""
+    if retry_failed_only:
+        return [t for t in pre['ticker'] if t in failed]
+    done = set(done)
+    return [t for t in pre['ticker'] if t not in done]
+
+
+# --- PROSES ---
+def process_chunk(chunk):
+    """
+    Satu potongan pre_data (kolom ticker, sektor, syariah).
+    Return (list baris hasil, dict ticker → alasan gagal).
+    """
+    tickers = chunk['ticker'].tolist()
+    histories = refresh_many(tickers, interval='1d', chunk_size=len(tickers))
+    snapshot = refresh_info_snapshot(tickers, workers=INFO_WORKERS)
+
+    rows, failed = [], {}
+    for ticker, sektor, syariah in chunk[['ticker', 'sektor', 'syariah']].itertuples(index=False):
+        hist = histories.get(ticker)
+        if hist is None or hist.empty:
+            failed[ticker] = "Data historis kosong"
+            continue
+        if pd.isna(snapshot.at[ticker, 'fetched_at']):
+            failed[ticker] = "Info fundamental gagal diambil"
+            continue
+
+        hist = hist.tail(VALUE_WINDOW)
+        value_ma20 = float((hist['Close'] * hist['Volume']).mean())
+        info = snapshot.loc[ticker]
+        per = info['trailingPE'] if pd.notna(info['trailingPE']) else info.get('forwardPE', np.nan)
+        rows.append({
+            'ticker': ticker, 'sektor': sektor, 'syariah': syariah,
+            'value_MA20': value_ma20,
+            'day_trade': bool(value_ma20 >= LIMIT_DAY_TRADE),
+            'swing_trade': bool(value_ma20 >= LIMIT_SWING_TRADE),
+            'PER_raw': per, 'PBV_raw': info['priceToBook'],
+        })
+    return rows, failed
+
+def generate_universe(pre_data, retry_failed_only=False, chunk_size=CHUNK_SIZE, on_progress=None):
+    """
+    Memproses pre_data dengan checkpoint per potongan.
+
+    retry_failed_only=True → hanya ticker di log gagal yang diproses ulang.
+    on_progress(selesai, total, jumlah_gagal) dipanggil setiap potongan selesai.
+    Return (DataFrame baris hasil seluruh run, dict ticker gagal → alasan).
+    """
+    pre = normalize_pre_data(pre_data)
+    fingerprint = run_fingerprint(pre)
+    done = load_checkpoint(fingerprint)
+    failed = load_failed(fingerprint)
+    todo = pending_tickers(pre, done['ticker'], failed, retry_failed_only)
+    pending = pre[pre['ticker'].isin(todo)]
+
+    total = len(pre)
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending.iloc[start:start + chunk_size]
+        rows, chunk_failed = process_chunk(chunk)
+        if rows:
+            fresh = pd.DataFrame(rows, columns=ROW_COLUMNS)
+            done = fresh if done.empty else pd.concat([done[~done['ticker'].isin(fresh['ticker'])], fresh])
+        for ticker in chunk['ticker']:
+            failed.pop(ticker, None)
+        failed.update(chunk_failed)
+        try:
+            save_checkpoint(done, fingerprint)
+            save_failed(failed, fingerprint)
+        except Exception as e:
+            print(f"Peringatan: Gagal menyimpan checkpoint generator. Detail: {e}")
+        if on_progress is not None:
+            on_progress(len(done), total, len(failed))
+
+    # Urutan baris mengikuti pre_data
+    order = {t: i for i, t in enumerate(pre['ticker'])}
+    done = done.sort_values('ticker', key=lambda s: s.map(order)).reset_index(drop=True)
+    return done, failed
+
+def finalize_universe(rows):
+    """Baris hasil → tabel liquid_stocks.csv (median PER/PBV per sektor)."""
+    sector_medians = rows.groupby('sektor')[['PER_raw', 'PBV_raw']].median().reset_index()
+    sector_medians = sector_medians.rename(columns={
+        'PER_raw': 'avg_PER_3yr_sector',
+        'PBV_raw': 'avg_PBV_3yr_sector'
+    })
+    final = pd.merge(rows, sector_medians, on='sektor', how='left')
+    final['last_update_universe'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return final[OUTPUT_COLUMNS]
@@ -0,0 +1,203 @@
+"""
+Modul: warmup.py
+Penjadwal latar belakang yang memanaskan cache data seluruh universe mengikuti
+sesi bursa (get_market_session), supaya scan pertama user mengenai data hangat
+di store lokal, bukan request Yahoo yang dingin.
+
+Jadwal:
+    - PRA-PASAR (sebelum 09:00 WIB) : 1x per hari bursa → snapshot info fundamental,
+                                      bar harian (1d) & bar 15m hari sebelumnya,
+                                      tabel konteks tren Daily (daily_context)
+                                      (dikejar saat LIVE jika server baru menyala)
+    - LIVE MARKET                   : bar 15m setiap jendela refresh (MIN_REFRESH_AGE),
+                                      selaras dengan versi data scan_cache
+    - PASCA-PASAR / tutup           : tidak ada pekerjaan
+
+Ticker yang dipanaskan = universe yang lolos pre-filter fundamental, sama persis
+dengan yang diminta run_scan, sehingga panel mmap dipakai ulang tanpa rebuild.
+
+Beberapa proses server berbagi state di <DATA_DIR>/warmup/state.json agar pekerjaan
+yang sudah dikerjakan proses lain tidak diulang. Cek jadwal → job → catat stamp
+dijalankan di bawah lock file <DATA_DIR>/warmup/warmup.lock (flock, dilepas kernel
+jika proses mati), jadi satu job hanya dikerjakan satu proses; proses lain melewati
+tick itu.
+
+Jalankan sebagai service terpisah (opsional, selain thread di app.py):
+    python -m modules.warmup
+    python -m modules.warmup --once
+
+Catatan: modul ini tidak meng-import streamlit.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+import pytz
+
+try:
+    from modules.config import DATA_DIR
+    from modules.price_panel import get_universe_panel
+    from modules.info_store import refresh_info_snapshot
+    from modules.screening_engine import get_market_session, fundamental_prefilter, universe_tickers
+    from modules.scan_cache import data_version, try_file_lock, release_file_lock
+    from modules.daily_context import get_daily_context
+except ModuleNotFoundError:
+    from config import DATA_DIR
+    from price_panel import get_universe_panel
+    from info_store import refresh_info_snapshot
+    from screening_engine import get_market_session, fundamental_prefilter, universe_tickers
+    from scan_cache import data_version, try_file_lock, release_file_lock
+    from daily_context import get_daily_context
+
+WARMUP_DIR = os.path.join(DATA_DIR, "warmup")
+STATE_PATH = os.path.join(WARMUP_DIR, "state.json")
+LOCK_PATH = os.path.join(WARMUP_DIR, "warmup.lock")
+
+# Selang pengecekan jadwal (detik)
+TICK_INTERVAL = 60
+
+_THREAD = None
+_STOP = threading.Event()
+
+
+# --- STATE BERSAMA ---
+def load_state():
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state):
+    os.makedirs(WARMUP_DIR, exist_ok=True)
+    tmp_path = f"{STATE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, STATE_PATH)
+
+def _mark_done(job, stamp):
+    state = load_state()
+    state[job] = stamp
+    state[f"{job}_at"] = datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(timespec='seconds')
+    try:
+        _save_state(state)
+    except Exception as e:
+        print(f"Peringatan: Gagal menyimpan state warm-up. Detail: {e}")
+
+
+# --- PEKERJAAN WARM-UP ---
+def _lolos_tickers(trade_mode):
+    """Universe mode `trade_mode` yang lolos pre-filter fundamental (sama dengan tahap 1 run_scan)."""
+    tickers = universe_tickers(trade_mode)
+    gate = fundamental_prefilter(refresh_info_snapshot(tickers))
+    return gate.index[gate['Lolos']].tolist()
+
+def warm_premarket():
+    """Info fundamental + bar harian (Swing) & 15m + tabel konteks Daily (Day Trading)."""
+    swing = _lolos_tickers("Swing Trading")
+    day = _lolos_tickers("Day Trading")
+    if swing:
+        get_universe_panel(swing, interval='1d')
+    if day:
+        get_universe_panel(day, interval='15m')
+        get_daily_context(day)
+    return len(set(swing) | set(day))
+
+def warm_intraday():
+    """Bar 15m terbaru (dipaksa cek, tanpa menunggu umur MIN_REFRESH_AGE)."""
+    lolos = _lolos_tickers("Day Trading")
+    if lolos:
+        get_universe_panel(lolos, interval='15m', min_age=0)
+    return len(lolos)
+
+def due_job(state=None):
+    """
+    (nama job, stamp) yang perlu dijalankan sekarang, atau None.
+    Stamp menandai satuan jadwal (tanggal / versi data) agar tiap job cukup sekali.
+    """
+    state = load_state() if state is None else state
+    session, _ = get_market_session()
+    today = datetime.now(pytz.timezone('Asia/Jakarta')).strftime('%Y%m%d')
+
+    # Server yang baru menyala saat LIVE tetap mengejar warm-up harian lebih dulu
+    if session in ("PRA-PASAR", "LIVE MARKET") and state.get("premarket") != today:
+        return "premarket", today
+    if session == "LIVE MARKET":
+        version = data_version()
+        if state.get("intraday") != version:
+            return "intraday", version
+    return None
+
+JOBS = {"premarket": warm_premarket, "intraday": warm_intraday}
+
+def run_pending():
+    """
+    Menjalankan job yang jatuh tempo (jika ada). Return nama job atau None.
+    Jika proses lain sedang memegang lock warm-up, tick ini dilewati.
+    """
+    if due_job() is None or not try_file_lock(LOCK_PATH):
+        return None
+    try:
+        # State dibaca ulang di bawah lock: job mungkin baru diselesaikan proses lain
+        due = due_job()
+        if due is None:
+            return None
+        job, stamp = due
+        started = time.perf_counter()
+        try:
+            jumlah = JOBS[job]()
+        except Exception as e:
+            print(f"Peringatan: Warm-up {job} gagal, dicoba lagi di tick berikutnya. Detail: {e}")
+            return None
+        _mark_done(job, stamp)
+    finally:
+        release_file_lock(LOCK_PATH)
+    print(f"Warm-up {job} ({stamp}): {jumlah} saham dalam {time.perf_counter() - started:.1f} detik.")
+    return job
+
+
+# --- LOOP PENJADWAL ---
+def run_forever(tick=TICK_INTERVAL, stop_event=None):
+    stop_event = stop_event or _STOP
+    while not stop_event.is_set():
+        run_pending()
+        stop_event.wait(tick)
+
+def start_warmup_scheduler(tick=TICK_INTERVAL):
+    """Menyalakan thread daemon penjadwal (idempotent per proses)."""
+    global _THREAD
+    if _THREAD is not None and _THREAD.is_alive():
+        return _THREAD
+    _STOP.clear()
+    _THREAD = threading.Thread(target=run_forever, args=(tick,), name="warmup-scheduler", daemon=True)
+    _THREAD.start()
+    return _THREAD
+
+def stop_warmup_scheduler(timeout=None):
+    _STOP.set()
+    if _THREAD is not None:
+        _THREAD.join(timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Penjadwal warm-up cache data saham.")
+    parser.add_argument("--once", action="store_true", help="Jalankan job yang jatuh tempo lalu keluar")
+    parser.add_argument("--tick", type=int, default=TICK_INTERVAL)
+    args = parser.parse_args(argv)
+
+    if args.once:
+        run_pending()
+        return 0
+    try:
+        run_forever(tick=args.tick)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())